@@ -1,11 +1,13 @@
-from typing import AsyncGenerator
-from fastapi import Depends, HTTPException, status, Request
+from typing import AsyncGenerator, Optional
+from fastapi import Depends, HTTPException, Query, Request, WebSocket, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import HTTPConnection
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.repositories.user_repository import UserRepository
 from app.config.database import AsyncSessionLocal
-from app.core.security import verify_token
+from app.core.security import STREAM_SCOPE, verify_token
+from app.core.tracing import span
 
 from app.models.user import User
 
@@ -22,26 +24,34 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+def get_session_factory() -> async_sessionmaker:
+    # For work that outlives the request-scoped session from get_db, such as
+    # streamed response bodies and background cache refreshes.
+    return AsyncSessionLocal
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials"
+    )
+
+
+async def authenticate(db: AsyncSession, token: str, scope: Optional[str] = None) -> User:
+    """Loads the user a token was issued to. Access tokens carry no scope;
+    a scoped token is only accepted where that scope is asked for."""
     try:
-        payload = verify_token(credentials.credentials)
+        with span("auth.verify_token"):
+            payload = verify_token(token)
         username: int = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
+        if username is None or payload.get("scope") != scope:
+            raise _credentials_error()
     except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
+        raise _credentials_error()
     
     user_repo = UserRepository(db)
-    user = await user_repo.get_by_username(db, username=username)
+    with span("auth.load_user"):
+        user = await user_repo.get_by_username(db, username=username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,6 +59,75 @@ async def get_current_user(
         )
     return user
 
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    return await authenticate(db, credentials.credentials)
+
+
+async def get_connection_user(
+    connection: HTTPConnection, db: AsyncSession = Depends(get_db)
+) -> Optional[User]:
+    # For routes serving both HTTP and WebSocket: the bearer token is
+    # required on HTTP, while WebSockets authenticate in their own handshake
+    # and get None here.
+    if connection.scope["type"] == "websocket":
+        return None
+    credentials = await security(connection)
+    return await authenticate(db, credentials.credentials)
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+async def get_stream_user(
+    request: Request,
+    token: Optional[str] = Query(None),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> User:
+    # Long-lived streams authenticate on a session of their own that is
+    # closed straight away, instead of holding get_db's pooled connection
+    # for the life of the stream. EventSource cannot set headers, hence
+    # the ?token= fallback, which only takes a stream token.
+    header_token = bearer_token(request.headers.get("Authorization"))
+    if header_token is None and token is None:
+        raise _credentials_error()
+    async with session_factory() as db:
+        if header_token is not None:
+            return await authenticate(db, header_token)
+        return await authenticate(db, token, scope=STREAM_SCOPE)
+
+
+async def get_websocket_user(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> User:
+    header_token = bearer_token(websocket.headers.get("Authorization"))
+    if header_token is None and token is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    try:
+        async with session_factory() as db:
+            if header_token is not None:
+                return await authenticate(db, header_token)
+            return await authenticate(db, token, scope=STREAM_SCOPE)
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+
+def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions. Admin access required."
+        )
+    return user
+
 def require_permission(permission: str):
     def permission_checker(user: User = Depends(get_current_user)):
         if permission not in user.permissions:
@@ -0,0 +1,36 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app import schemas
+from app.api import deps
+from app.config.settings import settings
+from app.core.profiling import create_profile_token
+from app.core.slow_queries import slow_query_log
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQuery])
+async def read_slow_queries(
+    limit: int = Query(100, ge=1, le=1000),
+    admin: User = Depends(deps.get_admin_user),
+):
+    return slow_query_log.recent(limit)
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries(admin: User = Depends(deps.get_admin_user)):
+    slow_query_log.clear()
+
+
+@router.post("/profile-token", response_model=schemas.ProfileToken)
+async def issue_profile_token(
+    ttl: int = Query(300, ge=1, le=3600),
+    admin: User = Depends(deps.get_admin_user),
+):
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    token, expires_at = create_profile_token(admin.username, ttl)
+    return {"token": token, "expires_at": expires_at}
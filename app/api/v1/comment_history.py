@@ -1,11 +1,14 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import repositories, schemas
 from app.api import deps
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.tracing import span
 from app.models.user import User
-from app.utils.permissions import ensure_comment_permission
+from app.utils.fields import dump_fields, sparse_fields
+from app.utils.permissions import ensure_group_read_permission
 
 router = APIRouter()
 
@@ -17,15 +20,30 @@ async def read_comment_history(
     comment_id: int,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[List[str]] = Depends(sparse_fields(schemas.CommentHistory)),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(deps.get_current_user),
 ):
-    comment = await repositories.comment.get(db, id=comment_id)
-    if not comment:
+    author_group = await repositories.comment.get_author_group(db, id=comment_id)
+    if author_group is None:
         raise HTTPException(status_code=404, detail="Comment not found")
-    
-    ensure_comment_permission(current_user, comment, "read")
-    
-    history = await repositories.comment_history.get_by_comment(
-        db, comment_id=comment_id, skip=skip, limit=limit
-    )
-    return history
+
+    ensure_group_read_permission(current_user, author_group)
+
+    watermark = await repositories.comment_history.get_watermark(db, comment_id=comment_id)
+    etag = make_etag("history", comment_id, *watermark, skip, limit, fields and ",".join(fields))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    if fields is not None:
+        history = await repositories.comment_history.get_by_comment(
+            db, comment_id=comment_id, skip=skip, limit=limit, fields=fields
+        )
+        payload = dump_fields(schemas.CommentHistory, fields, history)
+    else:
+        history = await repositories.comment_history.get_rows_by_comment(
+            db, comment_id=comment_id, skip=skip, limit=limit
+        )
+        with span("serialize.rows", rows=len(history)):
+            payload = schemas.comment_history.comment_history_rows_adapter.dump_json(history)
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
@@ -1,13 +1,24 @@
-from typing import List
+from contextlib import aclosing
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app import repositories, schemas
 from app.api import deps
+from app.config.settings import settings
+from app.core.cache import feed_cache
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.live import broker, comment_data
+from app.core.tracing import span
 from app.models.user import User
 
-from app.utils.permissions import ensure_comment_permission
+from app.utils.export import (
+    ExportFormat, csv_encoder, csv_header, export_response, ndjson_encoder, stream_batches
+)
+from app.utils.fields import dump_fields, dump_fields_one, sparse_fields
+from app.utils.permissions import ensure_comment_permission, ensure_group_read_permission
 
 router = APIRouter()
 
@@ -20,7 +31,7 @@ async def create_comment(
     current_user: User = Depends(deps.get_current_user),
 ):
     comment = await repositories.comment.create_with_user(
-        db=db, obj_in=comment_in, user_id=current_user.id
+        db=db, obj_in=comment_in, user_id=current_user.id, group=current_user.group
     )
     await repositories.comment_history.create_history_entry(
         db=db,
@@ -28,20 +39,115 @@ async def create_comment(
         old_value=None,
         new_value=comment.content
     )
+    broker.publish("created", current_user.group, comment_data(comment))
     return comment
 
 
+def _feed_etag(group: str, version: int, *params) -> str:
+    return make_etag("feed", group, version, *params)
+
+
 @router.get("/", response_model=List[schemas.Comment])
 async def read_comments(
     db: AsyncSession = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    since_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    fields: Optional[List[str]] = Depends(sparse_fields(schemas.Comment)),
+    if_none_match: Optional[str] = Header(None),
+    session_factory: async_sessionmaker = Depends(deps.get_session_factory),
     current_user: User = Depends(deps.get_current_user),
 ):
-    comments = await repositories.comment.get_by_user_group(
-        db, user_group=current_user.group, skip=skip, limit=limit
-    )
-    return comments
+    group = current_user.group
+    if since_id is not None or since is not None:
+        # Cheap EXISTS probe first, so an idle poll is a single indexed lookup.
+        has_newer = await repositories.comment.has_newer(
+            db, user_group=group, since_id=since_id, since=since
+        )
+        if not has_newer:
+            return []
+
+    params = (skip, limit, since_id, since, fields and ",".join(fields))
+    version = await repositories.comment.get_feed_version(db, user_group=group)
+    etag = _feed_etag(group, version, *params)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    async def load_page(session: AsyncSession) -> bytes:
+        if fields is not None:
+            rows = await repositories.comment.get_by_user_group_fields(
+                session,
+                user_group=group,
+                fields=fields,
+                skip=skip,
+                limit=limit,
+                since_id=since_id,
+                since=since,
+            )
+            return dump_fields(schemas.Comment, fields, rows)
+        # Plain column rows encoded straight to JSON: no ORM hydration,
+        # identity-map bookkeeping or model validation.
+        rows = await repositories.comment.get_by_user_group_rows(
+            session,
+            user_group=group,
+            skip=skip,
+            limit=limit,
+            since_id=since_id,
+            since=since,
+        )
+        with span("serialize.rows", rows=len(rows)):
+            return schemas.comment.comment_rows_adapter.dump_json(rows)
+
+    async def load():
+        payload = await load_page(db)
+        return payload, len(payload)
+
+    async def refresh():
+        async with session_factory() as session:
+            payload = await load_page(session)
+        return payload, len(payload)
+
+    # Keyed by the group version, which writes on every worker advance in the
+    # database: once another worker writes, readers here miss and reload
+    # instead of being served that worker's invalidated page.
+    payload = await feed_cache.get_or_load(group, ("rest", version) + params, load, refresh)
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
+
+
+COMMENT_CSV_COLUMNS = [
+    "id", "content", "user_id", "created_at", "updated_at", "user_username", "user_group"
+]
+HISTORY_CSV_COLUMNS = ["id", "comment_id", "timestamp", "old_value", "new_value"]
+COMMENT_FIELDS = list(schemas.Comment.model_fields)
+
+
+@router.get("/export")
+async def export_comments(
+    request: Request,
+    format: ExportFormat = ExportFormat.ndjson,
+    session_factory: async_sessionmaker = Depends(deps.get_session_factory),
+    current_user: User = Depends(deps.get_current_user),
+):
+    group = current_user.group
+
+    async def batches():
+        # The request-scoped session is closed before the body is sent, so
+        # the export reads through its own session and cursor.
+        async with session_factory() as session:
+            async with aclosing(repositories.comment.stream_group_rows(
+                session, user_group=group, batch_size=settings.EXPORT_BATCH_SIZE
+            )) as rows:
+                async for batch in rows:
+                    yield batch
+
+    if format is ExportFormat.csv:
+        body = stream_batches(
+            request, batches(), csv_encoder(COMMENT_CSV_COLUMNS), csv_header(COMMENT_CSV_COLUMNS)
+        )
+    else:
+        body = stream_batches(request, batches(), ndjson_encoder(schemas.comment.CommentRow))
+    return export_response(body, format, f"comments-{group}")
 
 
 @router.get("/{comment_id}", response_model=schemas.Comment)
@@ -49,14 +155,30 @@ async def read_comment(
     *,
     db: AsyncSession = Depends(deps.get_db),
     comment_id: int,
+    fields: Optional[List[str]] = Depends(sparse_fields(schemas.Comment)),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(deps.get_current_user),
 ):
-    comment = await repositories.comment.get(db, id=comment_id)
-    if not comment:
+    # Plain rows rather than ORM objects, so concurrent reads of the same
+    # comment share one query; the permission check still runs per caller.
+    projected = await repositories.comment.get_fields(
+        db, id=comment_id, fields=fields or COMMENT_FIELDS
+    )
+    if projected is None:
         raise HTTPException(status_code=404, detail="Comment not found")
+    data, _, author_group, version = projected
+    ensure_group_read_permission(current_user, author_group)
 
-    ensure_comment_permission(current_user, comment, "read")
-    return comment
+    # The group version moves on every edit and on author renames, which
+    # updated_at (second resolution on SQLite) would miss.
+    if fields is not None:
+        etag = make_etag("comment", comment_id, version, ",".join(fields))
+    else:
+        etag = make_etag("comment", comment_id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    payload = dump_fields_one(schemas.Comment, fields or COMMENT_FIELDS, data)
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
 
 
 @router.put("/{comment_id}", response_model=schemas.Comment)
@@ -84,6 +206,7 @@ async def update_comment(
             new_value=comment.content
         )
 
+    broker.publish("updated", current_user.group, comment_data(comment))
     return comment
 
 
@@ -101,4 +224,40 @@ async def delete_comment(
     ensure_comment_permission(current_user, comment, "delete")
 
     comment = await repositories.comment.remove(db, id=comment_id)
-    return comment
\ No newline at end of file
+    broker.publish("deleted", current_user.group, {"id": comment_id})
+    return comment
+
+
+@router.get("/{comment_id}/history/export")
+async def export_comment_history(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    comment_id: int,
+    format: ExportFormat = ExportFormat.ndjson,
+    session_factory: async_sessionmaker = Depends(deps.get_session_factory),
+    current_user: User = Depends(deps.get_current_user),
+):
+    author_group = await repositories.comment.get_author_group(db, id=comment_id)
+    if author_group is None:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    ensure_group_read_permission(current_user, author_group)
+
+    async def batches():
+        async with session_factory() as session:
+            async with aclosing(repositories.comment_history.stream_rows_by_comment(
+                session, comment_id=comment_id, batch_size=settings.EXPORT_BATCH_SIZE
+            )) as rows:
+                async for batch in rows:
+                    yield batch
+
+    if format is ExportFormat.csv:
+        body = stream_batches(
+            request, batches(), csv_encoder(HISTORY_CSV_COLUMNS), csv_header(HISTORY_CSV_COLUMNS)
+        )
+    else:
+        body = stream_batches(
+            request, batches(), ndjson_encoder(schemas.comment_history.CommentHistoryRow)
+        )
+    return export_response(body, format, f"comment-{comment_id}-history")
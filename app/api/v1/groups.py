@@ -0,0 +1,32 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories, schemas
+from app.api import deps
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/{group}/stats", response_model=schemas.GroupStats)
+async def read_group_stats(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    group: str,
+    day: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_user),
+):
+    if current_user.group != group:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions. You can only access stats for your own group."
+        )
+
+    if day is None:
+        count = await repositories.stats.get_group_stats(db, group=group)
+    else:
+        count = await repositories.stats.get_group_daily_stats(db, group=group, day=day)
+    return schemas.GroupStats(group=group, day=day, comment_count=count)
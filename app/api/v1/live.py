@@ -0,0 +1,86 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, WebSocket, status
+from fastapi.responses import StreamingResponse
+
+from app import schemas
+from app.api import deps
+from app.config.settings import settings
+from app.core.live import DROPPED, Subscription, broker
+from app.core.security import create_stream_token
+from app.models.user import User
+
+router = APIRouter()
+
+PING = ": ping\n\n"
+DROPPED_FRAME = 'event: dropped\ndata: {"detail":"Too slow; reconnect and catch up with since_id"}\n\n'
+
+
+async def sse_stream(group: str, heartbeat: float) -> AsyncIterator[str]:
+    # Subscribed inside the body so the subscription always ends with it.
+    async with broker.subscribe(group) as subscription:
+        yield PING
+        while True:
+            event = await subscription.get(heartbeat)
+            if event is None:
+                yield PING
+            elif event is DROPPED:
+                yield DROPPED_FRAME
+                return
+            else:
+                yield event.frame
+
+
+@router.post("/stream-token", response_model=schemas.StreamToken)
+async def issue_stream_token(current_user: User = Depends(deps.get_current_user)):
+    """A short-lived token for ``?token=`` on the stream and WebSocket
+    endpoints, for clients that cannot send an Authorization header."""
+    token, expires_at = create_stream_token(current_user.username)
+    return {"token": token, "expires_at": expires_at}
+
+
+@router.get("/stream")
+async def stream_comments(current_user: User = Depends(deps.get_stream_user)):
+    """Server-Sent Events for comments created, updated and deleted in the
+    caller's group."""
+    return StreamingResponse(
+        sse_stream(current_user.group, settings.LIVE_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription, heartbeat: float):
+    while True:
+        event = await subscription.get(heartbeat)
+        if event is None:
+            await websocket.send_text('{"type":"ping"}')
+        elif event is DROPPED:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too slow")
+            return
+        else:
+            await websocket.send_text(event.message)
+
+
+async def _receive_until_closed(websocket: WebSocket):
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/ws")
+async def comments_websocket(
+    websocket: WebSocket, current_user: User = Depends(deps.get_websocket_user)
+):
+    await websocket.accept()
+    async with broker.subscribe(current_user.group) as subscription:
+        tasks = {
+            asyncio.create_task(_send_events(websocket, subscription, settings.LIVE_HEARTBEAT_SECONDS)),
+            asyncio.create_task(_receive_until_closed(websocket)),
+        }
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,13 +1,32 @@
 from fastapi import APIRouter
-from . import users, comments, comment_history, auth
+from fastapi.responses import JSONResponse
+
+from app.core.admission import admission_exempt
+from app.core.warmup import warmup
+from . import users, comments, comment_history, auth, groups, admin, live
 
 api_router = APIRouter()
 
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
+# Ahead of comments.router, whose /{comment_id} would otherwise match /stream.
+api_router.include_router(live.router, prefix="/comments", tags=["live"])
 api_router.include_router(comments.router, prefix="/comments", tags=["comments"])
 api_router.include_router(comment_history.router, prefix="/users", tags=["comment-history"])
+api_router.include_router(groups.router, prefix="/groups", tags=["groups"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 @api_router.get("/health")
+@admission_exempt
 async def health_check():
-    return {"status": "healthy", "message": "System is running"}
\ No newline at end of file
+    return {"status": "healthy", "message": "System is running"}
+
+
+@api_router.get("/ready")
+@admission_exempt
+async def readiness_check():
+    if not warmup.ready:
+        return JSONResponse(
+            status_code=503, content={"status": "starting", "failed": warmup.failed}
+        )
+    return {"status": "ready", "startup_ms": warmup.report}
@@ -1,5 +1,5 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import repositories, schemas
@@ -32,8 +32,11 @@ async def read_users(
     limit: int = 100,
     current_user: User = Depends(deps.get_current_user),
 ):
-    users = await repositories.user.get_multi(db, skip=skip, limit=limit)
-    return users
+    users = await repositories.user.get_multi_rows(db, skip=skip, limit=limit)
+    return Response(
+        content=schemas.user.user_rows_adapter.dump_json(users),
+        media_type="application/json",
+    )
 
 
 @router.get("/{user_id}", response_model=schemas.User)
@@ -1,14 +1,19 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config.settings import settings
+from app.core.queries import instrument_engine, register_pool_metrics
+from app.core.slow_queries import slow_query_log
 
 engine = create_async_engine(
     str(settings.DATABASE_URL),
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     echo=settings.DEBUG
 )
+instrument_engine(engine)
+register_pool_metrics(engine)
+slow_query_log.watch(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -11,9 +11,14 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
     LOG_DIR: str = "logs"
+    LOG_JSON: bool = False
+    # Records buffered for the logging thread; further records are dropped
+    LOG_QUEUE_SIZE: int = 10000
     
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Lifetime of the single-purpose tokens live streams accept in ?token=
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  
     
     @property
@@ -37,6 +42,11 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "comment_backend"
     POSTGRES_PORT: str = "5432"
     DATABASE_URL: Optional[PostgresDsn] = None
+    # Per-process connection pool; app.server lowers these so all workers fit
+    # in DB_MAX_CONNECTIONS (this server's share of Postgres max_connections)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_MAX_CONNECTIONS: Optional[int] = None
     
     @field_validator("DATABASE_URL", mode="before")
     def assemble_db_connection(cls, v: Optional[str], values: ValidationInfo) -> Any:
@@ -55,6 +65,100 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DB') or ''}",
         )          
     
+    # Soft delete: tombstone comments on delete and purge them in the background
+    SOFT_DELETE_ENABLED: bool = False
+    REAPER_BATCH_SIZE: int = 100
+    REAPER_INTERVAL_SECONDS: float = 5.0
+    REAPER_BATCH_PAUSE_SECONDS: float = 0.1
+    REAPER_MAX_BATCHES_PER_RUN: int = 10
+
+    # Comment content and history values at or above the threshold are compressed
+    COMPRESSION_THRESHOLD_BYTES: int = 1024
+    COMPRESSION_ALGORITHM: str = "zlib"
+    COMPRESSION_LEVEL: int = 6
+
+    @field_validator("COMPRESSION_ALGORITHM")
+    def check_compression_algorithm(cls, v: str) -> str:
+        # Fail at startup rather than on the first large write.
+        if v not in ("zlib", "zstd"):
+            raise ValueError("COMPRESSION_ALGORITHM must be 'zlib' or 'zstd'")
+        if v == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                raise ValueError("COMPRESSION_ALGORITHM='zstd' requires the 'zstandard' package")
+        return v
+
+    # Group feed response cache (per process; entries are keyed by the group
+    # version, so writes made by other workers are never served stale)
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_MAX_ENTRIES: int = 1024
+    FEED_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    FEED_CACHE_TTL_SECONDS: float = 5.0
+    FEED_CACHE_STALE_SECONDS: float = 30.0
+
+    # Identical concurrent row reads share one in-flight query
+    COALESCE_ENABLED: bool = True
+
+    # Admission control: concurrent requests per worker (default: the DB pool
+    # size plus overflow), adapted to latency; excess requests wait in a short
+    # queue and are then turned away with 503
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: Optional[int] = None
+    ADMISSION_MIN_CONCURRENCY: int = 2
+    ADMISSION_QUEUE_SIZE: int = 50
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 500.0
+    ADMISSION_TARGET_LATENCY_MS: float = 500.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Live feed (SSE, WebSocket): events buffered per subscriber before a
+    # slow one is dropped, and the bus carrying them between workers
+    # ("local", or "postgres" for LISTEN/NOTIFY)
+    LIVE_BUS: str = "local"
+    LIVE_BUFFER_SIZE: int = 100
+    LIVE_OUTBOX_SIZE: int = 1000
+    LIVE_HEARTBEAT_SECONDS: float = 15.0
+
+    # Startup warm-up: pool connections opened and hot queries run before
+    # GET /ready reports ready
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 5
+
+    # Rows fetched per server-side cursor batch when streaming exports
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Warn when one request runs the same statement shape this many times
+    QUERY_REPEAT_THRESHOLD: int = 10
+
+    # Fraction of requests written to the access log; slow requests
+    # (and 5xx responses) are always logged
+    LOG_SAMPLE_RATE: float = 1.0
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000.0
+
+    # Slow query log: statements at or over the threshold are logged to
+    # slow_queries.log and kept for GET /admin/slow-queries
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_BUFFER_SIZE: int = 100
+    # Postgres only: re-run slow SELECTs under EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    # Request tracing: spans are written as OTLP/JSON to LOG_DIR/traces.jsonl,
+    # or POSTed to TRACING_OTLP_ENDPOINT (e.g. http://collector:4318/v1/traces)
+    TRACING_ENABLED: bool = False
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+
+    # Per-request profiling with tokens from POST /admin/profile-token;
+    # leave off in production builds unless needed
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_INTERVAL_MS: float = 1.0
+
+    # python -m app.server: worker processes (default: CPU count) and restarts
+    # after WEB_MAX_REQUESTS requests (plus up to the jitter; 0 disables)
+    WEB_WORKERS: Optional[int] = None
+    WEB_PRELOAD: bool = False
+    WEB_MAX_REQUESTS: int = 10000
+    WEB_MAX_REQUESTS_JITTER: int = 1000
+
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1"]
     
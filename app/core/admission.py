@@ -0,0 +1,160 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.config.settings import settings
+from app.core.metrics import registry
+
+# Priority order: a free slot goes to the first lane with a waiter.
+LANES = ("auth", "write", "read")
+
+rejected_total = registry.counter(
+    "admission_rejected_total", "Requests shed by admission control, by lane and reason"
+)
+admitted_total = registry.counter("admission_admitted_total", "Requests admitted, by lane")
+limit_gauge = registry.gauge("admission_limit", "Current adaptive concurrency limit")
+queued_gauge = registry.gauge("admission_queued", "Requests waiting for a slot")
+wait_seconds = registry.histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+class AdmissionController:
+    """Concurrency limit with a short, bounded, prioritised wait queue.
+
+    Requests over the limit wait up to ``queue_timeout`` seconds; when the
+    queue is full a request is turned away at once, unless it outranks a
+    queued one, which is evicted in its place. The limit adapts AIMD-style
+    to latency measured to the start of the response: it grows by about one
+    per ``limit`` requests served within ``target_latency`` while saturated
+    and shrinks by ``backoff`` when they are slower, at most once per
+    ``limit`` completions so one slow burst counts once.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        *,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        queue_size: int = 50,
+        queue_timeout: float = 0.5,
+        target_latency: float = 0.5,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit or limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._since_decrease = 0
+        limit_gauge.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _waiting_at_or_above(self, lane: str) -> bool:
+        return any(self._waiters[other] for other in LANES[:LANES.index(lane) + 1])
+
+    def _evict_below(self, lane: str) -> bool:
+        for other in reversed(LANES[LANES.index(lane) + 1:]):
+            waiters = self._waiters[other]
+            while waiters:
+                waiter = waiters.pop()
+                if not waiter.done():
+                    waiter.set_result(False)
+                    rejected_total.inc(lane=other, reason="evicted")
+                    return True
+        return False
+
+    async def acquire(self, lane: str) -> bool:
+        if self.in_flight < int(self.limit) and not self._waiting_at_or_above(lane):
+            self.in_flight += 1
+            admitted_total.inc(lane=lane)
+            return True
+        if self.queued >= self.queue_size and not self._evict_below(lane):
+            rejected_total.inc(lane=lane, reason="queue_full")
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters[lane].append(waiter)
+        queued_gauge.set(self.queued)
+        started = loop.time()
+        try:
+            admitted = await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over just as the wait expired.
+            admitted = waiter.done() and not waiter.cancelled() and waiter.result()
+            if not admitted:
+                rejected_total.inc(lane=lane, reason="timeout")
+        except asyncio.CancelledError:
+            # Client went away; give back a slot that was already handed over.
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters[lane]:
+                self._waiters[lane].remove(waiter)
+            queued_gauge.set(self.queued)
+        if admitted:
+            # _wake() took the slot on this request's behalf.
+            admitted_total.inc(lane=lane)
+            wait_seconds.observe(loop.time() - started)
+        return admitted
+
+    def release(self, latency: Optional[float] = None):
+        self.in_flight -= 1
+        if latency is not None:
+            self._adapt(latency)
+        self._wake()
+
+    def _adapt(self, latency: float):
+        self._since_decrease += 1
+        if latency > self.target_latency:
+            if self._since_decrease >= self.limit:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._since_decrease = 0
+        elif self.queued or self.in_flight + 1 >= int(self.limit):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        limit_gauge.set(self.limit)
+
+    def _wake(self):
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self.in_flight < int(self.limit):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight += 1
+                    waiter.set_result(True)
+        queued_gauge.set(self.queued)
+
+
+def admission_exempt(endpoint):
+    """Mark a route's endpoint as never queued or shed, e.g. probes."""
+    endpoint.admission_exempt = True
+    return endpoint
+
+
+def request_lane(method: str, path: str) -> str:
+    if path == f"{settings.API_V1_STR}/auth/login":
+        return "auth"
+    # GraphQL mutations arrive as POSTs like queries do and are not told apart.
+    if method in ("POST", "PUT", "PATCH", "DELETE") and not path.startswith("/graphql"):
+        return "write"
+    return "read"
+
+
+admission = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    target_latency=settings.ADMISSION_TARGET_LATENCY_MS / 1000,
+)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.config.settings import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Tuple[Any, int]]]
+
+requests_total = registry.counter(
+    "feed_cache_requests_total", "Feed cache lookups by result (hit, stale, miss)"
+)
+evictions_total = registry.counter(
+    "feed_cache_evictions_total", "Feed cache entries evicted to stay within bounds"
+)
+bytes_gauge = registry.gauge("feed_cache_bytes", "Bytes held by the feed cache")
+entries_gauge = registry.gauge("feed_cache_entries", "Entries held by the feed cache")
+hit_ratio_gauge = registry.gauge(
+    "feed_cache_hit_ratio", "Share of feed cache lookups served from cache"
+)
+
+
+class _Entry:
+    __slots__ = ("group", "value", "size", "stored_at")
+
+    def __init__(self, group: str, value: Any, size: int):
+        self.group = group
+        self.value = value
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class FeedCache:
+    """LRU cache of serialized feed pages, bounded by entry count and bytes.
+
+    Entries are grouped by user group so writes can drop every page of a
+    group at once. Entries older than ``ttl`` but within ``stale_ttl`` are
+    still served while a single background refresh replaces them.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = settings.FEED_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.FEED_CACHE_MAX_BYTES,
+        ttl: float = settings.FEED_CACHE_TTL_SECONDS,
+        stale_ttl: float = settings.FEED_CACHE_STALE_SECONDS,
+        enabled: bool = settings.FEED_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_group: Dict[str, Set[Hashable]] = {}
+        self._generations: Dict[str, int] = {}
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self.bytes_used = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _record(self, result: str):
+        requests_total.inc(result=result)
+        hit_ratio_gauge.set(self.hit_ratio)
+
+    def _publish_size(self):
+        bytes_gauge.set(self.bytes_used)
+        entries_gauge.set(len(self._entries))
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes_used -= entry.size
+        keys = self._by_group.get(entry.group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_group[entry.group]
+
+    def _store(self, group: str, key: Hashable, value: Any, size: int, generation: int):
+        if self._generations.get(group, 0) != generation:
+            # The group was written to while this page was being built.
+            return
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = _Entry(group, value, size)
+        self._by_group.setdefault(group, set()).add(key)
+        self.bytes_used += size
+        while len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            evictions_total.inc()
+        self._publish_size()
+
+    async def _refresh(self, group: str, key: Hashable, loader: Loader, generation: int):
+        try:
+            value, size = await loader()
+            self._store(group, key, value, size, generation)
+        except Exception:
+            logger.exception("Background feed cache refresh failed")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_load(
+        self,
+        group: str,
+        key: Hashable,
+        loader: Loader,
+        refresher: Optional[Loader] = None,
+    ) -> Any:
+        if not self.enabled:
+            value, _ = await loader()
+            return value
+
+        key = (group, key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._record("hit")
+                return entry.value
+            if age <= self.ttl + self.stale_ttl and refresher is not None:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._record("stale")
+                if key not in self._refreshing:
+                    generation = self._generations.get(group, 0)
+                    self._refreshing[key] = asyncio.create_task(
+                        self._refresh(group, key, refresher, generation)
+                    )
+                return entry.value
+
+        self.misses += 1
+        self._record("miss")
+        generation = self._generations.get(group, 0)
+        value, size = await loader()
+        self._store(group, key, value, size, generation)
+        return value
+
+    def invalidate_group(self, *groups: str):
+        for group in groups:
+            self._generations[group] = self._generations.get(group, 0) + 1
+            for key in list(self._by_group.get(group, ())):
+                self._drop(key)
+        self._publish_size()
+
+    def clear(self):
+        self._entries.clear()
+        self._by_group.clear()
+        self._generations.clear()
+        self.bytes_used = 0
+        self._publish_size()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes_used,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.core.metrics import registry
+
+# Session.info flag: the current transaction has written, whether by flush
+# or by a Core INSERT/UPDATE/DELETE run through the session.
+_WROTE = "single_flight_wrote"
+
+coalesced_total = registry.counter(
+    "db_coalesced_queries_total", "Read queries answered by joining an identical in-flight query"
+)
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+class SingleFlight:
+    """Coalesces identical concurrent reads into one DB round trip.
+
+    The first caller (the leader) runs the query on its own session; callers
+    arriving while it is in flight await the same result instead of sending
+    the statement again. Only fully fetched ``Row`` tuples are shared: they
+    are immutable and belong to no session, so each caller builds its own
+    dicts from them and runs its own permission checks. A follower may see
+    the result of a query that started slightly before it arrived, but never
+    one that started before a commit it could have observed: every commit in
+    the process advances ``epoch``, which is part of the key, so reads after
+    a write start a fresh query (read-your-writes).
+    """
+
+    def __init__(self, enabled: bool = settings.COALESCE_ENABLED):
+        self.enabled = enabled
+        self.epoch = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def invalidate(self):
+        """Stop new callers from joining queries already in flight."""
+        self.epoch += 1
+
+    def key(self, db: AsyncSession, stmt) -> Optional[Hashable]:
+        if not self.enabled or db.new or db.dirty or db.deleted or db.info.get(_WROTE):
+            # Pending or uncommitted writes must be visible to this session's
+            # own reads, and to no one else's.
+            return None
+        cache_key = stmt._generate_cache_key()
+        if cache_key is None:
+            return None
+        try:
+            params = tuple(_freeze(bind.effective_value) for bind in cache_key.bindparams)
+        except TypeError:
+            return None
+        return (db.bind, self.epoch, cache_key.key, params)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        shared = self._calls.get(key)
+        if shared is not None:
+            try:
+                result = await asyncio.shield(shared)
+            except _LeaderCancelled:
+                return await call()
+            coalesced_total.inc()
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # The leader's client went away; followers run their own query.
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            # Mark the exception retrieved when nobody was waiting for it.
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    async def fetch_all(self, db: AsyncSession, stmt) -> Sequence[Row]:
+        key = self.key(db, stmt)
+
+        async def run():
+            return (await db.execute(stmt)).all()
+
+        if key is None:
+            return await run()
+        return await self.do(key, run)
+
+
+single_flight = SingleFlight()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, flush_context):
+    session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_written(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_WROTE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    session.info.pop(_WROTE, None)
+    single_flight.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session):
+    session.info.pop(_WROTE, None)
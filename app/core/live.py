@@ -0,0 +1,367 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set
+
+from app import schemas
+from app.config.settings import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_LIMIT = 7900
+
+subscribers_gauge = registry.gauge("live_subscribers", "Open live feed subscriptions")
+published_total = registry.counter("live_events_published_total", "Comment events published, by type")
+dropped_total = registry.counter(
+    "live_subscribers_dropped_total", "Live feed subscribers dropped for falling behind"
+)
+bus_dropped_total = registry.counter(
+    "live_bus_dropped_total", "Events not sent to other workers because the outbox was full"
+)
+
+
+class LiveEvent:
+    """A comment event for one group. The wire message, SSE frame and any
+    other representation in ``shared`` are built once and shared by every
+    subscriber."""
+
+    __slots__ = ("type", "group", "data", "_message", "_frame", "_shared")
+
+    def __init__(self, type: str, group: str, data: Dict[str, Any]):
+        self.type = type
+        self.group = group
+        self.data = data
+        self._message: Optional[str] = None
+        self._frame: Optional[str] = None
+        self._shared: Dict[str, Any] = {}
+
+    @property
+    def name(self) -> str:
+        return f"comment.{self.type}"
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = json.dumps({"type": self.name, "data": self.data}, separators=(",", ":"))
+        return self._message
+
+    @property
+    def frame(self) -> str:
+        if self._frame is None:
+            self._frame = f"event: {self.name}\ndata: {self.message}\n\n"
+        return self._frame
+
+    def shared(self, key: str, build: Callable[["LiveEvent"], Any]) -> Any:
+        if key not in self._shared:
+            self._shared[key] = build(self)
+        return self._shared[key]
+
+
+# Put on a subscription's queue in place of its backlog when it is dropped.
+DROPPED = LiveEvent("dropped", "", {})
+
+
+class Subscription:
+    def __init__(
+        self, broker: "Broker", group: str, size: int, types: Optional[FrozenSet[str]] = None
+    ):
+        self.broker = broker
+        self.group = group
+        self.types = types
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+        self.dropped = False
+
+    def deliver(self, event: LiveEvent) -> bool:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[LiveEvent]:
+        """The next event, ``DROPPED`` once dropped, or None on timeout."""
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class LocalBus:
+    """Delivers events to this process only; enough for a single worker."""
+
+    def __init__(self):
+        self.deliver: Callable[[LiveEvent], None] = lambda event: None
+
+    async def start(self, deliver: Callable[[LiveEvent], None]):
+        self.deliver = deliver
+
+    def publish(self, event: LiveEvent):
+        self.deliver(event)
+
+    async def stop(self):
+        pass
+
+
+class PostgresBus:
+    """Carries events between workers over Postgres LISTEN/NOTIFY.
+
+    Events are delivered to local subscribers straight away and queued for
+    a sender task, which NOTIFYs the other workers on a dedicated asyncpg
+    connection outside the SQLAlchemy pool. When the outbox is full the
+    event still reaches this worker's subscribers and is only counted as
+    lost to the others. Payloads over the NOTIFY limit carry the comment id
+    instead of its data, and each receiving worker loads it once.
+
+    The connection also receives the other workers' events, so it is
+    reconnected as soon as asyncpg reports it closed, and checked with a
+    ``SELECT 1`` after every ``heartbeat`` seconds without events to catch
+    drops that are never reported. Events sent while it is down are missed.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        channel: str = "comment_events",
+        outbox_size: int = settings.LIVE_OUTBOX_SIZE,
+        heartbeat: float = settings.LIVE_HEARTBEAT_SECONDS,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.heartbeat = heartbeat
+        self.origin = uuid.uuid4().hex
+        self.deliver: Callable[[LiveEvent], None] = lambda event: None
+        self._outbox: asyncio.Queue = asyncio.Queue(outbox_size)
+        self._lost = asyncio.Event()
+        self._conn = None
+        self._task: Optional[asyncio.Task] = None
+        self._loads: Set[asyncio.Task] = set()
+
+    async def start(self, deliver: Callable[[LiveEvent], None]):
+        self.deliver = deliver
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, event: LiveEvent):
+        self.deliver(event)
+        try:
+            self._outbox.put_nowait(self.encode(event))
+        except asyncio.QueueFull:
+            bus_dropped_total.inc()
+
+    def encode(self, event: LiveEvent) -> str:
+        body = {"origin": self.origin, "type": event.type, "group": event.group, "data": event.data}
+        payload = json.dumps(body, separators=(",", ":"))
+        if len(payload.encode()) > NOTIFY_LIMIT:
+            body["data"] = None
+            body["id"] = event.data["id"]
+            payload = json.dumps(body, separators=(",", ":"))
+        return payload
+
+    async def _connect(self):
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminate)
+        self._lost.clear()
+        return conn
+
+    def _on_terminate(self, connection):
+        if connection is self._conn:
+            logger.warning("Live event bus connection closed; reconnecting")
+            self._lost.set()
+
+    async def _next_payload(self) -> Optional[str]:
+        """The next outbox payload, or None when the connection is lost or
+        after ``heartbeat`` seconds without one."""
+        get = asyncio.ensure_future(self._outbox.get())
+        lost = asyncio.ensure_future(self._lost.wait())
+        try:
+            await asyncio.wait(
+                {get, lost}, timeout=self.heartbeat, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            lost.cancel()
+            get.cancel()
+        return get.result() if get.done() and not get.cancelled() else None
+
+    async def _run(self):
+        delay = 0.5
+        payload = None
+        reconnecting = False
+        while True:
+            try:
+                if self._conn is None or self._conn.is_closed() or self._lost.is_set():
+                    reconnecting = reconnecting or self._conn is not None
+                    await self._close()
+                    self._conn = await self._connect()
+                    if reconnecting:
+                        logger.info("Live event bus reconnected")
+                    reconnecting = False
+                    delay = 0.5
+                if payload is None:
+                    payload = await self._next_payload()
+                if payload is None:
+                    if not self._lost.is_set():
+                        await self._conn.execute("SELECT 1")
+                    continue
+                await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                payload = None
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Live event bus connection failed; retrying in %.1fs", delay)
+                reconnecting = True
+                await self._close()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        message = json.loads(payload)
+        if message["origin"] == self.origin:
+            return
+        if message["data"] is None:
+            task = asyncio.create_task(self._load_and_deliver(message))
+            self._loads.add(task)
+            task.add_done_callback(self._loads.discard)
+            return
+        self.deliver(LiveEvent(message["type"], message["group"], message["data"]))
+
+    async def _load_and_deliver(self, message: dict):
+        data = await load_comment(message["id"])
+        if data is not None:
+            self.deliver(LiveEvent(message["type"], message["group"], data))
+
+    async def _close(self):
+        # Cleared first, so our own close is not reported as a lost connection.
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close()
+
+
+def comment_data(comment) -> Dict[str, Any]:
+    """Event data for a comment loaded with its user, shaped like the REST
+    response."""
+    return schemas.Comment.model_validate(comment).model_dump(mode="json")
+
+
+async def load_comment(comment_id: int) -> Optional[Dict[str, Any]]:
+    from app import repositories
+    from app.config.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        comment = await repositories.comment.get_with_user(db, id=comment_id)
+        return comment_data(comment) if comment is not None else None
+
+
+def create_bus(engine=None):
+    if settings.LIVE_BUS == "postgres":
+        if engine is None:
+            from app.config.database import engine
+
+        if engine.dialect.name == "postgresql":
+            url = engine.url.set(drivername="postgresql")
+            return PostgresBus(url.render_as_string(hide_password=False))
+        logger.warning("LIVE_BUS=postgres needs a Postgres database; using the local bus")
+    return LocalBus()
+
+
+class Broker:
+    """In-process fan-out of comment events to per-group subscribers.
+
+    Every subscriber has a bounded buffer. Publishing never waits: a
+    subscriber whose buffer is full is dropped, its backlog replaced with
+    ``DROPPED``, and it is left to the client to reconnect and catch up
+    with ``GET /comments/?since_id=``.
+    """
+
+    def __init__(self, buffer_size: int = settings.LIVE_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.bus = LocalBus()
+        self.bus.deliver = self.fanout
+        self._groups: Dict[str, Set[Subscription]] = {}
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subs) for subs in self._groups.values())
+
+    def subscribe(self, group: str, types: Optional[Iterable[str]] = None) -> Subscription:
+        """``types`` limits the subscription to those event types; the rest
+        never reach its buffer."""
+        types = frozenset(types) if types is not None else None
+        subscription = Subscription(self, group, self.buffer_size, types)
+        self._groups.setdefault(group, set()).add(subscription)
+        subscribers_gauge.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subs = self._groups.get(subscription.group)
+        if subs is None or subscription not in subs:
+            return
+        subs.discard(subscription)
+        if not subs:
+            del self._groups[subscription.group]
+        subscribers_gauge.dec()
+
+    def publish(self, type: str, group: str, data: Dict[str, Any]):
+        published_total.inc(type=type)
+        self.bus.publish(LiveEvent(type, group, data))
+
+    def fanout(self, event: LiveEvent):
+        for subscription in list(self._groups.get(event.group, ())):
+            if subscription.types is not None and event.type not in subscription.types:
+                continue
+            if not subscription.deliver(event):
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        self._end(subscription)
+        dropped_total.inc()
+
+    def _end(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        queue = subscription.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(DROPPED)
+
+    async def start(self, bus=None):
+        self.bus = bus or create_bus()
+        await self.bus.start(self.fanout)
+
+    async def stop(self):
+        await self.bus.stop()
+        for subs in list(self._groups.values()):
+            for subscription in list(subs):
+                self._end(subscription)
+
+
+broker = Broker()
@@ -1,30 +1,289 @@
-import time
+import asyncio
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import os
+import random
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.core.admission import admission, request_lane
+from app.core.metrics import registry
+from app.core.profiling import MODES, finish_profile, profile_path, start_profile, verify_profile_token
+from app.core.queries import repeated_total, track_queries
+from app.core.security import verify_token
+from app.core.tracing import start_trace, tracer
 
 logger = logging.getLogger(__name__)
 
+requests_total = registry.counter("http_requests_total", "HTTP requests by method, route and status")
+requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+request_seconds = registry.histogram("http_request_duration_seconds", "HTTP request latency by route")
+request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "DB time spent while handling a request, by route"
+)
+request_queries = registry.histogram(
+    "http_request_queries", "SQL statements issued while handling a request, by route",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+
+
+def route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def method_label(scope: Scope) -> str:
+    # Clients can send any verb; bucket the rest so they cannot mint series.
+    method = scope["method"]
+    return method if method in METHODS else "other"
+
+
+class RequestLoggingMiddleware:
+    """Times, meters and access-logs HTTP requests.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so the app runs in the same
+    task and streamed bodies pass straight through. Timing headers reflect
+    the time to the start of the response; metrics and the access log
+    cover the whole request including the body. Access lines are sampled
+    at LOG_SAMPLE_RATE, while slow requests and server errors are always
+    logged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as queries:
+            async def send_with_timing(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    elapsed = time.perf_counter() - started
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-Process-Time", f"{elapsed:.6f}")
+                    timing = f"app;dur={elapsed * 1000:.2f}"
+                    if settings.DEBUG:
+                        timing += f', db;dur={queries.duration * 1000:.2f};desc="{queries.count} queries"'
+                    headers.append("Server-Timing", timing)
+                await send(message)
+
+            requests_in_flight.inc()
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                requests_in_flight.dec()
+                self.record(scope, status_code, time.perf_counter() - started, queries)
+
+    def record(self, scope: Scope, status_code: int, elapsed: float, queries):
+        method = method_label(scope)
+        route = route_label(scope)
+        requests_total.inc(method=method, route=route, status=status_code)
+        request_seconds.observe(elapsed, method=method, route=route)
+        request_db_seconds.observe(queries.duration, method=method, route=route)
+        request_queries.observe(queries.count, method=method, route=route)
+
+        for shape, count in queries.repeated(settings.QUERY_REPEAT_THRESHOLD):
+            repeated_total.inc(method=method, route=route)
+            logger.warning(
+                "Possible N+1: %s %s ran the same statement %d times: %.200s",
+                method, route, count, shape,
+            )
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= settings.SLOW_REQUEST_THRESHOLD_MS or status_code >= 500:
+            level = logging.WARNING
+        elif settings.LOG_SAMPLE_RATE >= 1 or random.random() < settings.LOG_SAMPLE_RATE:
+            level = logging.INFO
+        else:
+            return
+        if logger.isEnabledFor(level):
+            client = scope.get("client")
+            logger.log(
+                level,
+                "%s %s %d %.1fms - %d queries %.1fms - Client: %s",
+                scope["method"], scope["path"], status_code, elapsed_ms,
+                queries.count, queries.duration * 1000, client[0] if client else "UNKNOWN",
+            )
+
+
+class TracingMiddleware:
+    """Opens the root span for each HTTP request, continuing the caller's
+    trace from a W3C ``traceparent`` header and returning this request's
+    ``traceparent`` so clients can find it in the exported traces.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        with start_trace(f"{method} {scope['path']}", traceparent, **{"http.method": method}) as root:
+            async def send_with_traceparent(message: Message):
+                if message["type"] == "http.response.start":
+                    root.set_attribute("http.status_code", message["status"])
+                    MutableHeaders(scope=message).append("traceparent", root.traceparent)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_traceparent)
+            finally:
+                # The route is only known once routing has run.
+                route = route_label(scope)
+                root.name = f"{method} {route}"
+                root.set_attribute("http.route", route)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry a token from ``POST /admin/profile-token``
+    in an ``X-Profile`` header, together with the bearer token of the admin
+    it was issued to. Tokens are never read from the query string, where
+    they would end up in proxy logs.
+
+    ``X-Profile-Mode`` picks ``cprofile`` (pstats, the default) or
+    ``sample`` (speedscope). The profile is written under
+    ``LOG_DIR/profiles`` and its file name returned in ``X-Profile-File``.
+    Only installed when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token, mode = self.requested(scope)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+        if not verify_profile_token(token, self.requester(scope)):
+            logger.warning("Ignoring invalid profile token for %s %s", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        path = profile_path(scope["method"], scope["path"], mode)
+        profiler = start_profile(mode)
+        if profiler is None:
+            logger.warning("Not profiling %s %s: another profile is running", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_profile(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", os.path.basename(path))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            await asyncio.to_thread(finish_profile, profiler, path)
+            logger.info("Profiled %s %s to %s", scope["method"], scope["path"], path)
+
+    @staticmethod
+    def requested(scope: Scope):
+        headers = dict(scope["headers"])
+        token = headers.get(b"x-profile")
+        mode = headers.get(b"x-profile-mode", b"").decode("latin-1")
+        if token is not None:
+            token = token.decode("latin-1")
+        return token, mode if mode in MODES else "cprofile"
+
+    @staticmethod
+    def requester(scope: Scope) -> str:
+        # Username from the bearer token; checked again by the route itself.
+        authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+        scheme, _, credentials = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return ""
+        try:
+            return verify_token(credentials).get("sub") or ""
+        except Exception:
+            return ""
+
+
+class AdmissionMiddleware:
+    """Admits requests through the admission controller and sheds the rest
+    with 503 and ``Retry-After``. Routes whose endpoint is marked with
+    ``admission_exempt`` (probes, metrics) bypass it, so a loaded worker
+    still reports itself healthy.
+
+    A streamed response (SSE, exports, multipart GraphQL subscriptions)
+    gives its slot back once the first chunk of its body is sent, rather
+    than holding it for as long as the client stays connected.
+    """
+
+    def __init__(self, app: ASGIApp, controller=admission):
+        self.app = app
+        self.controller = controller
+
+    @staticmethod
+    def exempt(scope: Scope) -> bool:
+        # Routing has not run yet, so match the app's routes here.
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match is Match.FULL:
+                return getattr(getattr(route, "endpoint", None), "admission_exempt", False)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self.exempt(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(request_lane(scope["method"], scope["path"])):
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        latency = None
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.controller.release(latency)
+
+        async def send_with_latency(message: Message):
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started
+            elif message["type"] == "http.response.body" and message.get("more_body"):
+                release()
+            await send(message)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
-        
-        logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"- Client: {request.client.host if request.client else 'UNKNOWN'}"
-        )
-        
-        response = await call_next(request)
-        
-        process_time = time.time() - start_time
-        
-        logger.info(
-            f"Response: {response.status_code} "
-            f"- Processed in {process_time:.4f}s"
-        )
-        
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
\ No newline at end of file
+        try:
+            await self.app(scope, receive, send_with_latency)
+        finally:
+            release()
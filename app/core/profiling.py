@@ -0,0 +1,150 @@
+"""On-demand profiling of single requests.
+
+A request carrying a valid profile token (see ``create_profile_token``) and
+the access token of the admin it was issued to runs
+under either cProfile, written as a pstats file, or a stack sampler, written
+as speedscope JSON (https://www.speedscope.app). Both observe the event loop
+thread, so other requests handled concurrently show up in the profile too.
+"""
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from app.config.settings import settings
+
+MODES = ("cprofile", "sample")
+
+_active = threading.Lock()
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def _sign(username: str, expires: int) -> str:
+    message = f"profile:{username}:{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def create_profile_token(username: str, ttl_seconds: int = 300) -> Tuple[str, datetime]:
+    """A token that profiles requests authenticated as ``username`` until it
+    expires; on its own it is useless to anyone who intercepts it."""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_sign(username, expires)}", datetime.fromtimestamp(expires, timezone.utc)
+
+
+def verify_profile_token(token: str, username: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not username or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(username, int(expires)))
+
+
+def profile_path(method: str, path: str, mode: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = _UNSAFE.sub("_", path).strip("_")[:80] or "root"
+    suffix = ".speedscope.json" if mode == "sample" else ".prof"
+    name = f"{stamp}-{method.lower()}-{slug}-{os.urandom(3).hex()}{suffix}"
+    return os.path.join(settings.LOG_DIR, "profiles", name)
+
+
+class _CProfile:
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def write(self, path: str):
+        self._profile.dump_stats(path)
+
+
+class _Sampler:
+    """Samples the calling thread's stack from a helper thread every
+    ``interval`` seconds; cheap enough to leave the request's timing close
+    to unprofiled."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.target = threading.get_ident()
+        self.frames: List[dict] = []
+        self._frame_index: Dict[tuple, int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            now = time.perf_counter()
+            if frame is not None:
+                self.samples.append(self._stack(frame))
+                self.weights.append((now - last) * 1000)
+            last = now
+
+    def _stack(self, frame) -> List[int]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self.frames)
+                self.frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": self.frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": os.path.basename(path),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": self.samples,
+                "weights": self.weights,
+            }],
+        }
+        with open(path, "w", encoding="utf8") as handle:
+            json.dump(document, handle, separators=(",", ":"))
+
+
+def start_profile(mode: str):
+    """Start profiling the current thread, or return None when another
+    request is already being profiled (only one profiler can be active)."""
+    if not _active.acquire(blocking=False):
+        return None
+    try:
+        if mode == "sample":
+            return _Sampler(settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
+        return _CProfile()
+    except Exception:
+        _active.release()
+        raise
+
+
+def finish_profile(profiler, path: str):
+    try:
+        profiler.stop()
+    finally:
+        _active.release()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    profiler.write(path)
@@ -0,0 +1,123 @@
+import re
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import registry
+from app.core.tracing import current_span, tracer
+
+queries_total = registry.counter("db_queries_total", "SQL statements executed")
+query_seconds_total = registry.counter("db_query_seconds_total", "Time spent executing SQL statements")
+repeated_total = registry.counter(
+    "db_repeated_statement_warnings_total", "Requests that repeated one statement shape past the threshold"
+)
+
+# Placeholder lists of any length ("(?, ?, ?)", "($1, $2)") collapse to one
+# shape so IN-lists of different sizes count as the same statement.
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%s|%\(\w+\)s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements and DB time recorded while a ``track_queries`` block is
+    active. Nested blocks also count towards their parents."""
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Tally = Tally()
+
+    def record(self, statement: str, duration: float):
+        stats = self
+        shape = statement_shape(statement)
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            stats.shapes[shape] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        return "\n".join(f"{n:>4} x {shape}" for shape, n in self.shapes.most_common())
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+    # Statements only join an existing trace; background work is not traced.
+    parent = current_span() if tracer.enabled else None
+    context._query_span = parent and tracer.start_span(
+        "db.query", parent, **{"db.system": conn.dialect.name, "db.statement": statement}
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    if context._query_span is not None:
+        context._query_span.end()
+    queries_total.inc()
+    query_seconds_total.inc(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine: AsyncEngine) -> AsyncEngine:
+    """Count statements and their execution time on ``engine``.
+
+    SQLAlchemy runs async engines' sync events in a greenlet that shares the
+    caller's context, so the active ``track_queries`` block is visible here.
+    """
+    target = engine.sync_engine
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+pool_size = registry.gauge("db_pool_size", "Configured connection pool size")
+pool_checked_out = registry.gauge("db_pool_checked_out", "Pool connections currently in use")
+pool_checked_in = registry.gauge("db_pool_checked_in", "Idle connections held by the pool")
+pool_overflow = registry.gauge("db_pool_overflow", "Connections opened beyond the pool size")
+
+
+def register_pool_metrics(engine: AsyncEngine):
+    """Publish ``engine``'s pool counters at scrape time; reading them is a
+    few attribute lookups, so nothing is tracked on checkout/checkin."""
+    pool = engine.sync_engine.pool
+
+    @registry.collector
+    def collect():
+        # Pools without a fixed size (StaticPool, NullPool) lack these.
+        for gauge, reader in (
+            (pool_size, "size"),
+            (pool_checked_out, "checkedout"),
+            (pool_checked_in, "checkedin"),
+            (pool_overflow, "overflow"),
+        ):
+            if hasattr(pool, reader):
+                gauge.set(getattr(pool, reader)())
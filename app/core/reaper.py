@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app import repositories
+from app.config.database import AsyncSessionLocal
+from app.config.settings import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+purged_total = registry.counter(
+    "comment_reaper_purged_total", "Tombstoned comments purged by the reaper"
+)
+batches_total = registry.counter(
+    "comment_reaper_batches_total", "Purge batches executed by the reaper"
+)
+backlog_gauge = registry.gauge(
+    "comment_reaper_backlog", "Tombstoned comments waiting to be purged"
+)
+batch_seconds_gauge = registry.gauge(
+    "comment_reaper_last_batch_seconds", "Duration of the last purge batch"
+)
+
+
+class TombstoneReaper:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        *,
+        batch_size: int = settings.REAPER_BATCH_SIZE,
+        interval: float = settings.REAPER_INTERVAL_SECONDS,
+        batch_pause: float = settings.REAPER_BATCH_PAUSE_SECONDS,
+        max_batches: int = settings.REAPER_MAX_BATCHES_PER_RUN,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch_pause = batch_pause
+        self.max_batches = max_batches
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        purged = 0
+        async with self.session_factory() as db:
+            for _ in range(self.max_batches):
+                started = time.perf_counter()
+                count = await repositories.comment.purge_tombstoned(db, limit=self.batch_size)
+                if count:
+                    batches_total.inc()
+                    purged_total.inc(count)
+                    batch_seconds_gauge.set(time.perf_counter() - started)
+                purged += count
+                if count < self.batch_size:
+                    break
+                # Small pauses between batches keep lock hold times and WAL
+                # bursts bounded while there is a large backlog.
+                await asyncio.sleep(self.batch_pause)
+            backlog_gauge.set(await repositories.comment.count_tombstoned(db))
+            await db.commit()
+        return purged
+
+    async def _run(self):
+        while True:
+            try:
+                purged = await self.run_once()
+                if purged:
+                    logger.info("Reaper purged %d tombstoned comments", purged)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reaper run failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+reaper = TombstoneReaper()
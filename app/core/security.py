@@ -1,11 +1,18 @@
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union, Optional
+from typing import Any, Optional, Tuple, Union
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.config.settings import settings
+from app.core.metrics import registry
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+password_hash_seconds = registry.histogram(
+    "password_hash_seconds", "Time spent hashing and verifying passwords",
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -21,6 +28,18 @@ def create_access_token(
     return encoded_jwt
 
 
+# Scope of tokens that only open live streams. They may travel in a query
+# string, where proxies log them, so they are short-lived and rejected
+# everywhere else.
+STREAM_SCOPE = "stream"
+
+
+def create_stream_token(subject: Union[str, Any]) -> Tuple[str, datetime]:
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    to_encode = {"exp": expire, "sub": str(subject), "scope": STREAM_SCOPE}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256"), expire
+
+
 def verify_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
@@ -30,8 +49,16 @@ def verify_token(token: str) -> dict:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    started = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        password_hash_seconds.observe(time.perf_counter() - started, operation="verify")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    started = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        password_hash_seconds.observe(time.perf_counter() - started, operation="hash")
\ No newline at end of file
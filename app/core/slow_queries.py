@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import app
+from app.config.settings import settings
+from app.core.metrics import registry
+from app.core.queries import instrument_engine, statement_shape
+
+logger = logging.getLogger("app.slow_queries")
+
+slow_queries_total = registry.counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_THRESHOLD_MS")
+
+_APP_ROOT = os.path.dirname(app.__file__)
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_APP_ROOT, "core", "queries.py")}
+# Only plain reads are re-run under EXPLAIN ANALYZE, which executes them.
+_EXPLAINABLE = ("select",)
+# Per statement shape, capture at most one plan in this many seconds.
+EXPLAIN_COOLDOWN_SECONDS = 60.0
+
+
+def redact(value: Any) -> Any:
+    """Keep values that identify rows (numbers, dates, booleans, None) and
+    replace anything that may carry user data with its type and size."""
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(value)}>"
+    if isinstance(value, str):
+        return f"<str len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _frames():
+    frame = sys._getframe(1)
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    # Async engines run the statement in a child greenlet; the awaiting
+    # coroutine's frames live on the parent greenlet's stack.
+    parent = getcurrent().parent
+    frame = parent.gr_frame if parent is not None else None
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def call_site() -> Optional[str]:
+    for frame in _frames():
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_ROOT) and filename not in _SKIP_FILES:
+            relative = os.path.relpath(filename, os.path.dirname(_APP_ROOT))
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+    return None
+
+
+class SlowQueryLog:
+    """Statements slower than SLOW_QUERY_THRESHOLD_MS, kept in a ring buffer
+    for the admin endpoint and written to the slow query log.
+
+    With SLOW_QUERY_EXPLAIN on Postgres, slow SELECTs are re-run under
+    ``EXPLAIN (ANALYZE, BUFFERS)`` in a background task on a separate,
+    rolled-back connection, and the plan is attached to the entry.
+    """
+
+    def __init__(self, size: int = settings.SLOW_QUERY_BUFFER_SIZE):
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._engines: "WeakKeyDictionary[Any, AsyncEngine]" = WeakKeyDictionary()
+        self._explained: Dict[str, float] = {}
+        self._tasks = set()
+
+    def watch(self, engine: AsyncEngine) -> AsyncEngine:
+        # Relies on the start time instrument_engine stamps on each execution.
+        instrument_engine(engine)
+        self._engines[engine.sync_engine] = engine
+        if not event.contains(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute):
+            event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        return engine
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            if context.execution_options.get("slow_query_log", True):
+                self.record(conn, statement, parameters, elapsed)
+
+    def record(self, conn, statement: str, parameters, elapsed: float):
+        entry = {
+            "timestamp": datetime.now(timezone.utc),
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": statement,
+            "parameters": redact(parameters),
+            "call_site": call_site(),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        slow_queries_total.inc()
+        logger.warning(
+            "Slow query %.1fms at %s: %s -- params %s",
+            entry["duration_ms"], entry["call_site"], statement, entry["parameters"],
+        )
+
+        if settings.SLOW_QUERY_EXPLAIN and conn.dialect.name == "postgresql":
+            self._schedule_explain(conn, statement, parameters, entry)
+
+    def _schedule_explain(self, conn, statement: str, parameters, entry: dict):
+        if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+            return
+        engine = self._engines.get(conn.engine)
+        if engine is None:
+            return
+        shape = statement_shape(statement)
+        now = time.monotonic()
+        if now - self._explained.get(shape, float("-inf")) < EXPLAIN_COOLDOWN_SECONDS:
+            return
+        self._explained[shape] = now
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(engine, statement, parameters, entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, statement: str, parameters, entry: dict):
+        try:
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(slow_query_log=False)
+                async with conn.begin() as transaction:
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                    )
+                    entry["plan"] = "\n".join(row[0] for row in result)
+                    await transaction.rollback()
+            logger.warning("Plan for slow query at %s:\n%s", entry["call_site"], entry["plan"])
+        except Exception:
+            logger.exception("Could not capture plan for slow query at %s", entry["call_site"])
+
+    def recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return list(reversed(self.entries))[:limit]
+
+    def clear(self):
+        self.entries.clear()
+        self._explained.clear()
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,336 @@
+"""Lightweight in-process tracing.
+
+Spans nest through a contextvar, so a request's root span (opened by
+TracingMiddleware) parents the auth, repository, DB, permission and
+serialization spans opened beneath it. When a trace's local root span ends
+the whole trace is handed to the exporter, which writes OTLP/JSON from a
+background thread.
+
+With tracing disabled ``span()`` returns a shared no-op and wrapped
+functions call straight through, so instrumentation costs one attribute
+check.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+traces_dropped_total = registry.counter(
+    "traces_dropped_total", "Finished traces dropped because the export queue was full"
+)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class _Trace:
+    __slots__ = ("root", "spans")
+
+    def __init__(self):
+        self.root: Optional["Span"] = None
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("_trace", "trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace: _Trace, trace_id: str, parent_id: Optional[str], attributes: dict):
+        self._trace = trace
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        self._trace.spans.append(self)
+        if self._trace.root is self:
+            tracer.export(list(self._trace.spans))
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self._trace.root is self else 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def otlp_document(spans: List[Span]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", settings.PROJECT_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "app"},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }]
+    }
+
+
+class BackgroundExporter:
+    """Hands finished traces to a worker thread so exporting never blocks the
+    event loop; traces beyond ``max_queue`` are dropped and counted."""
+
+    def __init__(self, max_queue: int = 1000):
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, spans: List[Span]):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            traces_dropped_total.inc()
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                self.write(spans)
+            except Exception:
+                logger.exception("Trace export failed")
+
+    def write(self, spans: List[Span]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class FileExporter(BackgroundExporter):
+    """One OTLP/JSON document per line, as written by the OpenTelemetry
+    collector's file exporter."""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def write(self, spans: List[Span]):
+        line = json.dumps(otlp_document(spans), separators=(",", ":"))
+        with open(self.path, "a", encoding="utf8") as handle:
+            handle.write(line + "\n")
+
+
+class OTLPHttpExporter(BackgroundExporter):
+    """POSTs OTLP/JSON to a collector's ``/v1/traces`` endpoint."""
+
+    def __init__(self, endpoint: str, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self._client = None
+
+    def write(self, spans: List[Span]):
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.Client(timeout=5.0)
+        self._client.post(self.endpoint, json=otlp_document(spans)).raise_for_status()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.exporter = None
+
+    def configure(self, exporter):
+        self.shutdown()
+        self.exporter = exporter
+        self.enabled = exporter is not None
+
+    def start_span(
+        self, name: str, parent: Optional[Span] = None,
+        remote: Optional[Tuple[str, str]] = None, **attributes,
+    ) -> Span:
+        if parent is not None:
+            return Span(name, parent._trace, parent.trace_id, parent.span_id, attributes)
+        trace = _Trace()
+        trace_id, parent_id = remote if remote else (os.urandom(16).hex(), None)
+        trace.root = Span(name, trace, trace_id, parent_id, attributes)
+        return trace.root
+
+    def export(self, spans: List[Span]):
+        if self.exporter is not None:
+            self.exporter.export(spans)
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+        self.exporter = None
+        self.enabled = False
+
+
+tracer = Tracer()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    trace_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self.token)
+        self.span.end()
+        return False
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def span(name: str, **attributes):
+    """``with span("name", key=value) as s:`` -- a child of the current span,
+    or a new trace when there is none."""
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return _ActiveSpan(tracer.start_span(name, _current.get(), **attributes))
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    if header:
+        match = _TRACEPARENT.match(header.strip().lower())
+        if match and match.group(1) != "0" * 32 and match.group(2) != "0" * 16:
+            return match.group(1), match.group(2)
+    return None
+
+
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """Open a local root span, continuing the caller's trace when a valid
+    W3C ``traceparent`` header is given."""
+    if not tracer.enabled:
+        return NOOP_SPAN
+    return _ActiveSpan(tracer.start_span(name, remote=parse_traceparent(traceparent), **attributes))
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping a function, coroutine function or method in a span.
+
+    Methods get ``<class>.<method>`` named after the instance's class, so
+    inherited repository methods are told apart.
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+        is_method = "." in fn.__qualname__ and name is None
+        method_name = fn.__name__
+
+        def span_name(args) -> str:
+            return f"{type(args[0]).__name__}.{method_name}" if is_method and args else label
+
+        if inspect.iscoroutinefunction(fn):
+            async def run(args, kwargs):
+                with span(span_name(args)):
+                    return await fn(*args, **kwargs)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                # Returns fn's own coroutine when disabled: no extra frame.
+                if not tracer.enabled:
+                    return fn(*args, **kwargs)
+                return run(args, kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return fn(*args, **kwargs)
+                with span(span_name(args)):
+                    return fn(*args, **kwargs)
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorate
+
+
+def trace_methods(cls):
+    """Class decorator: trace every public coroutine method defined on
+    ``cls`` (async generators are left alone)."""
+    for attr, value in list(vars(cls).items()):
+        if (
+            not attr.startswith("_")
+            and inspect.iscoroutinefunction(value)
+            and not getattr(value, "__traced__", False)
+        ):
+            setattr(cls, attr, traced()(value))
+    return cls
+
+
+def setup_tracing():
+    if not settings.TRACING_ENABLED:
+        return
+    if settings.TRACING_OTLP_ENDPOINT:
+        exporter = OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT)
+    else:
+        os.makedirs(settings.LOG_DIR, exist_ok=True)
+        exporter = FileExporter(os.path.join(settings.LOG_DIR, "traces.jsonl"))
+    tracer.configure(exporter)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app import repositories
+from app.config.database import AsyncSessionLocal, engine as default_engine
+from app.config.settings import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+startup_seconds = registry.gauge("app_startup_seconds", "Time spent in each startup phase")
+ready_gauge = registry.gauge("app_ready", "1 once startup warm-up has finished")
+
+
+async def _open_connections(engine: AsyncEngine, count: int):
+    # Held open together so the pool really creates ``count`` connections
+    # instead of handing the same one back each time.
+    pool = engine.sync_engine.pool
+    if hasattr(pool, "size"):
+        count = min(count, pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            conn = await engine.connect()
+            connections.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+async def _run_hot_queries(session_factory: async_sessionmaker):
+    # Compiles (and on asyncpg, prepares) the statements behind the busiest
+    # endpoints. Keys that match no rows keep this cheap on a full database.
+    async with session_factory() as db:
+        await repositories.user.get_by_username(db, username="")
+        await repositories.comment.get_feed_version(db, user_group="")
+        await repositories.comment.get_by_user_group_rows(db, user_group="", limit=1)
+        await repositories.comment.get(db, id=0)
+        await repositories.comment.get_author_group(db, id=0)
+        await repositories.comment_history.get_watermark(db, comment_id=0)
+        await repositories.comment_history.get_rows_by_comment(db, comment_id=0, limit=1)
+        await repositories.stats.get_group_stats(db, group="")
+
+
+async def _prime_graphql():
+    from app.graphql_api.schema import schema
+
+    # Runs strawberry's parse/validate/execute path once without a request.
+    await schema.execute("{ __typename }")
+
+
+# Phases that prove the worker can reach its database; retried until they
+# pass. Other phases only make the first requests faster.
+REQUIRED_PHASES = ("connections", "queries")
+
+
+class Warmup:
+    """Startup warm-up run in the background by the lifespan.
+
+    The server accepts requests straight away, ``GET /ready`` answers 503
+    until every phase has run, and the time each phase took is kept in
+    ``report`` and logged. The database phases are retried with backoff
+    until they succeed, with the latest error kept in ``failed``, so a
+    worker that cannot reach the database never reports ready. Any other
+    phase that fails is logged and skipped: a slow first request beats a
+    worker that never becomes ready.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = default_engine,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        *,
+        connections: int = settings.WARMUP_CONNECTIONS,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30.0,
+    ):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.connections = connections
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.ready = False
+        self.report: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self._started = time.perf_counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, phase: str, seconds: float):
+        self.report[phase] = round(seconds * 1000, 1)
+        startup_seconds.set(seconds, phase=phase)
+
+    async def run(self):
+        phases = [
+            ("graphql", _prime_graphql),
+            ("queries", lambda: _run_hot_queries(self.session_factory)),
+        ]
+        if self.connections > 0:
+            phases.insert(0, ("connections", lambda: _open_connections(self.engine, self.connections)))
+
+        for phase, step in phases:
+            started = time.perf_counter()
+            delay = self.retry_delay
+            while True:
+                try:
+                    await step()
+                    self.failed.pop(phase, None)
+                    break
+                except Exception as exc:
+                    self.failed[phase] = f"{type(exc).__name__}: {exc}"
+                    if phase not in REQUIRED_PHASES:
+                        logger.exception("Warm-up phase %s failed", phase)
+                        break
+                    logger.exception("Warm-up phase %s failed; retrying in %.1fs", phase, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_delay)
+            self.mark(phase, time.perf_counter() - started)
+
+        self.mark("total", time.perf_counter() - self._started)
+        self.ready = True
+        ready_gauge.set(1)
+        logger.info(
+            "Ready after %.1fms (%s)", self.report["total"],
+            ", ".join(f"{phase} {ms}ms" for phase, ms in self.report.items() if phase != "total"),
+        )
+
+    def start(self, started: Optional[float] = None):
+        """``started`` is the ``perf_counter()`` reading the startup time in
+        the report counts from; defaults to now."""
+        if self._task is None:
+            self._started = started if started is not None else time.perf_counter()
+            if settings.WARMUP_ENABLED:
+                self._task = asyncio.create_task(self.run())
+            else:
+                self.mark("total", time.perf_counter() - self._started)
+                self.ready = True
+                ready_gauge.set(1)
+
+    async def stop(self):
+        self.ready = False
+        ready_gauge.set(0)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+warmup = Warmup()
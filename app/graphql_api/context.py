@@ -1,9 +1,49 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
+from contextlib import nullcontext
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import HTTPConnection
+from strawberry.exceptions import ConnectionRejectionError
+
 from app.api import deps
+from app.graphql_api.loaders import Loaders
+from app.models.user import User
+
 
-async def get_context(db: AsyncSession = Depends(deps.get_db), current_user=Depends(deps.get_current_user)):
+async def get_context(
+    connection: HTTPConnection,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Optional[User] = Depends(deps.get_connection_user),
+    session_factory: async_sessionmaker = Depends(deps.get_session_factory),
+):
+    if connection.scope["type"] == "websocket":
+        # Subscriptions stay open; load on short sessions rather than
+        # holding the connection's pooled one.
+        loaders = Loaders(session_factory)
+    else:
+        loaders = Loaders(lambda: nullcontext(db))
     return {
         "db": db,
-        "current_user": current_user
+        "current_user": current_user,
+        "session_factory": session_factory,
+        "loaders": loaders,
     }
+
+
+async def authenticate_connection(context: dict) -> User:
+    """Authenticates a subscription connection from its ``connection_init``
+    payload: ``{"Authorization": "Bearer <token>"}`` or ``{"token": ...}``.
+    The user is loaded on a short-lived session, so an open connection
+    holds no pooled DB connection."""
+    params = context.get("connection_params") or {}
+    token = deps.bearer_token(params.get("Authorization")) or params.get("token")
+    if not isinstance(token, str):
+        raise ConnectionRejectionError()
+    try:
+        async with context["session_factory"]() as db:
+            user = await deps.authenticate(db, token)
+    except HTTPException:
+        raise ConnectionRejectionError()
+    context["current_user"] = user
+    return user
@@ -1,3 +1,7 @@
+from typing import Optional
+
+from app import schemas
+from app.core.live import LiveEvent
 from app.models.user import User
 from app.models.comment import Comment
 from app.models.comment_history import CommentHistory
@@ -12,14 +16,16 @@ def user_to_graphql(user: User) -> UserType:
     )
 
 
-def comment_to_graphql(comment: Comment) -> CommentType:
+def comment_to_graphql(comment: Comment, user: Optional[UserType] = None) -> CommentType:
+    # The author is resolved on demand through the request's loaders unless
+    # passed in.
     return CommentType(
         id=comment.id,
         content=comment.content,
         user_id=comment.user_id,
         created_at=comment.created_at,
         updated_at=comment.updated_at,
-        user=user_to_graphql(comment.user) if hasattr(comment, 'user') and comment.user else None
+        prefetched_user=user,
     )
 
 
@@ -30,4 +36,14 @@ def comment_history_to_graphql(history: CommentHistory) -> CommentHistoryType:
         timestamp=history.timestamp,
         old_value=history.old_value,
         new_value=history.new_value
-    )
\ No newline at end of file
+    )
+
+
+def comment_event_to_graphql(event: LiveEvent) -> CommentType:
+    # Built from the event's data rather than the database, once per event
+    # however many subscribers receive it.
+    def build(event: LiveEvent) -> CommentType:
+        comment = schemas.Comment.model_validate(event.data)
+        return comment_to_graphql(comment, user_to_graphql(comment.user))
+
+    return event.shared("graphql", build)
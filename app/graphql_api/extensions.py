@@ -0,0 +1,105 @@
+import time
+
+from graphql import FieldNode, FragmentDefinitionNode, FragmentSpreadNode, InlineFragmentNode
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+
+from app.core.metrics import registry
+from app.core.tracing import span
+
+operation_seconds = registry.histogram(
+    "graphql_operation_duration_seconds", "GraphQL operation latency by root fields"
+)
+operations_total = registry.counter(
+    "graphql_operations_total", "GraphQL operations by root fields and outcome"
+)
+
+
+INTROSPECTION_FIELDS = {"__typename", "__schema", "__type"}
+
+
+def _selected_names(selection_set, fragments: dict, seen: set) -> set:
+    # Field names at this level, looking through fragment spreads and inline
+    # fragments; ``seen`` stops cycles in documents that fail validation.
+    names = set()
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            names.add(selection.name.value)
+        elif isinstance(selection, InlineFragmentNode):
+            names |= _selected_names(selection.selection_set, fragments, seen)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            if name in fragments and name not in seen:
+                seen.add(name)
+                names |= _selected_names(fragments[name].selection_set, fragments, seen)
+    return names
+
+
+def _root_fields(execution_context) -> str:
+    # Labelled by root field names rather than the client-chosen operation
+    # name. Only fields the root type defines are used, so clients cannot
+    # create new label values; anything else is "invalid".
+    document = execution_context.graphql_document
+    if document is None:
+        return "invalid"
+    operation = get_operation_ast(document, execution_context.operation_name)
+    if operation is None:
+        return "invalid"
+    root = execution_context.schema._schema.get_root_type(operation.operation)
+    if root is None:
+        return "invalid"
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    names = _selected_names(operation.selection_set, fragments, set())
+    if not names or not names <= set(root.fields) | INTROSPECTION_FIELDS:
+        return "invalid"
+    return ",".join(sorted(names))
+
+
+def _operation_type(execution_context) -> str:
+    try:
+        return execution_context.operation_type.value
+    except Exception:
+        return "invalid"
+
+
+class TracingExtension(SchemaExtension):
+    """Spans for the operation and its parse, validate and execute phases;
+    resolvers' repository and DB calls nest under ``graphql.execute``. There
+    is deliberately no per-field hook, which would cost on every field even
+    with tracing off."""
+
+    def on_operation(self):
+        with span("graphql.operation") as operation:
+            yield
+            context = self.execution_context
+            operation.set_attribute("graphql.operation.type", _operation_type(context))
+            operation.set_attribute("graphql.fields", _root_fields(context))
+
+    def on_parse(self):
+        with span("graphql.parse"):
+            yield
+
+    def on_validate(self):
+        with span("graphql.validate"):
+            yield
+
+    def on_execute(self):
+        with span("graphql.execute"):
+            yield
+
+
+class MetricsExtension(SchemaExtension):
+    def on_operation(self):
+        started = time.perf_counter()
+        yield
+        context = self.execution_context
+        fields = _root_fields(context)
+        operation_type = _operation_type(context)
+        result = context.result
+        failed = context.pre_execution_errors or (result is not None and result.errors)
+        operation_seconds.observe(time.perf_counter() - started, type=operation_type, fields=fields)
+        operations_total.inc(type=operation_type, fields=fields, status="error" if failed else "ok")
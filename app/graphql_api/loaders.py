@@ -0,0 +1,46 @@
+import asyncio
+from collections import defaultdict
+from typing import Callable, List, Optional
+
+from strawberry.dataloader import DataLoader
+
+from app import repositories
+from app.graphql_api.models import CommentHistoryType, UserType
+
+
+class Loaders:
+    """Per-request DataLoaders for nested comment fields.
+
+    Every ``load`` made while resolving one level of a query is batched into
+    a single IN query, and results are cached for the rest of the request,
+    so a query over N comments issues a constant number of statements.
+    ``session`` returns an async context manager yielding the session to
+    query on; batches take turns on it, since an AsyncSession runs one
+    statement at a time.
+    """
+
+    def __init__(self, session: Callable):
+        self.session = session
+        self._lock = asyncio.Lock()
+        self.user = DataLoader(load_fn=self._load_users)
+        self.history = DataLoader(load_fn=self._load_history)
+
+    async def _load_users(self, ids: List[int]) -> List[Optional[UserType]]:
+        async with self._lock, self.session() as db:
+            rows = await repositories.user.get_rows_by_ids(db, ids=list(ids))
+        users = {row["id"]: UserType(**row) for row in rows}
+        return [users.get(id) for id in ids]
+
+    async def _load_history(self, comment_ids: List[int]) -> List[List[CommentHistoryType]]:
+        async with self._lock, self.session() as db:
+            rows = await repositories.comment_history.get_rows_by_comments(
+                db, comment_ids=list(comment_ids)
+            )
+        history = defaultdict(list)
+        for row in rows:
+            history[row["comment_id"]].append(CommentHistoryType(**row))
+        return [history[comment_id] for comment_id in comment_ids]
+
+    def clear(self):
+        self.user.clear_all()
+        self.history.clear_all()
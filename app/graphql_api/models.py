@@ -1,6 +1,6 @@
 import strawberry
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 @strawberry.type
@@ -10,6 +10,15 @@ class UserType:
     group: str
 
 
+@strawberry.type
+class CommentHistoryType:
+    id: int
+    comment_id: int
+    timestamp: datetime
+    old_value: Optional[str]
+    new_value: str
+
+
 @strawberry.type
 class CommentType:
     id: int
@@ -17,16 +26,26 @@ class CommentType:
     user_id: int = strawberry.field(name="userId")
     created_at: datetime = strawberry.field(name="createdAt") 
     updated_at: Optional[datetime] = strawberry.field(name="updatedAt")
-    user: Optional[UserType] = None
+    # Set when the author is already at hand, e.g. from a subscription
+    # event, so resolving ``user`` needs no query.
+    prefetched_user: strawberry.Private[Optional[UserType]] = None
+
+    @strawberry.field
+    async def user(self, info) -> Optional[UserType]:
+        if self.prefetched_user is not None:
+            return self.prefetched_user
+        return await info.context["loaders"].user.load(self.user_id)
+
+    @strawberry.field
+    async def history(self, info) -> List[CommentHistoryType]:
+        return await info.context["loaders"].history.load(self.id)
 
 
 @strawberry.type
-class CommentHistoryType:
-    id: int
-    comment_id: int
-    timestamp: datetime
-    old_value: Optional[str]
-    new_value: str
+class GroupStatsType:
+    group: str
+    comment_count: int
+    day: Optional[date] = None
 
 
 @strawberry.input
@@ -1,7 +1,30 @@
 import strawberry
+from strawberry import UNSET
 from strawberry.fastapi import GraphQLRouter
-from app.graphql_api.types import Query, Mutation
-from app.graphql_api.context import get_context
+from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL
+from app.graphql_api.types import Query, Mutation, Subscription
+from app.graphql_api.context import authenticate_connection, get_context
+from app.graphql_api.extensions import MetricsExtension, TracingExtension
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
-graphql_app = GraphQLRouter(schema, context_getter=get_context)
+
+class AuthenticatedGraphQLRouter(GraphQLRouter):
+    async def on_ws_connect(self, context):
+        # HTTP requests are authenticated by get_context; subscriptions over
+        # graphql-transport-ws authenticate here, at connection_init. The
+        # legacy graphql-ws protocol is not offered: it lets a client start
+        # operations without a connection_init.
+        await authenticate_connection(context)
+        return UNSET
+
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[MetricsExtension, TracingExtension],
+)
+graphql_app = AuthenticatedGraphQLRouter(
+    schema,
+    context_getter=get_context,
+    subscription_protocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL],
+)
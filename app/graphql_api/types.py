@@ -1,12 +1,20 @@
 import strawberry
-from typing import List
+from contextlib import aclosing
+from datetime import date
+from typing import AsyncGenerator, List, Optional
+from graphql import GraphQLError
 from app import repositories, schemas
+from app.config.database import AsyncSessionLocal
+from app.core.cache import feed_cache
+from app.core.live import DROPPED, LiveEvent, broker, comment_data
 from app.utils.permissions import ensure_comment_permission
 from app.graphql_api.models import (
-    UserType, CommentType, CommentHistoryType,
+    UserType, CommentType, CommentHistoryType, GroupStatsType,
     UserInput, CommentInput, CommentUpdateInput
 )
-from app.graphql_api.converters import user_to_graphql, comment_to_graphql, comment_history_to_graphql
+from app.graphql_api.converters import (
+    user_to_graphql, comment_to_graphql, comment_history_to_graphql, comment_event_to_graphql
+)
 
 
 @strawberry.type
@@ -20,9 +28,23 @@ class Query:
     @strawberry.field
     async def comments(self, info) -> List[CommentType]:
         db = info.context["db"]
-        current_user = info.context["current_user"]
-        comments = await repositories.comment.get_by_user_group_with_user(db, user_group=current_user.group)
-        return [comment_to_graphql(c) for c in comments]
+        group = info.context["current_user"].group
+
+        async def load_page(session):
+            comments = await repositories.comment.get_by_user_group(session, user_group=group, load_user=False)
+            page = [comment_to_graphql(c) for c in comments]
+            return page, sum(len(c.content) + 256 for c in page)
+
+        async def load():
+            return await load_page(db)
+
+        async def refresh():
+            async with AsyncSessionLocal() as session:
+                return await load_page(session)
+
+        # Keyed by the group version so writes on other workers are seen.
+        version = await repositories.comment.get_feed_version(db, user_group=group)
+        return await feed_cache.get_or_load(group, ("graphql", version), load, refresh)
 
     @strawberry.field
     async def comment_history(self, info, comment_id: int) -> List[CommentHistoryType]:
@@ -38,6 +60,23 @@ class Query:
         history = await repositories.comment_history.get_by_comment(db, comment_id=comment_id)
         return [comment_history_to_graphql(h) for h in history]
 
+    @strawberry.field
+    async def group_stats(
+        self, info, group: Optional[str] = None, day: Optional[date] = None
+    ) -> GroupStatsType:
+        db = info.context["db"]
+        current_user = info.context["current_user"]
+        group = group or current_user.group
+
+        if group != current_user.group:
+            raise ValueError("Not enough permissions. You can only access stats for your own group.")
+
+        if day is None:
+            count = await repositories.stats.get_group_stats(db, group=group)
+        else:
+            count = await repositories.stats.get_group_daily_stats(db, group=group, day=day)
+        return GroupStatsType(group=group, comment_count=count, day=day)
+
 
 @strawberry.type
 class Mutation:
@@ -67,7 +106,8 @@ class Mutation:
         comment = await repositories.comment.create_with_user(
             db=db, 
             obj_in=schemas.CommentCreate(content=input.content), 
-            user_id=current_user.id
+            user_id=current_user.id,
+            group=current_user.group
         )
         
         await repositories.comment_history.create_history_entry(
@@ -78,7 +118,8 @@ class Mutation:
         )
         
         comment_with_user = await repositories.comment.get_with_user(db, id=comment.id)
-        return comment_to_graphql(comment_with_user)
+        broker.publish("created", current_user.group, comment_data(comment_with_user))
+        return comment_to_graphql(comment_with_user, user_to_graphql(comment_with_user.user))
 
     @strawberry.mutation
     async def update_comment(self, info, comment_id: int, input: CommentUpdateInput) -> CommentType:
@@ -108,4 +149,45 @@ class Mutation:
             )
         
         comment_with_user = await repositories.comment.get_with_user(db, id=comment.id)
-        return comment_to_graphql(comment_with_user)
\ No newline at end of file
+        broker.publish("updated", current_user.group, comment_data(comment_with_user))
+        return comment_to_graphql(comment_with_user, user_to_graphql(comment_with_user.user))
+
+
+async def _group_events(info, event_type: str) -> AsyncGenerator[LiveEvent, None]:
+    current_user = info.context["current_user"]
+    if current_user is None:
+        raise GraphQLError("Not authenticated")
+    group = current_user.group
+    async with broker.subscribe(group, types=[event_type]) as subscription:
+        while True:
+            event = await subscription.get()
+            if event is DROPPED:
+                raise GraphQLError("Subscription dropped for falling behind; resubscribe to continue")
+            # The loaders live as long as the connection; start every event
+            # with empty caches so nested fields are not stale.
+            info.context["loaders"].clear()
+            yield event
+
+
+# Comment events in the caller's group, fanned out from the live feed broker
+# without a query per subscriber.
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def comment_added(self, info) -> AsyncGenerator[CommentType, None]:
+        async with aclosing(_group_events(info, "created")) as events:
+            async for event in events:
+                yield comment_event_to_graphql(event)
+
+    @strawberry.subscription
+    async def comment_updated(self, info) -> AsyncGenerator[CommentType, None]:
+        async with aclosing(_group_events(info, "updated")) as events:
+            async for event in events:
+                yield comment_event_to_graphql(event)
+
+    @strawberry.subscription
+    async def comment_deleted(self, info) -> AsyncGenerator[int, None]:
+        async with aclosing(_group_events(info, "deleted")) as events:
+            async for event in events:
+                yield event.data["id"]
+
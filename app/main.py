@@ -1,25 +1,47 @@
 import logging
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.metrics import router as metrics_router
 from app.api.v1.router import api_router
+from app.config.database import engine
 from app.config.settings import settings
-from app.core.middleware import RequestLoggingMiddleware
+from app.core.middleware import (
+    AdmissionMiddleware, ProfilingMiddleware, RequestLoggingMiddleware, TracingMiddleware
+)
 from app.core.exceptions import setup_exception_handlers
+from app.core.live import broker
+from app.core.reaper import reaper
+from app.core.tracing import setup_tracing, tracer
+from app.core.warmup import warmup
 from app.graphql_api.schema import graphql_app
-from app.utils.logger import setup_logging
+from app.utils.logger import setup_logging, stop_logging
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    started = time.perf_counter()
     setup_logging()
+    setup_tracing()
+    warmup.mark("logging", time.perf_counter() - started)
     logging.info("Starting the system")
+    if settings.SOFT_DELETE_ENABLED:
+        reaper.start()
+    await broker.start()
+    warmup.start(started)
 
     yield
 
     logging.info("Shutting down the system")
+    await warmup.stop()
+    await reaper.stop()
+    await broker.stop()
+    await engine.dispose()
+    tracer.shutdown()
+    stop_logging()
 
 
 def create_application() -> FastAPI:
@@ -41,12 +63,20 @@ def create_application() -> FastAPI:
             allow_headers=["*"],
         )
     
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+    if settings.ADMISSION_ENABLED:
+        # Inside the access log, so shed requests are logged and metered.
+        app.add_middleware(AdmissionMiddleware)
     app.add_middleware(RequestLoggingMiddleware)
+    # Added last so it wraps the access log and its DB time in the trace.
+    app.add_middleware(TracingMiddleware)
 
     setup_exception_handlers(app)
 
     app.include_router(api_router, prefix=settings.API_V1_STR)
     app.include_router(graphql_app, prefix="/graphql")
+    app.include_router(metrics_router)
 
     return app
 
@@ -1,3 +1,4 @@
 from .comment import Comment
 from .comment_history import CommentHistory
-from .user import User
\ No newline at end of file
+from .stats import GroupStats, GroupDailyStats, GroupVersion, UserStats, UserDailyStats
+from .user import User
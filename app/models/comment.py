@@ -1,21 +1,48 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.config.database import Base
+from app.models.types import CompressedText
 
 
 class Comment(Base):
     __tablename__ = "comments"
-    
+
     id = Column(Integer, primary_key=True, index=True)
-    content = Column(String, nullable=False)
+    content = Column(CompressedText, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
     user = relationship("User", back_populates="comments")
     history_entries = relationship(
-        "CommentHistory", 
+        "CommentHistory",
         back_populates="comment",
         cascade="all, delete-orphan"
-    )
\ No newline at end of file
+    )
+
+    __table_args__ = (
+        # Reads only ever touch live rows, so keep them in a partial index
+        # and leave tombstones for the reaper.
+        Index(
+            "ix_comments_live_user_id",
+            "user_id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        # Newest-first feed order: (created_at DESC, id DESC).
+        Index(
+            "ix_comments_live_created_at_id",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None),
+        ),
+        Index(
+            "ix_comments_tombstoned",
+            "deleted_at",
+            postgresql_where=deleted_at.isnot(None),
+            sqlite_where=deleted_at.isnot(None),
+        ),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.config.database import Base
+from app.models.types import CompressedText
 
 
 class CommentHistory(Base):
@@ -10,7 +11,7 @@ class CommentHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     comment_id = Column(Integer, ForeignKey("comments.id"), nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    old_value = Column(String)
-    new_value = Column(String, nullable=False)
+    old_value = Column(CompressedText)
+    new_value = Column(CompressedText, nullable=False)
     
     comment = relationship("Comment", back_populates="history_entries")
\ No newline at end of file
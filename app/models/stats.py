@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from app.config.database import Base
+
+
+class GroupStats(Base):
+    __tablename__ = "group_stats"
+
+    group = Column(String, primary_key=True)
+    comment_count = Column(Integer, nullable=False, default=0)
+
+
+class GroupDailyStats(Base):
+    __tablename__ = "group_daily_stats"
+
+    group = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    comment_count = Column(Integer, nullable=False, default=0)
+
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    comment_count = Column(Integer, nullable=False, default=0)
+
+
+class UserDailyStats(Base):
+    __tablename__ = "user_daily_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    comment_count = Column(Integer, nullable=False, default=0)
+
+
+class GroupVersion(Base):
+    """Write counter per group, bumped in the same transaction as every
+    change to the group's feed; feed and comment ETags are derived from it."""
+    __tablename__ = "group_versions"
+
+    group = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,83 @@
+import zlib
+from typing import Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.config.settings import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+RAW = 0x00
+ZLIB = 0x01
+ZSTD = 0x02
+
+
+def _compress(data: bytes, algorithm: str, level: int) -> bytes:
+    if algorithm == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        return bytes([ZSTD]) + zstandard.ZstdCompressor(level=level).compress(data)
+    return bytes([ZLIB]) + zlib.compress(data, level)
+
+
+def encode_text(
+    value: str,
+    *,
+    threshold: Optional[int] = None,
+    algorithm: Optional[str] = None,
+    level: Optional[int] = None,
+) -> bytes:
+    threshold = settings.COMPRESSION_THRESHOLD_BYTES if threshold is None else threshold
+    algorithm = settings.COMPRESSION_ALGORITHM if algorithm is None else algorithm
+    level = settings.COMPRESSION_LEVEL if level is None else level
+
+    data = value.encode("utf-8")
+    if threshold >= 0 and len(data) >= threshold:
+        compressed = _compress(data, algorithm, level)
+        if len(compressed) < len(data) + 1:
+            return compressed
+    return bytes([RAW]) + data
+
+
+def decode_text(data) -> str:
+    if isinstance(data, str):
+        return data
+    data = bytes(data)
+    if not data:
+        return ""
+    header, payload = data[0], data[1:]
+    if header == RAW:
+        return payload.decode("utf-8")
+    if header == ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if header == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed value found but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    raise ValueError(f"Unknown compression header byte: {header:#04x}")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored as bytes with a one-byte codec header.
+
+    Values at or above ``COMPRESSION_THRESHOLD_BYTES`` are compressed with
+    ``COMPRESSION_ALGORITHM`` when that makes them smaller; everything else is
+    stored raw behind a ``0x00`` header. Works with bytea on asyncpg and BLOB
+    on aiosqlite.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_text(value)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Boolean, Column, Integer, String, false
 from sqlalchemy.orm import relationship
 from app.config.database import Base
 
@@ -9,6 +9,8 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    group = Column(String, nullable=False)
+    group = Column(String, nullable=False, index=True)
+    # Granted out of band (seed script or SQL); not settable through the API
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
     
     comments = relationship("Comment", back_populates="user")
\ No newline at end of file
@@ -1,3 +1,4 @@
 from .user_repository import user
 from .comment_repository import comment
-from .comment_history_repository import comment_history
\ No newline at end of file
+from .comment_history_repository import comment_history
+from .stats_repository import stats
@@ -1,26 +1,99 @@
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.coalesce import single_flight
+from app.core.tracing import trace_methods
 from app.repositories.base import BaseRepository
+from app.models.comment import Comment
 from app.models.comment_history import CommentHistory
-from app.schemas.comment_history import CommentHistoryCreate, CommentHistoryCreate
+from app.schemas.comment_history import CommentHistory as CommentHistorySchema, CommentHistoryCreate
 
+@trace_methods
 class CommentHistoryRepository(BaseRepository[CommentHistory, CommentHistoryCreate, CommentHistoryCreate]):
     
     async def get_by_comment(
-        self, db: AsyncSession, *, comment_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        comment_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
     ) -> List[CommentHistory]:
+        if fields is not None:
+            columns = [getattr(CommentHistory, name).label(name) for name in fields]
+            stmt = (
+                select(*columns)
+                .select_from(CommentHistory)
+                .join(Comment)
+                .where(CommentHistory.comment_id == comment_id, Comment.deleted_at.is_(None))
+                .offset(skip)
+                .limit(limit)
+            )
+            rows = await single_flight.fetch_all(db, stmt)
+            return [dict(row._mapping) for row in rows]
+
         stmt = (
             select(CommentHistory)
-            .where(CommentHistory.comment_id == comment_id)
+            .join(Comment)
+            .where(CommentHistory.comment_id == comment_id, Comment.deleted_at.is_(None))
             .offset(skip)
             .limit(limit)
         )
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    async def get_rows_by_comment(
+        self, db: AsyncSession, *, comment_id: int, skip: int = 0, limit: int = 100
+    ) -> List[dict]:
+        """History as plain dicts shaped like schemas.CommentHistory."""
+        return await self.get_by_comment(
+            db, comment_id=comment_id, skip=skip, limit=limit,
+            fields=list(CommentHistorySchema.model_fields),
+        )
+
+    async def get_rows_by_comments(
+        self, db: AsyncSession, *, comment_ids: List[int]
+    ) -> List[dict]:
+        """History of several live comments as plain dicts shaped like
+        schemas.CommentHistory, in one IN query ordered by comment and id."""
+        columns = [getattr(CommentHistory, name).label(name) for name in CommentHistorySchema.model_fields]
+        stmt = (
+            select(*columns)
+            .join(Comment)
+            .where(CommentHistory.comment_id.in_(comment_ids), Comment.deleted_at.is_(None))
+            .order_by(CommentHistory.comment_id, CommentHistory.id)
+        )
+        result = await db.execute(stmt)
+        return [dict(row._mapping) for row in result]
+
+    async def stream_rows_by_comment(
+        self, db: AsyncSession, *, comment_id: int, batch_size: int = 500
+    ) -> AsyncIterator[List[dict]]:
+        """Yield a comment's full history in id order from a server-side cursor."""
+        columns = [getattr(CommentHistory, name).label(name) for name in CommentHistorySchema.model_fields]
+        stmt = (
+            select(*columns)
+            .where(CommentHistory.comment_id == comment_id)
+            .order_by(CommentHistory.id)
+        )
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield [dict(row._mapping) for row in partition]
+        finally:
+            await result.close()
+
+    async def get_watermark(self, db: AsyncSession, *, comment_id: int) -> Tuple:
+        stmt = (
+            select(func.max(CommentHistory.id), func.count(CommentHistory.id))
+            .where(CommentHistory.comment_id == comment_id)
+        )
+        rows = await single_flight.fetch_all(db, stmt)
+        return tuple(rows[0])
+
     async def create_history_entry(
         self,
         db: AsyncSession,
@@ -1,50 +1,251 @@
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.config.settings import settings
+from app.core.cache import feed_cache
+from app.core.coalesce import single_flight
+from app.core.tracing import trace_methods
 from app.repositories.base import BaseRepository
+from app.repositories.stats_repository import activity_day, stats
 from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.stats import GroupVersion
 from app.models.user import User
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import Comment as CommentSchema, CommentCreate, CommentUpdate
 
 
+LIVE = Comment.deleted_at.is_(None)
+FEED_ORDER = (Comment.created_at.desc(), Comment.id.desc())
+# Incremental polls walk forward from the cursor, so a page cut short by
+# ``limit`` ends at the newest row returned and the next poll resumes there.
+SINCE_ID_ORDER = (Comment.id.asc(),)
+SINCE_ORDER = (Comment.created_at.asc(), Comment.id.asc())
+
+
+def feed_order(since_id: Optional[int] = None, since: Optional[datetime] = None) -> tuple:
+    if since_id is not None:
+        return SINCE_ID_ORDER
+    if since is not None:
+        return SINCE_ORDER
+    return FEED_ORDER
+ALL_FIELDS = list(CommentSchema.model_fields)
+
+
+@trace_methods
 class CommentRepository(BaseRepository[Comment, CommentCreate, CommentUpdate]):
     async def get(self, db: AsyncSession, id: int) -> Optional[Comment]:
-        return await super().get(
-            db, id,
-            options=[selectinload(Comment.user)]
+        stmt = (
+            select(Comment)
+            .where(Comment.id == id, LIVE)
+            .options(selectinload(Comment.user))
         )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[Comment]:
+        result = await db.execute(select(Comment).where(LIVE).offset(skip).limit(limit))
+        return result.scalars().all()
 
     async def create_with_user(
-        self, db: AsyncSession, *, obj_in: CommentCreate, user_id: int
+        self, db: AsyncSession, *, obj_in: CommentCreate, user_id: int, group: Optional[str] = None
     ) -> Comment:
+        """``group`` is the author's group, when the caller already has it."""
         db_obj = Comment(
             **obj_in.model_dump(),
             user_id=user_id
         )
         db.add(db_obj)
+        await db.flush()
+        if group is None:
+            group = await self._group_of(db, user_id)
+        await stats.record_comment(db, user_id=user_id, group=group, day=activity_day())
+        await stats.bump_version(db, group)
         await db.commit()
+        feed_cache.invalidate_group(group)
         await db.refresh(db_obj)
         return db_obj
 
-    async def get_by_user_group(self, db: AsyncSession, *, user_group: str, skip: int = 0, limit: int = 100) -> List[Comment]:
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: Comment,
+        obj_in: Union[CommentUpdate, Dict[str, Any]]
+    ) -> Comment:
+        group = await self._group_of(db, db_obj.user_id)
+        await stats.bump_version(db, group)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        feed_cache.invalidate_group(group)
+        return db_obj
+
+    def _feed_filter(
+        self, stmt, *, user_group: str, since_id: Optional[int] = None, since: Optional[datetime] = None
+    ):
+        stmt = stmt.join(User).where(User.group == user_group, LIVE)
+        if since_id is not None:
+            stmt = stmt.where(Comment.id > since_id)
+        if since is not None:
+            stmt = stmt.where(Comment.created_at > since)
+        return stmt
+
+    async def has_newer(
+        self, db: AsyncSession, *, user_group: str, since_id: Optional[int] = None, since: Optional[datetime] = None
+    ) -> bool:
+        newer = self._feed_filter(
+            select(Comment.id), user_group=user_group, since_id=since_id, since=since
+        )
+        rows = await single_flight.fetch_all(db, select(newer.exists()))
+        return rows[0][0]
+
+    async def get_feed_version(self, db: AsyncSession, *, user_group: str) -> int:
+        """The group's write version: a primary-key lookup that changes on
+        every create, edit and delete in the group and on author changes."""
+        return await stats.get_version(db, group=user_group)
+
+    async def get_by_user_group(
+        self,
+        db: AsyncSession,
+        *,
+        user_group: str,
+        skip: int = 0,
+        limit: int = 100,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        load_user: bool = True,
+    ) -> List[Comment]:
+        stmt = self._feed_filter(
+            select(Comment), user_group=user_group, since_id=since_id, since=since
+        )
+        if load_user:
+            stmt = stmt.options(selectinload(Comment.user))
         result = await db.execute(
-            select(Comment)
-            .join(User)
-            .filter(User.group == user_group)
-            .options(selectinload(Comment.user))
+            stmt
+            .order_by(*feed_order(since_id, since))
             .offset(skip)
             .limit(limit)
         )
         return result.scalars().all()
 
+    def _columns(self, fields: List[str]) -> list:
+        columns = [getattr(Comment, name).label(name) for name in fields if name != "user"]
+        if "user" in fields:
+            # Author columns come from the feed join instead of a selectinload.
+            columns += [
+                User.username.label("user__username"),
+                User.group.label("user__group"),
+                User.id.label("user__id"),
+            ]
+        return columns
+
+    def _to_dict(self, row) -> dict:
+        data = dict(row._mapping)
+        user = {key[6:]: data.pop(key) for key in list(data) if key.startswith("user__")}
+        if user:
+            data["user"] = user
+        return data
+
+    async def get_by_user_group_fields(
+        self,
+        db: AsyncSession,
+        *,
+        user_group: str,
+        fields: List[str],
+        skip: int = 0,
+        limit: int = 100,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+    ) -> List[dict]:
+        stmt = self._feed_filter(
+            select(*self._columns(fields)).select_from(Comment),
+            user_group=user_group, since_id=since_id, since=since,
+        )
+        stmt = stmt.order_by(*feed_order(since_id, since)).offset(skip).limit(limit)
+        rows = await single_flight.fetch_all(db, stmt)
+        return [self._to_dict(row) for row in rows]
+
+    async def get_by_user_group_rows(
+        self,
+        db: AsyncSession,
+        *,
+        user_group: str,
+        skip: int = 0,
+        limit: int = 100,
+        since_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+    ) -> List[dict]:
+        """The group feed as plain dicts shaped like schemas.Comment."""
+        return await self.get_by_user_group_fields(
+            db,
+            user_group=user_group,
+            fields=ALL_FIELDS,
+            skip=skip,
+            limit=limit,
+            since_id=since_id,
+            since=since,
+        )
+
+    async def stream_group_rows(
+        self, db: AsyncSession, *, user_group: str, batch_size: int = 500
+    ) -> AsyncIterator[List[dict]]:
+        """Yield a group's comments in id order, batch by batch, from a
+        server-side cursor."""
+        stmt = self._feed_filter(
+            select(*self._columns(ALL_FIELDS)).select_from(Comment), user_group=user_group
+        ).order_by(Comment.id)
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield [self._to_dict(row) for row in partition]
+        finally:
+            await result.close()
+
+    async def get_fields(
+        self, db: AsyncSession, *, id: int, fields: List[str]
+    ) -> Optional[Tuple[dict, int, str, Optional[int]]]:
+        """Project one comment; also returns author id, author group and
+        the group's version for permission checks and ETags."""
+        stmt = (
+            select(
+                *self._columns(fields),
+                Comment.user_id.label("_user_id"),
+                User.group.label("_author_group"),
+                GroupVersion.version.label("_version"),
+            )
+            .select_from(Comment)
+            .join(User)
+            .outerjoin(GroupVersion, GroupVersion.group == User.group)
+            .where(Comment.id == id, LIVE)
+        )
+        rows = await single_flight.fetch_all(db, stmt)
+        if not rows:
+            return None
+        data = self._to_dict(rows[0])
+        return (
+            data,
+            data.pop("_user_id"),
+            data.pop("_author_group"),
+            data.pop("_version"),
+        )
+
+    async def get_author_group(self, db: AsyncSession, *, id: int) -> Optional[str]:
+        """Group of a live comment's author, for read checks that do not
+        need the comment itself."""
+        stmt = select(User.group).join(Comment.user).where(Comment.id == id, LIVE)
+        rows = await single_flight.fetch_all(db, stmt)
+        return rows[0][0] if rows else None
+
     async def get_by_user(
         self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
     ) -> List[Comment]:
         stmt = (
             select(Comment)
-            .where(Comment.user_id == user_id)
+            .where(Comment.user_id == user_id, LIVE)
             .options(joinedload(Comment.user))
             .offset(skip)
             .limit(limit)
@@ -52,28 +253,93 @@ class CommentRepository(BaseRepository[Comment, CommentCreate, CommentUpdate]):
         result = await db.execute(stmt)
         return result.scalars().all()
 
-    async def get_by_user_group_with_user(
-        self, db: AsyncSession, *, user_group: str, skip: int = 0, limit: int = 100
-    ) -> List[Comment]:
-        query = (
-            select(self.model)
-            .join(User)
-            .where(User.group == user_group)
-            .options(selectinload(self.model.user))  
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await db.execute(query)
-        return result.scalars().all()
-    
     async def get_with_user(self, db: AsyncSession, id: int) -> Optional[Comment]:
         query = (
             select(self.model)
-            .where(self.model.id == id)
+            .where(self.model.id == id, LIVE)
             .options(selectinload(self.model.user))
         )
         result = await db.execute(query)
         return result.scalars().first()
 
+    async def _group_of(self, db: AsyncSession, user_id: int) -> str:
+        result = await db.execute(select(User.group).where(User.id == user_id))
+        return result.scalar_one()
+
+    async def _forget_activity(self, db: AsyncSession, obj: Comment) -> str:
+        group = await self._group_of(db, obj.user_id)
+        await stats.record_comment(
+            db,
+            user_id=obj.user_id,
+            group=group,
+            day=activity_day(obj.created_at),
+            delta=-1,
+        )
+        return group
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[Comment]:
+        if settings.SOFT_DELETE_ENABLED:
+            return await self.soft_remove(db, id=id)
+        obj = await db.get(Comment, id)
+        if obj is None:
+            return None
+        group = None
+        if obj.deleted_at is None:
+            group = await self._forget_activity(db, obj)
+            await stats.bump_version(db, group)
+        await db.delete(obj)
+        await db.commit()
+        if group is not None:
+            feed_cache.invalidate_group(group)
+        return obj
+
+    async def soft_remove(self, db: AsyncSession, *, id: int) -> Optional[Comment]:
+        obj = await db.get(Comment, id)
+        if obj is None or obj.deleted_at is not None:
+            return None
+        deleted_at = datetime.now(timezone.utc)
+        # A single-row UPDATE; history is left for the reaper and the
+        # tombstone does not count as an edit, so updated_at is kept.
+        await db.execute(
+            update(Comment)
+            .where(Comment.id == id)
+            .values(deleted_at=deleted_at, updated_at=Comment.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        group = await self._forget_activity(db, obj)
+        await stats.bump_version(db, group)
+        await db.commit()
+        feed_cache.invalidate_group(group)
+        set_committed_value(obj, "deleted_at", deleted_at)
+        return obj
+
+    async def count_tombstoned(self, db: AsyncSession) -> int:
+        result = await db.execute(
+            select(func.count()).select_from(Comment).where(Comment.deleted_at.isnot(None))
+        )
+        return result.scalar_one()
+
+    def tombstoned_batch(self, *, limit: int):
+        # Every worker runs a reaper; on PostgreSQL each one skips rows another
+        # is already purging instead of waiting on (or deadlocking with) it.
+        # SQLite has no row locks and drops the clause.
+        return (
+            select(Comment.id)
+            .where(Comment.deleted_at.isnot(None))
+            .order_by(Comment.deleted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+    async def purge_tombstoned(self, db: AsyncSession, *, limit: int = 100) -> int:
+        result = await db.execute(self.tombstoned_batch(limit=limit))
+        ids = result.scalars().all()
+        if not ids:
+            return 0
+        await db.execute(delete(CommentHistory).where(CommentHistory.comment_id.in_(ids)))
+        await db.execute(delete(Comment).where(Comment.id.in_(ids)))
+        await db.commit()
+        return len(ids)
+
 
 comment = CommentRepository(Comment)
\ No newline at end of file
@@ -0,0 +1,175 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.tracing import trace_methods
+from app.models.comment import Comment
+from app.models.stats import GroupDailyStats, GroupStats, GroupVersion, UserDailyStats, UserStats
+from app.models.user import User
+
+
+def activity_day(value: Optional[datetime] = None) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def activity_day_sql(db: AsyncSession, column):
+    """SQL counterpart of ``activity_day``: the UTC date of ``column``,
+    whatever the session time zone."""
+    if db.bind.dialect.name == "postgresql":
+        return func.date(func.timezone("UTC", column))
+    # SQLite has no time zones; the app writes its timestamps in UTC.
+    return func.date(column)
+
+
+@trace_methods
+class StatsRepository:
+    """Activity rollups and group versions kept in step with comment writes.
+
+    None of the write methods commit: callers run them inside the same
+    transaction as the change they account for.
+    """
+
+    def _insert(self, db: AsyncSession, model):
+        if db.bind.dialect.name == "postgresql":
+            return pg_insert(model)
+        return sqlite_insert(model)
+
+    async def _bump(self, db: AsyncSession, model, keys: dict, delta: int):
+        stmt = (
+            self._insert(db, model)
+            .values(**keys, comment_count=delta)
+            .on_conflict_do_update(
+                index_elements=[getattr(model, key) for key in keys],
+                set_={"comment_count": model.comment_count + delta},
+            )
+        )
+        await db.execute(stmt)
+
+    async def record_comment(
+        self, db: AsyncSession, *, user_id: int, group: str, day: date, delta: int = 1
+    ):
+        await self._bump(db, GroupStats, {"group": group}, delta)
+        await self._bump(db, GroupDailyStats, {"group": group, "day": day}, delta)
+        await self._bump(db, UserStats, {"user_id": user_id}, delta)
+        await self._bump(db, UserDailyStats, {"user_id": user_id, "day": day}, delta)
+
+    async def move_user(
+        self, db: AsyncSession, *, user_id: int, old_group: str, new_group: str
+    ):
+        total = await db.execute(
+            select(UserStats.comment_count).where(UserStats.user_id == user_id)
+        )
+        count = total.scalar_one_or_none()
+        if not count:
+            return
+        await self._bump(db, GroupStats, {"group": old_group}, -count)
+        await self._bump(db, GroupStats, {"group": new_group}, count)
+
+        daily = await db.execute(
+            select(UserDailyStats.day, UserDailyStats.comment_count)
+            .where(UserDailyStats.user_id == user_id, UserDailyStats.comment_count != 0)
+        )
+        for day, day_count in daily.all():
+            await self._bump(db, GroupDailyStats, {"group": old_group, "day": day}, -day_count)
+            await self._bump(db, GroupDailyStats, {"group": new_group, "day": day}, day_count)
+
+    async def forget_user(self, db: AsyncSession, *, user_id: int):
+        """Drop the rollup rows of a user about to be deleted."""
+        await db.execute(delete(UserDailyStats).where(UserDailyStats.user_id == user_id))
+        await db.execute(delete(UserStats).where(UserStats.user_id == user_id))
+
+    async def bump_version(self, db: AsyncSession, *groups: str):
+        """Advance the version of each group whose feed the caller changes."""
+        for group in dict.fromkeys(groups):
+            stmt = (
+                self._insert(db, GroupVersion)
+                .values(group=group, version=1)
+                .on_conflict_do_update(
+                    index_elements=[GroupVersion.group],
+                    set_={"version": GroupVersion.version + 1},
+                )
+            )
+            await db.execute(stmt)
+
+    async def get_version(self, db: AsyncSession, *, group: str) -> int:
+        result = await db.execute(
+            select(GroupVersion.version).where(GroupVersion.group == group)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def get_group_stats(self, db: AsyncSession, *, group: str) -> int:
+        result = await db.execute(
+            select(GroupStats.comment_count).where(GroupStats.group == group)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def get_group_daily_stats(self, db: AsyncSession, *, group: str, day: date) -> int:
+        result = await db.execute(
+            select(GroupDailyStats.comment_count)
+            .where(GroupDailyStats.group == group, GroupDailyStats.day == day)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def get_user_stats(self, db: AsyncSession, *, user_id: int) -> int:
+        result = await db.execute(
+            select(UserStats.comment_count).where(UserStats.user_id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def reconcile(self, db: AsyncSession):
+        for model in (GroupStats, GroupDailyStats, UserStats, UserDailyStats):
+            await db.execute(delete(model))
+
+        live = Comment.deleted_at.is_(None)
+        day = activity_day_sql(db, Comment.created_at)
+        count = func.count(Comment.id)
+
+        await db.execute(
+            GroupStats.__table__.insert().from_select(
+                ["group", "comment_count"],
+                select(User.group, count).join(User, Comment.user_id == User.id)
+                .where(live).group_by(User.group),
+            )
+        )
+        await db.execute(
+            GroupDailyStats.__table__.insert().from_select(
+                ["group", "day", "comment_count"],
+                select(User.group, day, count).join(User, Comment.user_id == User.id)
+                .where(live).group_by(User.group, day),
+            )
+        )
+        await db.execute(
+            UserStats.__table__.insert().from_select(
+                ["user_id", "comment_count"],
+                select(Comment.user_id, count).where(live).group_by(Comment.user_id),
+            )
+        )
+        await db.execute(
+            UserDailyStats.__table__.insert().from_select(
+                ["user_id", "day", "comment_count"],
+                select(Comment.user_id, day, count).where(live).group_by(Comment.user_id, day),
+            )
+        )
+
+        # Rows may have been written behind the API's back (bulk loads), so
+        # every group's cached feeds and ETags are invalidated.
+        await db.execute(update(GroupVersion).values(version=GroupVersion.version + 1))
+        await db.execute(
+            GroupVersion.__table__.insert().from_select(
+                ["group", "version"],
+                select(User.group, literal(1)).distinct()
+                .where(User.group.notin_(select(GroupVersion.group))),
+            )
+        )
+        await db.commit()
+
+
+stats = StatsRepository()
@@ -1,19 +1,43 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import feed_cache
 from app.core.security import get_password_hash, verify_password
+from app.core.tracing import trace_methods
 from app.repositories.base import BaseRepository
+from app.repositories.stats_repository import stats
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+@trace_methods
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
         stmt = select(User).where(User.username == username)
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_multi_rows(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[dict]:
+        """Users as plain dicts shaped like schemas.User."""
+        stmt = (
+            select(User.username, User.group, User.id)
+            .order_by(User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return [dict(row._mapping) for row in result]
+
+    async def get_rows_by_ids(self, db: AsyncSession, *, ids: List[int]) -> List[dict]:
+        """Users with the given ids as plain dicts shaped like schemas.User,
+        in one IN query."""
+        stmt = select(User.username, User.group, User.id).where(User.id.in_(ids))
+        result = await db.execute(stmt)
+        return [dict(row._mapping) for row in result]
+
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         db_obj = User(
             username=obj_in.username,
@@ -25,6 +49,41 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+        old_group = db_obj.group
+        new_group = update_data.get("group")
+        if new_group is not None and new_group != old_group:
+            # Moves the user's rollups; committed together with the update below.
+            await stats.move_user(
+                db, user_id=db_obj.id, old_group=old_group, new_group=new_group
+            )
+        # Feed pages and ETags embed the author, so any change to the user
+        # moves their group(s) to a new version.
+        await stats.bump_version(db, old_group, new_group or old_group)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        # Feed pages embed the author, so any change to the user drops their pages.
+        feed_cache.invalidate_group(old_group, db_obj.group)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        obj = await db.get(User, id)
+        if obj is None:
+            return None
+        # Rollup rows reference the user even once their counts reach 0.
+        await stats.forget_user(db, user_id=id)
+        await stats.bump_version(db, obj.group)
+        await db.delete(obj)
+        await db.commit()
+        feed_cache.invalidate_group(obj.group)
+        return obj
+
     async def authenticate(self, db: AsyncSession, *, username: str, password: str) -> Optional[User]:
         user = await self.get_by_username(db, username=username)
         if not user:
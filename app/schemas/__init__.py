@@ -1,4 +1,8 @@
 from .comment import Comment, CommentCreate, CommentUpdate
 from .comment_history import CommentHistory, CommentHistoryCreate
-from .user import User, UserCreate, UserInDB, UserUpdate 
+from .profile_token import ProfileToken
+from .slow_query import SlowQuery
+from .stats import GroupStats
+from .stream_token import StreamToken
+from .user import User, UserCreate, UserInDB, UserUpdate
 
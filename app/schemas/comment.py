@@ -1,7 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
-from typing import Optional
-from .user import User
+from typing import List, Optional
+from typing_extensions import TypedDict
+from .user import User, UserRow
 
 
 class CommentBase(BaseModel):
@@ -24,4 +25,18 @@ class Comment(CommentBase):
     user: User
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CommentRow(TypedDict):
+    # Plain-row mirror of Comment, in the same field order. Serializing rows
+    # through it skips ORM hydration and model validation.
+    content: str
+    id: int
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    user: UserRow
+
+
+comment_rows_adapter = TypeAdapter(List[CommentRow])
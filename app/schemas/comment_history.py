@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from typing_extensions import TypedDict
 
 class CommentHistoryBase(BaseModel):
     old_value: Optional[str] = None
@@ -17,4 +18,16 @@ class CommentHistory(CommentHistoryBase):
     timestamp: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CommentHistoryRow(TypedDict):
+    # Plain-row mirror of CommentHistory, in the same field order.
+    old_value: Optional[str]
+    new_value: str
+    id: int
+    comment_id: int
+    timestamp: datetime
+
+
+comment_history_rows_adapter = TypeAdapter(List[CommentHistoryRow])
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class SlowQuery(BaseModel):
+    timestamp: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any = None
+    call_site: Optional[str] = None
+    plan: Optional[str] = None
@@ -0,0 +1,10 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class GroupStats(BaseModel):
+    group: str
+    comment_count: int
+    day: Optional[date] = None
@@ -0,0 +1,8 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class StreamToken(BaseModel):
+    token: str
+    expires_at: datetime
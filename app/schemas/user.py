@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import List, Optional
+from typing_extensions import TypedDict
 
 class UserBase(BaseModel):
     username: str
@@ -23,6 +24,16 @@ class User(UserBase):
         from_attributes = True
 
 
+class UserRow(TypedDict):
+    # Plain-row mirror of User, in the same field order.
+    username: str
+    group: str
+    id: int
+
+
+user_rows_adapter = TypeAdapter(List[UserRow])
+
+
 class UserInDB(User):
     hashed_password: str
 
@@ -0,0 +1,129 @@
+"""Production launcher: ``python -m app.server``.
+
+Starts ``--workers`` processes (default: CPU count). With gunicorn installed
+it runs them as UvicornWorkers, which supports ``--preload`` and jittered
+``--max-requests`` restarts. Without gunicorn it falls back to uvicorn's own
+process manager, which restarts workers after ``--max-requests`` without
+jitter or preload.
+
+When DB_MAX_CONNECTIONS is set, it is this server's share of Postgres
+``max_connections``. The budget is split evenly across workers, and each
+worker's pool_size + max_overflow is capped at its slice. The sizes are
+set before the app, and its engine, is imported.
+"""
+import argparse
+import logging
+import os
+from typing import Optional, Tuple
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def split_pool(
+    budget: Optional[int], workers: int, pool_size: int, max_overflow: int, reserved: int = 0
+) -> Tuple[int, int]:
+    """Per-worker (pool_size, max_overflow) keeping ``workers`` pools, plus
+    ``reserved`` connections each worker opens outside its pool, within
+    ``budget`` connections in total."""
+    if not budget:
+        return pool_size, max_overflow
+    per_worker = budget // workers - reserved
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={budget} cannot give each of {workers} workers a connection"
+        )
+    size = min(pool_size, per_worker)
+    return size, min(max_overflow, per_worker - size)
+
+
+def default_workers() -> int:
+    return settings.WEB_WORKERS or os.cpu_count() or 1
+
+
+def _run_gunicorn(args, gunicorn_app_base):
+    class Application(gunicorn_app_base.BaseApplication):
+        def load_config(self):
+            for key, value in {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": args.preload,
+                "max_requests": args.max_requests,
+                "max_requests_jitter": args.max_requests_jitter,
+                "graceful_timeout": 30,
+                "post_fork": _post_fork,
+            }.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Application().run()
+
+
+def _post_fork(server, worker):
+    # With --preload the engine was created in the master; connections must
+    # not be shared across processes, so drop the inherited pool state.
+    from app.config.database import engine
+
+    engine.sync_engine.dispose(close=False)
+
+
+def _run_uvicorn(args):
+    import uvicorn
+
+    if args.preload:
+        logger.warning("--preload needs gunicorn; starting workers without it")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--preload", action="store_true", default=settings.WEB_PRELOAD,
+                        help="Import the app once in the master before forking (gunicorn only)")
+    parser.add_argument("--max-requests", type=int, default=settings.WEB_MAX_REQUESTS,
+                        help="Restart a worker after this many requests; 0 disables")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.WEB_MAX_REQUESTS_JITTER)
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.LOG_LEVEL.upper())
+
+    # The postgres live bus holds one LISTEN connection per worker.
+    reserved = 1 if settings.LIVE_BUS == "postgres" else 0
+    pool_size, max_overflow = split_pool(
+        settings.DB_MAX_CONNECTIONS, args.workers, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW,
+        reserved,
+    )
+    # Forked workers inherit ``settings``; spawned uvicorn workers rebuild
+    # it from the environment.
+    settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = pool_size, max_overflow
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    logger.info(
+        "Starting %d workers, pool_size=%d max_overflow=%d (up to %d DB connections)",
+        args.workers, pool_size, max_overflow, args.workers * (pool_size + max_overflow + reserved),
+    )
+
+    try:
+        from gunicorn.app import base as gunicorn_app_base
+    except ImportError:
+        _run_uvicorn(args)
+    else:
+        _run_gunicorn(args, gunicorn_app_base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import csv
+import enum
+import io
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+def ndjson_encoder(row_type) -> Callable[[List[dict]], bytes]:
+    adapter = TypeAdapter(row_type)
+
+    def encode(rows: List[dict]) -> bytes:
+        return b"".join(adapter.dump_json(row) + b"\n" for row in rows)
+
+    return encode
+
+
+def _flatten(row: dict) -> dict:
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                flat[f"{key}_{inner_key}"] = inner_value
+        elif isinstance(value, datetime):
+            flat[key] = value.isoformat()
+        else:
+            flat[key] = value
+    return flat
+
+
+def csv_encoder(columns: List[str]) -> Callable[[List[dict]], bytes]:
+    def encode(rows: List[dict]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writerows(_flatten(row) for row in rows)
+        return buffer.getvalue().encode("utf-8")
+
+    return encode
+
+
+def csv_header(columns: List[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_batches(
+    request: Request,
+    batches: AsyncIterator[List[dict]],
+    encode: Callable[[List[dict]], bytes],
+    header: Optional[bytes] = None,
+) -> AsyncIterator[bytes]:
+    """Encode batches as they arrive, one chunk per batch, so memory stays
+    bounded by the batch size. Stops early once the client has gone."""
+    try:
+        if header:
+            yield header
+        async for batch in batches:
+            if await request.is_disconnected():
+                break
+            yield encode(batch)
+    finally:
+        await batches.aclose()
+
+
+def export_response(
+    body: AsyncIterator[bytes], export_format: ExportFormat, filename: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'
+        },
+    )
@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.core.tracing import traced
+
+
+def sparse_fields(schema: Type[BaseModel]):
+    """Dependency parsing ``?fields=a,b`` against the fields of ``schema``.
+
+    Returns the requested names in schema order, or None when the parameter
+    is absent so callers can keep their full-representation path.
+    """
+    allowed = list(schema.model_fields)
+
+    def parse(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of: {', '.join(allowed)}"
+        ),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(allowed))
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                       f"Allowed fields: {', '.join(allowed)}",
+            )
+        return [name for name in allowed if name in requested]
+
+    return parse
+
+
+@lru_cache(maxsize=256)
+def _partial_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {
+        name: (schema.model_fields[name].annotation, ...) for name in fields
+    }
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def _partial_list_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(List[_partial_model(schema, fields)])
+
+
+@traced("serialize.fields")
+def dump_fields(schema: Type[BaseModel], fields: List[str], rows) -> bytes:
+    adapter = _partial_list_adapter(schema, tuple(fields))
+    return adapter.dump_json(adapter.validate_python(list(rows)))
+
+
+@traced("serialize.fields")
+def dump_fields_one(schema: Type[BaseModel], fields: List[str], row) -> bytes:
+    model = _partial_model(schema, tuple(fields))
+    return model.model_validate(row).model_dump_json().encode("utf-8")
@@ -1,56 +1,187 @@
+import copy
+import json
 import logging
 import logging.config
 import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
 from app.config.settings import settings
+from app.core.metrics import registry
+
+records_dropped_total = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Queued records carry the traceback already rendered.
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+_exception_formatter = logging.Formatter()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: when the queue is full the
+    record is dropped and counted."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare formats the whole record into msg, traceback
+        # included. Merge only the arguments, and hand the traceback over as
+        # text in exc_text, where every formatter looks for it.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            records_dropped_total.inc()
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Block rather than fail when the queue is full at shutdown; the
+        # listener thread is draining it.
+        self.queue.put(self._sentinel)
+
 
-LOGGING_CONFIG = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "default": {
-            "format": "%(asctime)s %(name)s %(process)d %(lineno)d %(levelname)s: %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S"
+def get_logging_config(json_format: bool = False) -> dict:
+    formatter = "json" if json_format else "default"
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "default": {
+                "format": "%(asctime)s %(name)s %(process)d %(lineno)d %(levelname)s: %(message)s",
+                "datefmt": "%Y-%m-%d %H:%M:%S"
+            },
+            "json": {
+                "()": "app.utils.logger.JsonFormatter",
+            },
         },
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "default",
-            "level": settings.LOG_LEVEL.upper(),
+        "filters": {
+            # Handlers share one listener thread when queued, so the slow
+            # query file picks its records by logger name.
+            "slow_queries": {
+                "name": "app.slow_queries",
+            },
         },
-        "error_file": {
-            "class": "logging.handlers.TimedRotatingFileHandler",
-            "formatter": "default",
-            "level": "ERROR",
-            "filename": os.path.join(settings.LOG_DIR, "error.log"),
-            "when": "midnight",
-            "backupCount": 30,
-            "encoding": "utf8",
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "formatter": formatter,
+                "level": settings.LOG_LEVEL.upper(),
+            },
+            "error_file": {
+                "class": "logging.handlers.TimedRotatingFileHandler",
+                "formatter": formatter,
+                "level": "ERROR",
+                "filename": os.path.join(settings.LOG_DIR, "error.log"),
+                "when": "midnight",
+                "backupCount": 30,
+                "encoding": "utf8",
+            },
+            "all_file": {
+                "class": "logging.handlers.RotatingFileHandler",
+                "formatter": formatter,
+                "level": settings.LOG_LEVEL.upper(),
+                "filename": os.path.join(settings.LOG_DIR, "app.log"),
+                "maxBytes": 10_000_000,
+                "backupCount": 5,
+                "encoding": "utf8",
+            },
+            "slow_query_file": {
+                "class": "logging.handlers.RotatingFileHandler",
+                "formatter": formatter,
+                "filters": ["slow_queries"],
+                "filename": os.path.join(settings.LOG_DIR, "slow_queries.log"),
+                "maxBytes": 10_000_000,
+                "backupCount": 5,
+                "encoding": "utf8",
+            },
         },
-        "all_file": {
-            "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "default",
-            "level": settings.LOG_LEVEL.upper(),
-            "filename": os.path.join(settings.LOG_DIR, "app.log"),
-            "maxBytes": 10_000_000,
-            "backupCount": 5,
-            "encoding": "utf8",
+        "loggers": {
+            "app": {
+                "handlers": ["console", "all_file", "error_file"],
+                "level": settings.LOG_LEVEL.upper(),
+                "propagate": False,
+            },
+            "app.slow_queries": {
+                "handlers": ["console", "all_file", "slow_query_file"],
+                "level": "WARNING",
+                "propagate": False,
+            },
         },
-    },
-    "loggers": {
-        "app": {
+        "root": {
             "handlers": ["console", "all_file", "error_file"],
             "level": settings.LOG_LEVEL.upper(),
-            "propagate": False,
         },
-    },
-    "root": {
-        "handlers": ["console", "all_file", "error_file"],
-        "level": settings.LOG_LEVEL.upper(),
-    },
-}
-
-def setup_logging():
+    }
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _configured_loggers(config: dict) -> List[logging.Logger]:
+    return [logging.getLogger()] + [logging.getLogger(name) for name in config["loggers"]]
+
+
+def setup_logging(queued: bool = True):
+    """Configure logging. With ``queued`` the configured handlers run on a
+    listener thread, and loggers only enqueue records, so request handling
+    never waits on file I/O or log rotation."""
+    global _listener
+    stop_logging()
     os.makedirs(settings.LOG_DIR, exist_ok=True)
-    
-    logging.config.dictConfig(LOGGING_CONFIG)
+
+    config = get_logging_config(settings.LOG_JSON)
+    logging.config.dictConfig(config)
+    if not queued:
+        return
+
+    loggers = _configured_loggers(config)
+    handlers = list(dict.fromkeys(h for logger in loggers for h in logger.handlers))
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    for logger in loggers:
+        logger.handlers = [queue_handler]
+
+    _listener = _Listener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        for logger in _configured_loggers(get_logging_config()):
+            logger.handlers = [h for h in logger.handlers if not isinstance(h, DroppingQueueHandler)]
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
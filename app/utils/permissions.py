@@ -1,7 +1,11 @@
 from fastapi import HTTPException, status
+from app.core.tracing import traced
 from app.models.user import User
 from app.models.comment import Comment
 
+READ_DENIED = "Not enough permissions. You can only access comments from users in your group."
+MODIFY_DENIED = "Not enough permissions. You can only modify your own comments."
+
 
 def check_comment_permission(user: User, comment: Comment, action: str = "read") -> bool:
     if action == "read":
@@ -11,15 +15,25 @@ def check_comment_permission(user: User, comment: Comment, action: str = "read")
     return False
 
 
+@traced("permissions.check_comment")
 def ensure_comment_permission(user: User, comment: Comment, action: str = "read"):
     if not check_comment_permission(user, comment, action):
         if action == "read":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions. You can only access comments from users in your group."
+                detail=READ_DENIED
             )
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions. You can only modify your own comments."
-            )
\ No newline at end of file
+                detail=MODIFY_DENIED
+            )
+
+
+@traced("permissions.check_group")
+def ensure_group_read_permission(user: User, author_group: str):
+    if user.group != author_group:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=READ_DENIED
+        )
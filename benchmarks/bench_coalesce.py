@@ -0,0 +1,112 @@
+"""SQL statements and latency for bursts of identical concurrent reads, with
+single-flight coalescing off and on.
+
+Each round fires ``--concurrency`` simultaneous requests for the same
+comment (``GET /api/v1/comments/{id}``) or the same group feed
+(``GET /api/v1/comments/`` with the feed cache off), in-process through
+``httpx.ASGITransport``. Every request still loads its user for
+authentication, which is not coalesced, so the floor is one statement per
+request. Admission control is lifted for the run so no request is shed.
+
+    python -m benchmarks.bench_coalesce --concurrency 50
+
+By default a temporary SQLite file is used. ``--database-url`` targets a
+Postgres instead; its tables are dropped and recreated.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.deps import get_db, get_session_factory
+from app.config.database import Base
+from app.core.admission import admission
+from app.core.cache import feed_cache
+from app.core.coalesce import single_flight
+from app.core.queries import instrument_engine, track_queries
+from app.core.security import create_access_token
+from app.main import app
+from benchmarks.bench_endpoints import seed
+
+SCENARIOS = {
+    "comment": lambda comment_id: f"/api/v1/comments/{comment_id}",
+    "feed": lambda comment_id: "/api/v1/comments/?limit=50",
+}
+
+
+async def burst(client: AsyncClient, url: str, concurrency: int, headers: dict):
+    responses = await asyncio.gather(*(client.get(url, headers=headers) for _ in range(concurrency)))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def run(database_url: str, size: int, concurrency: int, rounds: int):
+    engine = instrument_engine(create_async_engine(database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    restore = feed_cache.enabled, single_flight.enabled, admission.limit, admission.max_limit
+    feed_cache.enabled = False
+    admission.limit = admission.max_limit = concurrency * 2
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        comment_id = await seed(session_factory, size)
+        headers = {"Authorization": f"Bearer {create_access_token('user1')}"}
+
+        print(f"{engine.dialect.name}, {size} comments, {concurrency} concurrent requests x {rounds} rounds")
+        print(f"{'scenario':<10} {'coalesce':>8} {'queries/req':>12} {'saved':>7} {'burst p50 ms':>13}")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for name, url in SCENARIOS.items():
+                baseline = None
+                for enabled in (False, True):
+                    single_flight.enabled = enabled
+                    await burst(client, url(comment_id), concurrency, headers)
+                    timings = []
+                    with track_queries() as stats:
+                        for _ in range(rounds):
+                            started = time.perf_counter()
+                            await burst(client, url(comment_id), concurrency, headers)
+                            timings.append(time.perf_counter() - started)
+                    per_request = stats.count / (rounds * concurrency)
+                    baseline = baseline or per_request
+                    saved = 1 - per_request / baseline
+                    print(f"{name:<10} {'on' if enabled else 'off':>8} {per_request:>12.2f} "
+                          f"{saved:>7.0%} {statistics.median(timings) * 1000:>13.1f}")
+    finally:
+        feed_cache.enabled, single_flight.enabled, admission.limit, admission.max_limit = restore
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_session_factory, None)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--size", type=int, default=1000, help="Comments to seed")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(run(args.database_url, args.size, args.concurrency, args.rounds))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        asyncio.run(run(url, args.size, args.concurrency, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
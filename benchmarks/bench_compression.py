@@ -0,0 +1,58 @@
+"""Storage size and encode/decode cost of CompressedText across content sizes.
+
+Run with ``python -m benchmarks.bench_compression``.
+"""
+import argparse
+import random
+import string
+import timeit
+
+from app.models.types import decode_text, encode_text, zstandard
+
+SIZES = [64, 256, 1024, 4096, 16384, 65536]
+
+
+def make_content(size: int, seed: int = 0) -> str:
+    # Mix of repeated words and random tokens, roughly like pasted payloads.
+    rng = random.Random(seed)
+    words = ["status", "ok", "error", "request", "user", "group", "comment", "value"]
+    parts = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.7:
+            part = rng.choice(words)
+        else:
+            part = "".join(rng.choices(string.ascii_letters + string.digits, k=8))
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)[:size]
+
+
+def bench(algorithm: str, threshold: int, number: int):
+    print(f"\nalgorithm={algorithm} threshold={threshold}B")
+    print(f"{'size':>8} {'stored':>8} {'ratio':>7} {'encode us':>10} {'decode us':>10}")
+    for size in SIZES:
+        content = make_content(size)
+        encoded = encode_text(content, threshold=threshold, algorithm=algorithm)
+        assert decode_text(encoded) == content
+        encode_us = timeit.timeit(
+            lambda: encode_text(content, threshold=threshold, algorithm=algorithm), number=number
+        ) / number * 1e6
+        decode_us = timeit.timeit(lambda: decode_text(encoded), number=number) / number * 1e6
+        ratio = len(encoded) / len(content.encode("utf-8"))
+        print(f"{size:>8} {len(encoded):>8} {ratio:>7.2f} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=int, default=1024)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    algorithms = ["zlib"] + (["zstd"] if zstandard is not None else [])
+    for algorithm in algorithms:
+        bench(algorithm, args.threshold, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""Latency benchmarks for every REST route, the GraphQL operations and the
+hot repository methods.
+
+Requests run in-process through ``httpx.ASGITransport`` with the same
+dependency overrides as ``tests/conftest.py``. For each data size the schema
+is recreated and seeded, then every scenario is timed and p50/p99 latency and
+sequential throughput are reported. Results can be saved as a JSON baseline
+and later runs compared against it; the run exits non-zero when a scenario
+regresses past the configured threshold.
+
+    python -m benchmarks.bench_endpoints --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_endpoints --baseline benchmarks/baseline.json
+
+By default an in-memory SQLite database is used. ``--database-url`` points the
+suite at a local Postgres instead; its tables are dropped and recreated, so
+use a dedicated database.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app import repositories, schemas
+from app.api.deps import get_db, get_session_factory
+from app.config.database import Base
+from app.core.cache import feed_cache
+from app.core.security import create_access_token, get_password_hash
+from app.main import app
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+
+SQLITE_URL = "sqlite+aiosqlite:///:memory:"
+GROUP = "bench"
+PASSWORD = "benchpass"
+USERS = 50
+HISTORY = 20
+
+
+@dataclass
+class Context:
+    client: AsyncClient
+    session_factory: async_sessionmaker
+    headers: Dict[str, str]
+    user_id: int
+    comment_id: int
+    size: int
+
+
+@dataclass
+class Scenario:
+    name: str
+    kind: str
+    run: Callable[[Context, Any], Awaitable[None]]
+    # Untimed per-iteration setup; its return value is passed to ``run``.
+    prepare: Optional[Callable[[Context, int], Awaitable[Any]]] = None
+    # Caps the iteration count for bcrypt-bound scenarios.
+    iterations: Optional[int] = None
+    cache: bool = False
+
+
+@dataclass
+class Result:
+    p50_ms: float
+    p99_ms: float
+    ops_per_sec: float
+    iterations: int
+    timings: List[float] = field(default_factory=list, repr=False)
+
+    def to_json(self) -> dict:
+        return {
+            "p50_ms": round(self.p50_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
+            "ops_per_sec": round(self.ops_per_sec, 1),
+            "iterations": self.iterations,
+        }
+
+
+def _check(response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> "
+                           f"{response.status_code}: {response.text[:200]}")
+    return response
+
+
+async def _graphql(ctx: Context, query: str, variables: Optional[dict] = None):
+    response = _check(await ctx.client.post(
+        "/graphql", json={"query": query, "variables": variables or {}}, headers=ctx.headers
+    ))
+    errors = response.json().get("errors")
+    if errors:
+        raise RuntimeError(f"GraphQL errors: {errors}")
+
+
+async def _new_comment(ctx: Context, i: int) -> int:
+    async with ctx.session_factory() as db:
+        comment = await repositories.comment.create_with_user(
+            db, obj_in=schemas.CommentCreate(content=f"disposable {i}"), user_id=ctx.user_id
+        )
+        return comment.id
+
+
+async def _new_user(ctx: Context, i: int) -> int:
+    async with ctx.session_factory() as db:
+        user = User(username=f"disposable-{ctx.size}-{i}", hashed_password="x", group="other")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def _feed_etag(ctx: Context, i: int) -> str:
+    return _check(await ctx.client.get("/api/v1/comments/", headers=ctx.headers)).headers["ETag"]
+
+
+async def _repository(ctx: Context, call):
+    async with ctx.session_factory() as db:
+        await call(db)
+
+
+def scenarios() -> List[Scenario]:
+    api = "/api/v1"
+    return [
+        # REST
+        Scenario("GET /health", "rest", lambda ctx, i: _get(ctx, f"{api}/health", auth=False)),
+        Scenario("POST /auth/login", "rest", iterations=5, run=lambda ctx, i: _post(
+            ctx, f"{api}/auth/login", data={"username": "user1", "password": PASSWORD}, auth=False)),
+        Scenario("POST /users/", "rest", iterations=5, run=lambda ctx, i: _post(
+            ctx, f"{api}/users/",
+            json={"username": f"new-{ctx.size}-{i}", "password": PASSWORD, "group": "other"}, auth=False)),
+        Scenario("GET /users/", "rest", lambda ctx, i: _get(ctx, f"{api}/users/")),
+        Scenario("GET /users/{id}", "rest", lambda ctx, i: _get(ctx, f"{api}/users/{ctx.user_id}")),
+        Scenario("PUT /users/{id}", "rest", lambda ctx, i: _send(
+            ctx, "PUT", f"{api}/users/{ctx.user_id}", json={"group": GROUP})),
+        Scenario("DELETE /users/{id}", "rest", prepare=_new_user,
+                 run=lambda ctx, user_id: _send(ctx, "DELETE", f"{api}/users/{user_id}")),
+        Scenario("POST /comments/", "rest", lambda ctx, i: _post(
+            ctx, f"{api}/comments/", json={"content": f"benchmark comment {i}"})),
+        Scenario("GET /comments/", "rest", lambda ctx, i: _get(ctx, f"{api}/comments/")),
+        Scenario("GET /comments/ (cached)", "rest", cache=True,
+                 run=lambda ctx, i: _get(ctx, f"{api}/comments/")),
+        Scenario("GET /comments/ (If-None-Match)", "rest", prepare=_feed_etag,
+                 run=lambda ctx, etag: _get(ctx, f"{api}/comments/", headers={"If-None-Match": etag})),
+        Scenario("GET /comments/?fields=id,content", "rest", lambda ctx, i: _get(
+            ctx, f"{api}/comments/", params={"fields": "id,content"})),
+        Scenario("GET /comments/export", "rest", lambda ctx, i: _get(ctx, f"{api}/comments/export")),
+        Scenario("GET /comments/{id}", "rest", lambda ctx, i: _get(ctx, f"{api}/comments/{ctx.comment_id}")),
+        Scenario("PUT /comments/{id}", "rest", lambda ctx, i: _send(
+            ctx, "PUT", f"{api}/comments/{ctx.comment_id}", json={"content": f"edit {i}"})),
+        Scenario("DELETE /comments/{id}", "rest", prepare=_new_comment,
+                 run=lambda ctx, comment_id: _send(ctx, "DELETE", f"{api}/comments/{comment_id}")),
+        Scenario("GET /comments/{id}/history/export", "rest", lambda ctx, i: _get(
+            ctx, f"{api}/comments/{ctx.comment_id}/history/export")),
+        Scenario("GET /users/comment/{id}", "rest", lambda ctx, i: _get(
+            ctx, f"{api}/users/comment/{ctx.comment_id}")),
+        Scenario("GET /groups/{group}/stats", "rest", lambda ctx, i: _get(ctx, f"{api}/groups/{GROUP}/stats")),
+        # GraphQL
+        Scenario("query users", "graphql", lambda ctx, i: _graphql(ctx, "{ users { id username group } }")),
+        Scenario("query comments", "graphql", lambda ctx, i: _graphql(
+            ctx, "{ comments { id content createdAt user { username } } }")),
+        Scenario("query commentHistory", "graphql", lambda ctx, i: _graphql(
+            ctx, "query($id: Int!) { commentHistory(commentId: $id) { id newValue } }",
+            {"id": ctx.comment_id})),
+        Scenario("query groupStats", "graphql", lambda ctx, i: _graphql(
+            ctx, "{ groupStats { group commentCount } }")),
+        Scenario("mutation createComment", "graphql", lambda ctx, i: _graphql(
+            ctx, "mutation($c: String!) { createComment(input: {content: $c}) { id } }",
+            {"c": f"graphql comment {i}"})),
+        Scenario("mutation updateComment", "graphql", lambda ctx, i: _graphql(
+            ctx, "mutation($id: Int!, $c: String) { updateComment(commentId: $id, input: {content: $c}) { id } }",
+            {"id": ctx.comment_id, "c": f"graphql edit {i}"})),
+        Scenario("mutation createUser", "graphql", iterations=5, run=lambda ctx, i: _graphql(
+            ctx, "mutation($u: String!, $p: String!) { createUser(input: {username: $u, password: $p, group: \"other\"}) { id } }",
+            {"u": f"gql-{ctx.size}-{i}", "p": PASSWORD})),
+        # Repositories
+        Scenario("comment.get_by_user_group", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.comment.get_by_user_group(db, user_group=GROUP))),
+        Scenario("comment.get_by_user_group_rows", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.comment.get_by_user_group_rows(db, user_group=GROUP))),
+        Scenario("comment.get_feed_version", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.comment.get_feed_version(db, user_group=GROUP))),
+        Scenario("comment.get_with_user", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.comment.get_with_user(db, id=ctx.comment_id))),
+        Scenario("comment_history.get_by_comment", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.comment_history.get_by_comment(db, comment_id=ctx.comment_id))),
+        Scenario("user.get_multi_rows", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.user.get_multi_rows(db))),
+        Scenario("stats.get_group_stats", "repository", lambda ctx, i: _repository(
+            ctx, lambda db: repositories.stats.get_group_stats(db, group=GROUP))),
+    ]
+
+
+async def _send(ctx: Context, method: str, url: str, *, auth: bool = True, headers=None, **kwargs):
+    merged = {**(ctx.headers if auth else {}), **(headers or {})}
+    _check(await ctx.client.request(method, url, headers=merged, **kwargs))
+
+
+def _get(ctx: Context, url: str, **kwargs):
+    return _send(ctx, "GET", url, **kwargs)
+
+
+def _post(ctx: Context, url: str, **kwargs):
+    return _send(ctx, "POST", url, **kwargs)
+
+
+async def seed(session_factory, size: int) -> int:
+    hashed = get_password_hash(PASSWORD)
+    async with session_factory() as db:
+        await db.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "hashed_password": hashed, "group": GROUP}
+            for i in range(1, USERS + 1)
+        ])
+        await db.execute(insert(Comment), [
+            {"id": i, "content": f"comment {i} " + "lorem ipsum " * 8, "user_id": i % USERS + 1}
+            for i in range(1, size + 1)
+        ])
+        # Comment ``size`` is authored by user1; give it an edit history.
+        await db.execute(insert(CommentHistory), [
+            {"comment_id": size, "old_value": f"v{i - 1}" if i else None, "new_value": f"v{i}"}
+            for i in range(HISTORY)
+        ])
+        await db.commit()
+        await repositories.stats.reconcile(db)
+    return size
+
+
+async def measure(ctx: Context, scenario: Scenario, iterations: int, warmup: int) -> Result:
+    count = min(iterations, scenario.iterations or iterations)
+    feed_cache.enabled = scenario.cache
+    feed_cache.clear()
+    timings = []
+    for i in range(warmup + count):
+        state = await scenario.prepare(ctx, i) if scenario.prepare else i
+        started = time.perf_counter()
+        await scenario.run(ctx, state)
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+    p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+    return Result(
+        p50_ms=statistics.median(timings) * 1000,
+        p99_ms=p99 * 1000,
+        ops_per_sec=len(timings) / sum(timings),
+        iterations=len(timings),
+        timings=timings,
+    )
+
+
+async def run_suite(database_url: str, sizes: List[int], iterations: int, warmup: int, only: Optional[str]):
+    if database_url.startswith("sqlite"):
+        engine = create_async_engine(
+            database_url, poolclass=StaticPool, connect_args={"check_same_thread": False}
+        )
+    else:
+        engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    cache_enabled = feed_cache.enabled
+
+    results: Dict[str, dict] = {}
+    selected = [s for s in scenarios() if not only or only == s.kind or only in s.name]
+    try:
+        for size in sizes:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            comment_id = await seed(session_factory, size)
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                ctx = Context(
+                    client=client,
+                    session_factory=session_factory,
+                    headers={"Authorization": f"Bearer {create_access_token('user1')}"},
+                    user_id=1,
+                    comment_id=comment_id,
+                    size=size,
+                )
+                print(f"\n{engine.dialect.name}, {size} comments")
+                print(f"{'scenario':<42} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9}")
+                for scenario in selected:
+                    result = await measure(ctx, scenario, iterations, warmup)
+                    results[f"{engine.dialect.name}:{size}:{scenario.name}"] = result.to_json()
+                    print(f"{scenario.name:<42} {result.p50_ms:>9.2f} {result.p99_ms:>9.2f} "
+                          f"{result.ops_per_sec:>9.1f}")
+    finally:
+        feed_cache.enabled = cache_enabled
+        feed_cache.clear()
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_session_factory, None)
+        await engine.dispose()
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: dict, p50_threshold: float, p99_threshold: float,
+            min_delta_ms: float) -> List[str]:
+    """Return a line per scenario that regressed past its threshold.
+
+    Differences smaller than ``min_delta_ms`` are ignored so that sub-
+    millisecond scenarios do not fail on timer noise.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        for metric, threshold in (("p50_ms", p50_threshold), ("p99_ms", p99_threshold)):
+            before, after = previous[metric], current[metric]
+            if after - before > min_delta_ms and after > before * (1 + threshold):
+                regressions.append(
+                    f"{key} {metric}: {before:.2f} -> {after:.2f} ms "
+                    f"(+{(after / before - 1) * 100:.0f}%, limit {threshold * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=SQLITE_URL)
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated comment counts")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", help="Only run one kind (rest, graphql, repository) or scenarios whose name contains this text")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON file")
+    parser.add_argument("--save-baseline", help="Write the results to this baseline JSON file")
+    parser.add_argument("--threshold", type=float, help="Allowed p50 slowdown as a fraction (default 0.25)")
+    parser.add_argument("--p99-threshold", type=float, help="Allowed p99 slowdown as a fraction (default 0.5)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = asyncio.run(run_suite(args.database_url, sizes, args.iterations, args.warmup, args.only))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        thresholds = baseline.get("thresholds", {})
+        p50_threshold = args.threshold if args.threshold is not None else thresholds.get("p50", 0.25)
+        p99_threshold = args.p99_threshold if args.p99_threshold is not None else thresholds.get("p99", 0.5)
+        regressions = compare(results, baseline, p50_threshold, p99_threshold, args.min_delta_ms)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1
+        else:
+            print("\nNo regressions against baseline.")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as handle:
+            json.dump({
+                "thresholds": {
+                    "p50": args.threshold if args.threshold is not None else 0.25,
+                    "p99": args.p99_threshold if args.p99_threshold is not None else 0.5,
+                },
+                "results": results,
+            }, handle, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save_baseline}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
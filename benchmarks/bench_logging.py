@@ -0,0 +1,75 @@
+"""Request latency with handlers called inline vs behind the log queue.
+
+Sends sequential requests to ``/api/v1/health`` in-process, so each request
+pays for the two access-log lines written by RequestLoggingMiddleware and
+little else. File handlers write to a temporary LOG_DIR; console output goes
+to /dev/null. On a fast local disk both modes are close; ``--io-delay-ms``
+adds a sleep to every app.log write to model slow or network-backed storage
+and rotation stalls, which is where the queue pays off.
+Run with ``python -m benchmarks.bench_logging``.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from httpx import ASGITransport, AsyncClient
+
+from app.config.settings import settings
+from app.main import app
+from app.utils.logger import setup_logging, stop_logging
+
+
+async def measure(requests: int):
+    timings = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(requests):
+            started = time.perf_counter()
+            await client.get("/api/v1/health")
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings) * 1000,
+        "p99": timings[int(len(timings) * 0.99) - 1] * 1000,
+        "max": timings[-1] * 1000,
+    }
+
+
+def slow_down_writes(delay: float):
+    emit = RotatingFileHandler.emit
+
+    def slow_emit(self, record):
+        time.sleep(delay)
+        emit(self, record)
+
+    RotatingFileHandler.emit = slow_emit
+
+
+async def main(requests: int, json_format: bool, io_delay_ms: float):
+    settings.LOG_JSON = json_format
+    if io_delay_ms:
+        slow_down_writes(io_delay_ms / 1000)
+    print(f"{'mode':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        for queued in (False, True):
+            with tempfile.TemporaryDirectory() as log_dir:
+                settings.LOG_DIR = log_dir
+                setup_logging(queued=queued)
+                await measure(50)
+                result = await measure(requests)
+                stop_logging()
+            mode = "queued" if queued else "inline"
+            print(f"{mode:>8} {result['p50']:>8.3f} {result['p99']:>8.3f} {result['max']:>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="Use the JSON formatter")
+    parser.add_argument("--io-delay-ms", type=float, default=0.0, help="Simulated latency per file write")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.json, args.io_delay_ms))
@@ -0,0 +1,94 @@
+"""ORM + response_model serialization vs the row-projection fast path.
+
+Builds a SQLite database with one group's feed and times both ways of
+producing the JSON body for 100, 1000 and 10000-row pages, reporting
+wall time and peak traced memory. Run with
+``python -m benchmarks.bench_serialization``.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app import repositories, schemas
+from app.config.database import Base
+from app.models.comment import Comment
+from app.models.user import User
+
+SIZES = [100, 1000, 10000]
+
+
+async def build(session_factory, rows: int):
+    async with session_factory() as db:
+        await db.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "hashed_password": "x", "group": "bench"}
+            for i in range(1, 51)
+        ])
+        await db.execute(insert(Comment), [
+            {"content": f"comment {i} " + "lorem ipsum " * 8, "user_id": i % 50 + 1}
+            for i in range(rows)
+        ])
+        await db.commit()
+
+
+async def orm_path(db: AsyncSession, limit: int) -> bytes:
+    comments = await repositories.comment.get_by_user_group(db, user_group="bench", limit=limit)
+    return JSONResponse(
+        content=jsonable_encoder([schemas.Comment.model_validate(c) for c in comments])
+    ).body
+
+
+async def row_path(db: AsyncSession, limit: int) -> bytes:
+    rows = await repositories.comment.get_by_user_group_rows(db, user_group="bench", limit=limit)
+    return schemas.comment.comment_rows_adapter.dump_json(rows)
+
+
+async def measure(session_factory, path, limit: int, repeat: int):
+    timings = []
+    peak = 0
+    body = b""
+    for _ in range(repeat):
+        async with session_factory() as db:
+            tracemalloc.start()
+            started = time.perf_counter()
+            body = await path(db, limit)
+            timings.append(time.perf_counter() - started)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return statistics.median(timings), peak, body
+
+
+async def main(repeat: int):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await build(session_factory, max(SIZES))
+
+    print(f"{'rows':>6} {'path':>5} {'median ms':>10} {'peak KiB':>10} {'speedup':>8}")
+    for size in SIZES:
+        orm_time, orm_peak, orm_body = await measure(session_factory, orm_path, size, repeat)
+        row_time, row_peak, row_body = await measure(session_factory, row_path, size, repeat)
+        assert orm_body == row_body, "fast path output differs from response_model output"
+        print(f"{size:>6} {'orm':>5} {orm_time * 1000:>10.2f} {orm_peak / 1024:>10.0f}")
+        print(f"{size:>6} {'rows':>5} {row_time * 1000:>10.2f} {row_peak / 1024:>10.0f} {orm_time / row_time:>7.1f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
@@ -0,0 +1,284 @@
+"""Bulk-load users, comments and comment history from CSV or NDJSON files.
+
+On Postgres rows are streamed into the tables with COPY through asyncpg; on
+other backends (SQLite) they are inserted with batched executemany. Non-unique
+secondary indexes are dropped for the load and rebuilt afterwards (unique ones
+stay, so duplicates fail the load), id sequences are reset, and the activity
+rollups are rebuilt.
+
+    python -m migrations.bulk_load --users users.csv --comments comments.ndjson
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+import app.models  # noqa: F401
+from app import repositories
+from app.config.settings import settings
+from app.core.security import get_password_hash
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.types import encode_text
+from app.models.user import User
+
+
+def _int(value):
+    return None if value in (None, "") else int(value)
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _datetime(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+_warned_plaintext = False
+
+
+def _hashed_password(row: dict) -> str:
+    global _warned_plaintext
+    if row.get("hashed_password"):
+        return row["hashed_password"]
+    if row.get("password"):
+        if not _warned_plaintext:
+            print("  warning: hashing plaintext passwords with bcrypt; supply hashed_password for fast loads")
+            _warned_plaintext = True
+        return get_password_hash(row["password"])
+    raise ValueError(f"User {row.get('username')!r} has neither hashed_password nor password")
+
+
+# Column name -> converter from the raw CSV/NDJSON value (hashed_password is
+# special-cased in ``convert``).
+SPECS: Dict[str, Dict[str, Callable]] = {
+    "users": {
+        "id": _int,
+        "username": _text,
+        "hashed_password": None,
+        "group": _text,
+    },
+    "comments": {
+        "id": _int,
+        "content": _text,
+        "user_id": _int,
+        "created_at": _datetime,
+        "updated_at": _datetime,
+        "deleted_at": _datetime,
+    },
+    "comment_history": {
+        "id": _int,
+        "comment_id": _int,
+        "timestamp": _datetime,
+        "old_value": _text,
+        "new_value": _text,
+    },
+}
+
+TABLES: Dict[str, Table] = {
+    "users": User.__table__,
+    "comments": Comment.__table__,
+    "comment_history": CommentHistory.__table__,
+}
+
+COMPRESSED = {"content", "old_value", "new_value"}
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+
+
+def convert(table: str, row: dict) -> dict:
+    record = {}
+    for column, converter in SPECS[table].items():
+        if column == "hashed_password":
+            record[column] = _hashed_password(row)
+        else:
+            record[column] = converter(row.get(column))
+    if table == "comments" and record["created_at"] is None:
+        record["created_at"] = datetime.now(timezone.utc)
+    if table == "comment_history" and record["timestamp"] is None:
+        record["timestamp"] = datetime.now(timezone.utc)
+    return record
+
+
+def copy_columns(table: str, first: dict) -> List[str]:
+    """COPY columns for a source file, given its first converted record.
+    Sources without ids leave ``id`` out so the sequence assigns it, as an
+    insert of NULL does on SQLite."""
+    return [column for column in SPECS[table] if column != "id" or first["id"] is not None]
+
+
+def bulk_indexes(table: Table) -> list:
+    # Unique indexes stay in place: rebuilding one after the load would only
+    # report duplicates at the end, in the same transaction.
+    return [index for index in table.indexes if not index.unique]
+
+
+def batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Progress:
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def advance(self, count: int):
+        self.rows += count
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else 0.0
+        print(f"  {self.table}: {self.rows:,} rows ({rate:,.0f} rows/s)", flush=True)
+
+    def summary(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+
+async def _load_postgres(engine: AsyncEngine, sources: Dict[str, str], batch_size: int):
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        pg = raw.driver_connection
+        async with pg.transaction():
+            for table_name, path in sources.items():
+                table = TABLES[table_name]
+                indexes = bulk_indexes(table)
+                for index in indexes:
+                    await pg.execute(str(DropIndex(index, if_exists=True).compile(dialect=engine.dialect)))
+
+                columns = None
+                progress = Progress(table_name)
+                for batch in batched(read_rows(path), batch_size):
+                    records = []
+                    for row in batch:
+                        record = convert(table_name, row)
+                        if columns is None:
+                            columns = copy_columns(table_name, record)
+                        if (record["id"] is None) == ("id" in columns):
+                            raise ValueError(f"{path}: either every row or no row must have an id")
+                        for column in COMPRESSED & record.keys():
+                            if record[column] is not None:
+                                record[column] = encode_text(record[column])
+                        records.append(tuple(record[column] for column in columns))
+                    await pg.copy_records_to_table(table_name, records=records, columns=columns)
+                    progress.advance(len(records))
+
+                for index in indexes:
+                    await pg.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+                await pg.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table_name}), 1), "
+                    f"(SELECT MAX(id) FROM {table_name}) IS NOT NULL)"
+                )
+                print(f"  {table_name}: done at {progress.summary():,.0f} rows/s")
+
+
+async def _load_generic(engine: AsyncEngine, sources: Dict[str, str], batch_size: int):
+    async with engine.begin() as conn:
+        for table_name, path in sources.items():
+            table = TABLES[table_name]
+            indexes = bulk_indexes(table)
+            for index in indexes:
+                await conn.execute(DropIndex(index, if_exists=True))
+
+            progress = Progress(table_name)
+            for batch in batched(read_rows(path), batch_size):
+                records = [convert(table_name, row) for row in batch]
+                await conn.execute(insert(table), records)
+                progress.advance(len(records))
+
+            for index in indexes:
+                await conn.execute(CreateIndex(index))
+            # SQLite assigns max(rowid) + 1 to new rows, so there is no
+            # sequence to reset.
+            print(f"  {table_name}: done at {progress.summary():,.0f} rows/s")
+
+
+async def bulk_load(
+    engine: AsyncEngine,
+    *,
+    users: Optional[str] = None,
+    comments: Optional[str] = None,
+    history: Optional[str] = None,
+    batch_size: int = 5000,
+    rebuild_rollups: bool = True,
+):
+    # Parents before children so foreign keys hold.
+    sources = {
+        name: path
+        for name, path in (("users", users), ("comments", comments), ("comment_history", history))
+        if path
+    }
+    started = time.perf_counter()
+    if engine.dialect.name == "postgresql":
+        await _load_postgres(engine, sources, batch_size)
+    else:
+        await _load_generic(engine, sources, batch_size)
+
+    if rebuild_rollups:
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            await repositories.stats.reconcile(db)
+        print("  activity rollups rebuilt")
+    print(f"Bulk load finished in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", help="CSV or NDJSON file of users")
+    parser.add_argument("--comments", help="CSV or NDJSON file of comments")
+    parser.add_argument("--history", help="CSV or NDJSON file of comment history")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--database-url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--skip-rollups", action="store_true", help="Do not rebuild activity rollups")
+    args = parser.parse_args()
+
+    if not (args.users or args.comments or args.history):
+        parser.error("nothing to load: pass --users, --comments and/or --history")
+
+    async def run():
+        engine = create_async_engine(args.database_url)
+        try:
+            await bulk_load(
+                engine,
+                users=args.users,
+                comments=args.comments,
+                history=args.history,
+                batch_size=args.batch_size,
+                rebuild_rollups=not args.skip_rollups,
+            )
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
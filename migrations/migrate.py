@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import LargeBinary, create_engine, inspect, text
 
 import app.models
 from app.config.database import Base
 from app.config.settings import settings
+from app.models.types import CompressedText
 
 def create_database_if_not_exists():
     default_url = str(settings.DATABASE_URL).replace("+asyncpg", "").replace(settings.POSTGRES_DB, "postgres")
@@ -22,12 +23,54 @@ def create_database_if_not_exists():
         else:
             print(f"Database '{db_name}' already exists.")
 
+def add_soft_delete(connection):
+    """Adds ``comments.deleted_at`` and the partial indexes built on it to
+    a comments table created before soft delete."""
+    comments = Base.metadata.tables["comments"]
+    existing = {column["name"] for column in inspect(connection).get_columns("comments")}
+    if "deleted_at" not in existing:
+        column_type = comments.c.deleted_at.type.compile(dialect=connection.dialect)
+        print("Upgrading: adding comments.deleted_at")
+        connection.execute(text(f"ALTER TABLE comments ADD COLUMN deleted_at {column_type}"))
+    for index in comments.indexes:
+        index.create(connection, checkfirst=True)
+
+def compressed_column_upgrades(inspector) -> list:
+    """ALTERs for CompressedText columns still holding plain text from
+    before compression. Each value is kept behind the codec's raw (0x00)
+    header, so it reads back unchanged. PostgreSQL only: SQLite keeps the
+    old TEXT values, which ``decode_text`` returns as they are."""
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, CompressedText) or column.name not in existing:
+                continue
+            if isinstance(existing[column.name], LargeBinary):
+                continue
+            statements.append(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE bytea "
+                f"USING '\\x00'::bytea || convert_to({column.name}, 'UTF8')"
+            )
+    return statements
+
+def upgrade_tables(engine):
+    """Brings tables that create_all skipped, because they already
+    existed, up to the current models. Safe to run repeatedly."""
+    with engine.begin() as connection:
+        add_soft_delete(connection)
+        if connection.dialect.name == "postgresql":
+            for statement in compressed_column_upgrades(inspect(connection)):
+                print(f"Upgrading: {statement}")
+                connection.execute(text(statement))
+
 def create_tables():
     create_database_if_not_exists()
 
     ds = str(settings.DATABASE_URL).replace("+asyncpg", "")
     engine = create_engine(ds, echo=True)
     Base.metadata.create_all(bind=engine)
+    upgrade_tables(engine)
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
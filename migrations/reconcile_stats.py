@@ -0,0 +1,13 @@
+import asyncio
+
+from app.config.database import AsyncSessionLocal
+from app import repositories
+
+
+async def reconcile_stats():
+    async with AsyncSessionLocal() as db:
+        await repositories.stats.reconcile(db)
+        print("Activity rollups rebuilt from comments.")
+
+if __name__ == "__main__":
+    asyncio.run(reconcile_stats())
@@ -20,6 +20,9 @@ async def seed_data():
             existing_user = await repositories.user.get_by_username(db, username=user_data["username"])
             if not existing_user:
                 user = await repositories.user.create(db, obj_in=UserCreate(**user_data))
+                if user.username == "admin":
+                    user.is_admin = True
+                    await db.commit()
                 created_users.append(user)
                 print(f"Created user: {user.username}")
             else:
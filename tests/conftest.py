@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+from contextlib import contextmanager
 from typing import AsyncGenerator
 from httpx import AsyncClient, ASGITransport 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
@@ -7,12 +8,14 @@ from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.config.database import Base
-from app.api.deps import get_db
+from app.api.deps import get_db, get_session_factory
 from app.models.user import User
 from app.models.comment import Comment
 from app.models.comment_history import CommentHistory
 from app.core.security import get_password_hash, create_access_token
 from app import repositories
+from app.core.cache import feed_cache
+from app.core.queries import instrument_engine, track_queries
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -24,6 +27,7 @@ engine = create_async_engine(
     },
     poolclass=StaticPool,
 )
+instrument_engine(engine)
 
 TestingSessionLocal = async_sessionmaker(
     autocommit=False,
@@ -45,6 +49,7 @@ def event_loop():
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    feed_cache.clear()
     
     async with TestingSessionLocal() as session:
         yield session
@@ -59,6 +64,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -67,6 +73,84 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+class ASGIConnection:
+    """Drives a long-lived HTTP or WebSocket connection straight through the
+    ASGI app on the test loop, since ``ASGITransport`` buffers whole
+    responses and has no WebSocket support."""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+        self.task = None
+
+    @classmethod
+    def http(cls, path: str, headers: dict = None, query_string: bytes = b""):
+        connection = cls(cls._scope("http", path, headers, query_string))
+        connection.incoming.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+        return connection
+
+    @classmethod
+    def websocket(cls, path: str, headers: dict = None, query_string: bytes = b"", subprotocols=()):
+        scope = cls._scope("websocket", path, headers, query_string)
+        scope["subprotocols"] = list(subprotocols)
+        connection = cls(scope)
+        connection.incoming.put_nowait({"type": "websocket.connect"})
+        return connection
+
+    @staticmethod
+    def _scope(type: str, path: str, headers, query_string: bytes) -> dict:
+        return {
+            "type": type,
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http" if type == "http" else "ws",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query_string,
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("test", 80),
+        }
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(app(self.scope, self.incoming.get, self.outgoing.put))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.scope["type"] == "http":
+            self.incoming.put_nowait({"type": "http.disconnect"})
+        else:
+            self.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, 5)
+
+    async def receive(self, timeout: float = 5) -> dict:
+        return await asyncio.wait_for(self.outgoing.get(), timeout)
+
+    def send(self, message: dict):
+        self.incoming.put_nowait(message)
+
+
+@pytest.fixture
+def max_queries():
+    """Fail the block if it runs more than ``limit`` SQL statements.
+
+        with max_queries(3):
+            await client.get(...)
+    """
+    @contextmanager
+    def check(limit: int):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, ran {stats.count}:\n{stats.report()}"
+        )
+
+    return check
+
+
 @pytest.fixture
 async def test_user(db_session: AsyncSession) -> User:
     user_data = {
@@ -107,6 +191,14 @@ async def auth_headers_2(test_user_2: User) -> dict:
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture
+async def admin_headers(db_session: AsyncSession) -> dict:
+    admin = User(username="admin", hashed_password="x", group="administrators", is_admin=True)
+    db_session.add(admin)
+    await db_session.commit()
+    return {"Authorization": f"Bearer {create_access_token(admin.username)}"}
+
+
 @pytest.fixture
 async def test_comment(db_session: AsyncSession, test_user: User) -> Comment:
     comment_data = {
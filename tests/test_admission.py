@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.admission import AdmissionController, admission, request_lane
+from app.core.middleware import AdmissionMiddleware
+from app.main import app
+from tests.conftest import ASGIConnection
+
+
+async def queue(controller: AdmissionController, lane: str) -> asyncio.Task:
+    task = asyncio.create_task(controller.acquire(lane))
+    await asyncio.sleep(0)
+    return task
+
+
+class TestAdmissionController:
+    async def test_admits_up_to_the_limit_then_queues(self):
+        controller = AdmissionController(2, queue_timeout=1)
+        assert await controller.acquire("read")
+        assert await controller.acquire("read")
+
+        waiting = await queue(controller, "read")
+        assert controller.queued == 1 and not waiting.done()
+
+        controller.release()
+        assert await waiting
+        assert controller.in_flight == 2 and controller.queued == 0
+
+    async def test_full_queue_sheds_immediately(self):
+        controller = AdmissionController(1, queue_size=1, queue_timeout=1)
+        await controller.acquire("read")
+        waiting = await queue(controller, "read")
+
+        assert not await controller.acquire("read")
+        waiting.cancel()
+
+    async def test_wait_times_out(self):
+        controller = AdmissionController(1, queue_timeout=0.01)
+        await controller.acquire("read")
+
+        assert not await controller.acquire("read")
+        assert controller.queued == 0
+        assert controller.in_flight == 1
+
+    async def test_priority_lanes_are_served_first(self):
+        controller = AdmissionController(1, queue_timeout=1)
+        await controller.acquire("read")
+        read = await queue(controller, "read")
+        write = await queue(controller, "write")
+        auth = await queue(controller, "auth")
+
+        controller.release()
+        assert await auth
+        assert not read.done() and not write.done()
+        controller.release()
+        assert await write
+        controller.release()
+        assert await read
+
+    async def test_priority_request_evicts_queued_read(self):
+        controller = AdmissionController(1, queue_size=1, queue_timeout=1)
+        await controller.acquire("read")
+        read = await queue(controller, "read")
+
+        login = await queue(controller, "auth")
+        assert await read is False
+        controller.release()
+        assert await login
+
+    async def test_limit_backs_off_when_slow_and_grows_when_saturated(self):
+        controller = AdmissionController(10, min_limit=2, max_limit=20, target_latency=0.1)
+        for _ in range(10):
+            await controller.acquire("read")
+        for _ in range(10):
+            controller.release(latency=0.5)
+        assert controller.limit == pytest.approx(9.0)
+
+        # Fast but not saturated: no growth.
+        await controller.acquire("read")
+        controller.release(latency=0.01)
+        assert controller.limit == pytest.approx(9.0)
+
+        for _ in range(8):
+            await controller.acquire("read")
+        for _ in range(20):
+            await controller.acquire("read")
+            controller.release(latency=0.01)
+        assert controller.limit > 10.0
+
+    def test_lanes(self):
+        assert request_lane("POST", "/api/v1/auth/login") == "auth"
+        assert request_lane("PUT", "/api/v1/comments/1") == "write"
+        assert request_lane("GET", "/api/v1/comments/") == "read"
+        assert request_lane("POST", "/graphql") == "read"
+
+
+class TestAdmissionMiddleware:
+    async def test_sheds_with_retry_after(self, client: AsyncClient, monkeypatch):
+        async def full(lane):
+            return False
+
+        monkeypatch.setattr(admission, "acquire", full)
+
+        response = await client.get("/api/v1/comments/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        # Probes are never shed.
+        assert (await client.get("/api/v1/health")).status_code == 200
+
+    async def test_streamed_body_gives_the_slot_back(self):
+        controller = AdmissionController(1)
+        finish = asyncio.Event()
+        sent = []
+
+        async def streaming_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"row\n", "more_body": True})
+            await finish.wait()
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = AdmissionMiddleware(streaming_app, controller)
+        task = asyncio.create_task(middleware({"type": "http", "method": "GET", "path": "/export"}, None, send))
+        while len(sent) < 2:
+            await asyncio.sleep(0)
+        assert controller.in_flight == 0
+
+        finish.set()
+        await task
+        assert controller.in_flight == 0
+
+    async def test_sse_stream_gives_its_slot_back(self, client: AsyncClient, auth_headers):
+        before = admission.in_flight
+        async with ASGIConnection.http("/api/v1/comments/stream", auth_headers) as stream:
+            assert (await stream.receive())["status"] == 200
+            assert (await stream.receive())["more_body"]
+            assert admission.in_flight == before
+        assert admission.in_flight == before
+
+    def test_exemption_follows_route_metadata(self):
+        def scope(path):
+            return {"type": "http", "app": app, "method": "GET", "path": path, "root_path": ""}
+
+        assert AdmissionMiddleware.exempt(scope("/api/v1/health"))
+        assert AdmissionMiddleware.exempt(scope("/metrics"))
+        assert not AdmissionMiddleware.exempt(scope("/api/v1/comments/"))
+        assert not AdmissionMiddleware.exempt(scope("/nowhere"))
+
+    async def test_releases_the_slot(self, client: AsyncClient, auth_headers):
+        before = admission.in_flight
+        await client.get("/api/v1/comments/", headers=auth_headers)
+        assert admission.in_flight == before
@@ -154,4 +154,60 @@ class TestCommentsAPI:
         response = await client.delete(f"/api/v1/comments/{test_comment.id}", headers=auth_headers_2)
         
         assert response.status_code == 403
-        assert "permissions" in response.json()["detail"]
\ No newline at end of file
+        assert "permissions" in response.json()["detail"]
+
+class TestCommentFeed:
+    async def test_feed_newest_first(self, client: AsyncClient, auth_headers: dict):
+        ids = []
+        for i in range(3):
+            response = await client.post("/api/v1/comments/", json={"content": f"c{i}"}, headers=auth_headers)
+            ids.append(response.json()["id"])
+
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        assert [c["id"] for c in response.json()] == list(reversed(ids))
+
+    async def test_feed_since_id(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        response = await client.post("/api/v1/comments/", json={"content": "newer"}, headers=auth_headers)
+        newer_id = response.json()["id"]
+
+        response = await client.get(
+            "/api/v1/comments/", params={"since_id": test_comment.id}, headers=auth_headers
+        )
+        assert [c["id"] for c in response.json()] == [newer_id]
+
+        response = await client.get(
+            "/api/v1/comments/", params={"since_id": newer_id}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_truncated_since_id_polls_walk_forward(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        ids = []
+        for i in range(5):
+            response = await client.post("/api/v1/comments/", json={"content": f"burst {i}"}, headers=auth_headers)
+            ids.append(response.json()["id"])
+
+        seen, cursor = [], test_comment.id
+        while True:
+            response = await client.get(
+                "/api/v1/comments/", params={"since_id": cursor, "limit": 2}, headers=auth_headers
+            )
+            page = [c["id"] for c in response.json()]
+            if not page:
+                break
+            seen += page
+            cursor = max(page)
+
+        assert seen == ids
+
+    async def test_feed_since_timestamp(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        response = await client.get(
+            "/api/v1/comments/", params={"since": "2000-01-01T00:00:00"}, headers=auth_headers
+        )
+        assert [c["id"] for c in response.json()] == [test_comment.id]
+
+        response = await client.get(
+            "/api/v1/comments/", params={"since": "2999-01-01T00:00:00"}, headers=auth_headers
+        )
+        assert response.json() == []
@@ -0,0 +1,67 @@
+import json
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+from app.schemas.comment import CommentCreate
+from migrations.bulk_load import bulk_indexes, bulk_load, convert, copy_columns
+from tests.conftest import engine
+
+
+class TestBulkLoad:
+    async def test_loads_csv_and_ndjson(self, db_session: AsyncSession, tmp_path):
+        users = tmp_path / "users.csv"
+        users.write_text("id,username,hashed_password,password,group\n1,alice,x,,readers\n2,bob,,secret,writers\n")
+        comments = tmp_path / "comments.ndjson"
+        comments.write_text("\n".join(json.dumps(row) for row in [
+            {"id": 1, "content": "first", "user_id": 1, "created_at": "2024-01-01T10:00:00Z"},
+            {"id": 2, "content": "second " * 400, "user_id": 1},
+            {"id": 3, "content": "third", "user_id": 2},
+        ]) + "\n")
+        history = tmp_path / "history.csv"
+        history.write_text("id,comment_id,timestamp,old_value,new_value\n1,1,2024-01-01T10:05:00+00:00,,first\n")
+
+        await bulk_load(
+            engine, users=str(users), comments=str(comments), history=str(history), batch_size=2
+        )
+
+        assert await db_session.scalar(select(func.count()).select_from(User)) == 2
+        assert await db_session.scalar(select(func.count()).select_from(CommentHistory)) == 1
+        second = await db_session.get(Comment, 2)
+        assert second.content == "second " * 400
+        assert await repositories.stats.get_group_stats(db_session, group="readers") == 2
+        assert await repositories.stats.get_user_stats(db_session, user_id=2) == 1
+
+        created = await repositories.comment.create_with_user(
+            db_session, obj_in=CommentCreate(content="after load"), user_id=2
+        )
+        assert created.id == 4
+
+    async def test_rows_without_ids_are_numbered_by_the_database(self, db_session: AsyncSession, tmp_path):
+        users = tmp_path / "users.ndjson"
+        users.write_text("\n".join(json.dumps(row) for row in [
+            {"username": "carol", "hashed_password": "x", "group": "readers"},
+            {"username": "dave", "hashed_password": "x", "group": "readers"},
+        ]) + "\n")
+
+        await bulk_load(engine, users=str(users))
+
+        ids = (await db_session.execute(select(User.id).order_by(User.id))).scalars().all()
+        assert ids == [1, 2]
+
+    def test_copy_columns_leave_out_missing_ids(self):
+        with_id = convert("users", {"id": "5", "username": "a", "hashed_password": "x", "group": "g"})
+        without_id = convert("users", {"username": "a", "hashed_password": "x", "group": "g"})
+
+        assert copy_columns("users", with_id) == ["id", "username", "hashed_password", "group"]
+        assert copy_columns("users", without_id) == ["username", "hashed_password", "group"]
+
+    def test_unique_indexes_stay_in_place(self):
+        names = {index.name for index in bulk_indexes(User.__table__)}
+
+        assert "ix_users_username" not in names
+        assert "ix_users_group" in names
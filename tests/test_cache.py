@@ -0,0 +1,187 @@
+import asyncio
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories, schemas
+from app.core.cache import FeedCache, feed_cache
+from app.core.security import create_access_token
+from app.models.comment import Comment
+from app.models.user import User
+
+
+def loader_for(value, size=None, calls=None):
+    async def load():
+        if calls is not None:
+            calls.append(value)
+        return value, len(value) if size is None else size
+    return load
+
+
+class TestFeedCache:
+    async def test_hit_after_miss(self):
+        cache = FeedCache(max_entries=10, max_bytes=1000, ttl=60, stale_ttl=0, enabled=True)
+        calls = []
+
+        assert await cache.get_or_load("g", "k", loader_for(b"page", calls=calls)) == b"page"
+        assert await cache.get_or_load("g", "k", loader_for(b"other", calls=calls)) == b"page"
+
+        assert calls == [b"page"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.hit_ratio == 0.5
+
+    async def test_bounded_by_entries_and_bytes(self):
+        cache = FeedCache(max_entries=2, max_bytes=10, ttl=60, stale_ttl=0, enabled=True)
+
+        for key in ("a", "b", "c"):
+            await cache.get_or_load("g", key, loader_for(b"123"))
+        assert len(cache) == 2
+
+        await cache.get_or_load("g", "big", loader_for(b"12345678"))
+        assert cache.bytes_used <= 10
+        assert len(cache) == 1
+
+        await cache.get_or_load("g", "huge", loader_for(b"x" * 50))
+        assert cache.bytes_used <= 10
+
+    async def test_invalidate_group(self):
+        cache = FeedCache(max_entries=10, max_bytes=1000, ttl=60, stale_ttl=0, enabled=True)
+        await cache.get_or_load("g1", "k", loader_for(b"one"))
+        await cache.get_or_load("g2", "k", loader_for(b"two"))
+
+        cache.invalidate_group("g1")
+
+        assert await cache.get_or_load("g1", "k", loader_for(b"new")) == b"new"
+        assert await cache.get_or_load("g2", "k", loader_for(b"new")) == b"two"
+
+    async def test_load_racing_invalidation_is_not_stored(self):
+        cache = FeedCache(max_entries=10, max_bytes=1000, ttl=60, stale_ttl=0, enabled=True)
+
+        async def slow_load():
+            cache.invalidate_group("g")
+            return b"old", 3
+
+        await cache.get_or_load("g", "k", slow_load)
+
+        assert len(cache) == 0
+
+    async def test_stale_while_revalidate(self):
+        cache = FeedCache(max_entries=10, max_bytes=1000, ttl=0, stale_ttl=60, enabled=True)
+        await cache.get_or_load("g", "k", loader_for(b"v1"))
+        refreshes = []
+        release = asyncio.Event()
+
+        async def refresher():
+            refreshes.append(1)
+            await release.wait()
+            return b"v2", 2
+
+        first = await cache.get_or_load("g", "k", loader_for(b"x"), refresher)
+        second = await cache.get_or_load("g", "k", loader_for(b"x"), refresher)
+        assert first == second == b"v1"
+        assert cache.stats()["stale_hits"] == 2
+
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert refreshes == [1]
+        assert cache._entries[("g", "k")].value == b"v2"
+
+    async def test_disabled_always_loads(self):
+        cache = FeedCache(enabled=False)
+        calls = []
+
+        await cache.get_or_load("g", "k", loader_for(b"a", calls=calls))
+        await cache.get_or_load("g", "k", loader_for(b"a", calls=calls))
+
+        assert len(calls) == 2
+        assert len(cache) == 0
+
+
+class TestFeedCacheAPI:
+    async def test_cached_feed_matches_response_model_output(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_comment: Comment, test_user: User):
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        comments = await repositories.comment.get_by_user_group(db_session, user_group=test_user.group)
+        expected = JSONResponse(
+            content=jsonable_encoder([schemas.Comment.model_validate(c) for c in comments])
+        ).body
+        assert response.content == expected
+        assert response.headers["content-type"] == "application/json"
+
+    async def test_writes_invalidate_feed(self, client: AsyncClient, auth_headers: dict, test_comment: Comment, test_user: User):
+        await client.get("/api/v1/comments/", headers=auth_headers)
+        hits = feed_cache.hits
+        await client.get("/api/v1/comments/", headers=auth_headers)
+        assert feed_cache.hits == hits + 1
+
+        await client.put(
+            f"/api/v1/comments/{test_comment.id}", json={"content": "edited"}, headers=auth_headers
+        )
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+        assert response.json()[0]["content"] == "edited"
+
+    async def test_user_changes_invalidate_feed(self, client: AsyncClient, db_session: AsyncSession, test_comment: Comment, test_user: User):
+        reader = User(username="reader", hashed_password="x", group=test_user.group)
+        db_session.add(reader)
+        await db_session.commit()
+        reader_headers = {"Authorization": f"Bearer {create_access_token(reader.username)}"}
+        await client.get("/api/v1/comments/", headers=reader_headers)
+
+        await client.put(
+            f"/api/v1/users/{test_user.id}", json={"username": "renamed"}, headers=reader_headers
+        )
+
+        response = await client.get("/api/v1/comments/", headers=reader_headers)
+        assert response.json()[0]["user"]["username"] == "renamed"
+
+    async def test_hits_send_the_same_etag_as_conditional_checks(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        first = await client.get("/api/v1/comments/", headers=auth_headers)
+        hits = feed_cache.hits
+        second = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        assert feed_cache.hits == hits + 1
+        assert second.headers["ETag"] == first.headers["ETag"]
+        response = await client.get(
+            "/api/v1/comments/", headers={**auth_headers, "If-None-Match": second.headers["ETag"]}
+        )
+        assert response.status_code == 304
+
+    async def test_writes_from_other_workers_are_not_served_stale(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_comment: Comment, test_user: User):
+        await client.get("/api/v1/comments/", headers=auth_headers)
+
+        # Another worker's write: the database changes, this worker's cache is untouched.
+        db_session.add(Comment(content="elsewhere", user_id=test_user.id))
+        await repositories.stats.bump_version(db_session, test_user.group)
+        await db_session.commit()
+
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+        assert response.json()[0]["content"] == "elsewhere"
+        response = await client.post("/graphql", json={"query": "{ comments { content } }"}, headers=auth_headers)
+        assert response.json()["data"]["comments"][0]["content"] == "elsewhere"
+
+    async def test_deleting_a_user_invalidates_their_group(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_comment: Comment, test_user: User):
+        member = User(username="leaving", hashed_password="x", group=test_user.group)
+        db_session.add(member)
+        await db_session.commit()
+        etag = (await client.get("/api/v1/comments/", headers=auth_headers)).headers["ETag"]
+
+        response = await client.delete(f"/api/v1/users/{member.id}", headers=auth_headers)
+        assert response.status_code == 200
+
+        assert len(feed_cache) == 0
+        response = await client.get("/api/v1/comments/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    async def test_graphql_feed_uses_cache(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        query = {"query": "query { comments { id content } }"}
+        await client.post("/graphql", json=query, headers=auth_headers)
+        hits = feed_cache.hits
+
+        response = await client.post("/graphql", json=query, headers=auth_headers)
+
+        assert feed_cache.hits == hits + 1
+        assert response.json()["data"]["comments"][0]["id"] == test_comment.id
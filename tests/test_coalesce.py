@@ -0,0 +1,156 @@
+import asyncio
+
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.core.coalesce import SingleFlight, single_flight
+from app.core.queries import track_queries
+from app.models.comment import Comment
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+
+
+class TestSingleFlight:
+    async def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight(enabled=True)
+        calls = 0
+        release = asyncio.Event()
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return ["row"]
+
+        tasks = [asyncio.create_task(flight.do("key", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [["row"]] * 5
+        assert calls == 1
+
+        # Nothing in flight any more: the next caller runs its own query.
+        await flight.do("key", call)
+        assert calls == 2
+
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight(enabled=True)
+
+        async def call():
+            await asyncio.sleep(0)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(
+            flight.do("key", call), flight.do("key", call), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_followers_retry_when_the_leader_is_cancelled(self):
+        flight = SingleFlight(enabled=True)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "own result"
+
+        leader = asyncio.create_task(flight.do("key", slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("key", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "own result"
+
+    async def test_pending_writes_are_not_shared(self, db_session: AsyncSession):
+        db_session.add(User(username="pending", hashed_password="x", group="g"))
+        assert single_flight.key(db_session, select(User)) is None
+
+    async def test_flushed_writes_are_not_shared_until_commit(self, db_session: AsyncSession, test_user: User):
+        db_session.add(User(username="flushed", hashed_password="x", group="g"))
+        await db_session.flush()
+        assert single_flight.key(db_session, select(User)) is None
+
+        await db_session.commit()
+        assert single_flight.key(db_session, select(User)) is not None
+
+    async def test_core_writes_are_not_shared_until_rollback(self, db_session: AsyncSession, test_user: User):
+        await repositories.stats.bump_version(db_session, test_user.group)
+        assert single_flight.key(db_session, select(User)) is None
+
+        await db_session.rollback()
+        assert single_flight.key(db_session, select(User)) is not None
+
+    async def test_key_includes_parameters(self, db_session: AsyncSession):
+        first = single_flight.key(db_session, select(Comment).where(Comment.id == 1))
+        second = single_flight.key(db_session, select(Comment).where(Comment.id == 2))
+        assert first is not None and first != second
+        assert first == single_flight.key(db_session, select(Comment).where(Comment.id == 1))
+
+
+class TestCoalescedReads:
+    async def test_identical_concurrent_reads_run_once(self, test_comment: Comment):
+        async def read():
+            async with TestingSessionLocal() as session:
+                return await repositories.comment.get_fields(
+                    session, id=test_comment.id, fields=["id", "content", "user"]
+                )
+
+        with track_queries() as stats:
+            results = await asyncio.gather(*(read() for _ in range(5)))
+
+        assert stats.count == 1
+        assert all(r == results[0] for r in results)
+        # Every caller gets its own dicts.
+        assert len({id(r[0]) for r in results}) == 5
+
+    async def test_reads_after_a_commit_do_not_join_older_queries(self, db_session: AsyncSession, test_comment: Comment):
+        stmt = select(Comment.content).where(Comment.id == test_comment.id)
+        fetched, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_read():
+            rows = (await db_session.execute(stmt)).all()
+            fetched.set()
+            await release.wait()
+            return rows
+
+        leader = asyncio.create_task(single_flight.do(single_flight.key(db_session, stmt), slow_read))
+        await fetched.wait()
+
+        async with TestingSessionLocal() as session:
+            comment = await repositories.comment.get(session, id=test_comment.id)
+            await repositories.comment.update(session, db_obj=comment, obj_in={"content": "edited"})
+        async with TestingSessionLocal() as session:
+            # Joining the leader would wait for release: time out instead.
+            rows = await asyncio.wait_for(single_flight.fetch_all(session, stmt), 2)
+
+        assert rows[0].content == "edited"
+        release.set()
+        assert (await leader)[0].content == test_comment.content
+
+    async def test_permission_checked_per_caller(
+        self, client: AsyncClient, auth_headers, auth_headers_2, test_comment: Comment
+    ):
+        url = f"/api/v1/comments/{test_comment.id}"
+        own, other = await asyncio.gather(
+            client.get(url, headers=auth_headers), client.get(url, headers=auth_headers_2)
+        )
+
+        assert own.status_code == 200
+        assert own.json()["user"]["username"] == "testuser"
+        assert other.status_code == 403
+
+    async def test_disabled(self, test_comment: Comment, monkeypatch):
+        monkeypatch.setattr(single_flight, "enabled", False)
+
+        async def read():
+            async with TestingSessionLocal() as session:
+                return await repositories.comment.get_author_group(session, id=test_comment.id)
+
+        with track_queries() as stats:
+            await asyncio.gather(read(), read())
+        assert stats.count == 2
@@ -0,0 +1,107 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import LargeBinary, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.config.settings import Settings
+from app.models.comment import Comment
+from app.models.types import RAW, ZLIB, decode_text, encode_text
+from app.models.user import User
+from app.schemas.comment import CommentCreate
+from migrations.migrate import compressed_column_upgrades
+
+
+class TestCompressionCodec:
+    def test_small_values_stored_raw(self):
+        encoded = encode_text("short", threshold=1024)
+
+        assert encoded[0] == RAW
+        assert decode_text(encoded) == "short"
+
+    def test_large_values_compressed(self):
+        value = "repeat " * 1000
+
+        encoded = encode_text(value, threshold=1024, algorithm="zlib")
+
+        assert encoded[0] == ZLIB
+        assert len(encoded) < len(value)
+        assert decode_text(encoded) == value
+
+    def test_incompressible_values_stay_raw(self):
+        value = "xy"
+
+        encoded = encode_text(value, threshold=0, algorithm="zlib")
+
+        assert encoded[0] == RAW
+        assert decode_text(encoded) == value
+
+    def test_unicode_round_trip(self):
+        value = "héllo wörld ✓ " * 200
+
+        assert decode_text(encode_text(value, threshold=16)) == value
+
+    def test_legacy_text_values_pass_through(self):
+        assert decode_text("plain text") == "plain text"
+        assert decode_text(b"") == ""
+
+    def test_unknown_header_rejected(self):
+        with pytest.raises(ValueError):
+            decode_text(b"\x7fpayload")
+
+
+class TestCompressionSettings:
+    def test_algorithm_is_checked_at_load(self, monkeypatch):
+        with pytest.raises(ValidationError, match="must be 'zlib' or 'zstd'"):
+            Settings(COMPRESSION_ALGORITHM="lz4")
+
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+        with pytest.raises(ValidationError, match="requires the 'zstandard' package"):
+            Settings(COMPRESSION_ALGORITHM="zstd")
+
+
+class TestCompressedColumnUpgrade:
+    def test_plain_text_columns_are_converted_behind_the_raw_header(self):
+        legacy = {"content": String(), "old_value": String(), "new_value": LargeBinary()}
+        inspector = SimpleNamespace(
+            get_columns=lambda table: [{"name": name, "type": type} for name, type in legacy.items()]
+        )
+
+        statements = compressed_column_upgrades(inspector)
+
+        assert statements == [
+            "ALTER TABLE comments ALTER COLUMN content TYPE bytea "
+            "USING '\\x00'::bytea || convert_to(content, 'UTF8')",
+            "ALTER TABLE comment_history ALTER COLUMN old_value TYPE bytea "
+            "USING '\\x00'::bytea || convert_to(old_value, 'UTF8')",
+        ]
+
+
+class TestCompressedColumns:
+    async def test_large_comment_round_trip(self, db_session: AsyncSession, test_user: User):
+        content = "multi-kilobyte integration payload " * 200
+        comment = await repositories.comment.create_with_user(
+            db_session, obj_in=CommentCreate(content=content), user_id=test_user.id
+        )
+        history = await repositories.comment_history.create_history_entry(
+            db_session, comment_id=comment.id, old_value=content, new_value=content
+        )
+
+        stored = await db_session.execute(
+            text("SELECT content FROM comments WHERE id = :id"), {"id": comment.id}
+        )
+        raw = stored.scalar_one()
+        assert raw[0] == ZLIB
+        assert len(raw) < len(content)
+
+        db_session.expunge_all()
+        loaded = await db_session.get(Comment, comment.id)
+        assert loaded.content == content
+
+        entries = await repositories.comment_history.get_by_comment(db_session, comment_id=comment.id)
+        assert entries[0].id == history.id
+        assert entries[0].old_value == content
+        assert entries[0].new_value == content
@@ -0,0 +1,116 @@
+from httpx import AsyncClient
+
+from app.core.etag import etag_matches, make_etag
+from app.core.security import create_access_token
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+
+
+class TestETagHelpers:
+    def test_make_etag_is_weak_and_stable(self):
+        etag = make_etag("comment", 1, None)
+
+        assert etag.startswith('W/"')
+        assert etag == make_etag("comment", 1, None)
+        assert etag != make_etag("comment", 2, None)
+
+    def test_etag_matches(self):
+        etag = make_etag("x")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(etag[2:], etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('W/"other"', etag)
+
+
+class TestConditionalGets:
+    async def test_single_comment(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+        response = await client.get(url, headers=auth_headers)
+        etag = response.headers["ETag"]
+
+        response = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        await client.put(url, json={"content": "edited"}, headers=auth_headers)
+        response = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    async def test_edits_within_one_second_change_the_etag(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+        etags = set()
+        for content in ("one", "two", "three"):
+            await client.put(url, json={"content": content}, headers=auth_headers)
+            etags.add((await client.get(url, headers=auth_headers)).headers["ETag"])
+            etags.add((await client.get("/api/v1/comments/", headers=auth_headers)).headers["ETag"])
+
+        assert len(etags) == 6
+
+    async def test_author_rename_changes_the_etag(self, client: AsyncClient, auth_headers: dict, test_user: User, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+        etag = (await client.get(url, headers=auth_headers)).headers["ETag"]
+        feed_etag = (await client.get("/api/v1/comments/", headers=auth_headers)).headers["ETag"]
+
+        await client.put(f"/api/v1/users/{test_user.id}", json={"username": "renamed"}, headers=auth_headers)
+        renamed_headers = {"Authorization": f"Bearer {create_access_token('renamed')}"}
+
+        response = await client.get(url, headers={**renamed_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["user"]["username"] == "renamed"
+        response = await client.get("/api/v1/comments/", headers={**renamed_headers, "If-None-Match": feed_etag})
+        assert response.status_code == 200
+
+    async def test_single_comment_checks_permission_first(self, client: AsyncClient, auth_headers: dict, auth_headers_2: dict, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+        etag = (await client.get(url, headers=auth_headers)).headers["ETag"]
+
+        response = await client.get(url, headers={**auth_headers_2, "If-None-Match": etag})
+
+        assert response.status_code == 403
+
+    async def test_feed(self, client: AsyncClient, auth_headers: dict, auth_headers_2: dict, test_comment: Comment):
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+        etag = response.headers["ETag"]
+
+        response = await client.get("/api/v1/comments/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        other_group = await client.get("/api/v1/comments/", headers={**auth_headers_2, "If-None-Match": etag})
+        assert other_group.status_code == 200
+
+        paged = await client.get(
+            "/api/v1/comments/", params={"limit": 1}, headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert paged.status_code == 200
+
+        await client.post("/api/v1/comments/", json={"content": "new"}, headers=auth_headers)
+        response = await client.get("/api/v1/comments/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        comment_id = response.json()[0]["id"]
+        await client.delete(f"/api/v1/comments/{comment_id}", headers=auth_headers)
+        response = await client.get("/api/v1/comments/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    async def test_history(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory):
+        url = f"/api/v1/users/comment/{test_comment_history.comment_id}"
+        etag = (await client.get(url, headers=auth_headers)).headers["ETag"]
+
+        response = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        await client.put(
+            f"/api/v1/comments/{test_comment_history.comment_id}",
+            json={"content": "edited"},
+            headers=auth_headers,
+        )
+        response = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+from httpx import AsyncClient
+
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.utils.export import csv_encoder, stream_batches
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int):
+        self.checks = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.disconnect_after
+
+
+class TestExportAPI:
+    async def test_export_ndjson(self, client: AsyncClient, auth_headers: dict, auth_headers_2: dict, test_comment: Comment):
+        await client.post("/api/v1/comments/", json={"content": "second"}, headers=auth_headers)
+        await client.post("/api/v1/comments/", json={"content": "other group"}, headers=auth_headers_2)
+
+        response = await client.get("/api/v1/comments/export", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "attachment" in response.headers["content-disposition"]
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["content"] for line in lines] == [test_comment.content, "second"]
+        assert lines[0]["user"]["username"] == "testuser"
+
+    async def test_export_csv(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        response = await client.get(
+            "/api/v1/comments/export", params={"format": "csv"}, headers=auth_headers
+        )
+
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["id"] == str(test_comment.id)
+        assert rows[0]["content"] == test_comment.content
+        assert rows[0]["user_group"] == "testgroup"
+
+    async def test_export_invalid_format(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get(
+            "/api/v1/comments/export", params={"format": "xml"}, headers=auth_headers
+        )
+
+        assert response.status_code == 422
+
+    async def test_history_export(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory):
+        comment_id = test_comment_history.comment_id
+        await client.put(f"/api/v1/comments/{comment_id}", json={"content": "v2"}, headers=auth_headers)
+
+        response = await client.get(f"/api/v1/comments/{comment_id}/history/export", headers=auth_headers)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["new_value"] for line in lines] == [test_comment_history.new_value, "v2"]
+
+        response = await client.get(
+            f"/api/v1/comments/{comment_id}/history/export", params={"format": "csv"}, headers=auth_headers
+        )
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["new_value"] for row in rows] == [test_comment_history.new_value, "v2"]
+
+    async def test_history_export_permissions(self, client: AsyncClient, auth_headers_2: dict, test_comment: Comment):
+        response = await client.get(f"/api/v1/comments/{test_comment.id}/history/export", headers=auth_headers_2)
+        assert response.status_code == 403
+
+        response = await client.get("/api/v1/comments/9999/history/export", headers=auth_headers_2)
+        assert response.status_code == 404
+
+
+class TestStreamBatches:
+    async def test_stops_when_client_disconnects(self):
+        produced = []
+        closed = []
+
+        async def batches():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield [{"id": i}]
+            finally:
+                closed.append(True)
+
+        chunks = [
+            chunk async for chunk in stream_batches(
+                FakeRequest(disconnect_after=2), batches(), csv_encoder(["id"]), b"id\r\n"
+            )
+        ]
+
+        assert chunks == [b"id\r\n", b"0\r\n", b"1\r\n"]
+        assert len(produced) == 3
+        assert closed == [True]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from graphql import GraphQLError
+from httpx import AsyncClient
+
+from app.core.live import broker
+from app.core.queries import track_queries
+from app.graphql_api.types import _group_events
+from app.models.comment import Comment
+from tests.conftest import ASGIConnection
+
+PROTOCOL = "graphql-transport-ws"
+
+
+class GraphQLSocket:
+    def __init__(self, connection: ASGIConnection):
+        self.connection = connection
+        self.subscribed = broker.subscribers
+
+    def send(self, message: dict):
+        self.connection.send({"type": "websocket.receive", "text": json.dumps(message)})
+
+    async def receive(self) -> dict:
+        message = await self.connection.receive()
+        if message["type"] != "websocket.send":
+            return message
+        return json.loads(message["text"])
+
+    async def subscribe(self, id: str, query: str):
+        self.send({"id": id, "type": "subscribe", "payload": {"query": query}})
+        # The subscription is registered once its resolver starts waiting.
+        for _ in range(100):
+            if broker.subscribers > self.subscribed:
+                break
+            await asyncio.sleep(0)
+        self.subscribed = broker.subscribers
+
+
+async def connect(connection: ASGIConnection, payload: dict) -> GraphQLSocket:
+    socket = GraphQLSocket(connection)
+    accept = await connection.receive()
+    assert accept == {"type": "websocket.accept", "subprotocol": PROTOCOL, "headers": []}
+    socket.send({"type": "connection_init", "payload": payload})
+    return socket
+
+
+def graphql_socket() -> ASGIConnection:
+    return ASGIConnection.websocket("/graphql", subprotocols=[PROTOCOL])
+
+
+class TestSubscriptions:
+    async def test_comment_added_in_own_group(self, client: AsyncClient, auth_headers, auth_headers_2):
+        async with graphql_socket() as connection:
+            socket = await connect(connection, auth_headers)
+            assert await socket.receive() == {"type": "connection_ack"}
+            await socket.subscribe("1", "subscription { commentAdded { id content user { username } } }")
+
+            await client.post("/api/v1/comments/", json={"content": "elsewhere"}, headers=auth_headers_2)
+            created = await client.post("/api/v1/comments/", json={"content": "hello"}, headers=auth_headers)
+
+            message = await socket.receive()
+            socket.send({"id": "1", "type": "complete"})
+
+        assert message == {
+            "id": "1",
+            "type": "next",
+            "payload": {"data": {"commentAdded": {
+                "id": created.json()["id"], "content": "hello", "user": {"username": "testuser"},
+            }}},
+        }
+
+    async def test_updated_and_deleted(self, client: AsyncClient, auth_headers, test_comment: Comment):
+        async with graphql_socket() as connection:
+            socket = await connect(connection, {"token": auth_headers["Authorization"].split()[1]})
+            await socket.receive()
+            await socket.subscribe("u", "subscription { commentUpdated { id content } }")
+            await socket.subscribe("d", "subscription { commentDeleted }")
+
+            url = f"/api/v1/comments/{test_comment.id}"
+            await client.put(url, json={"content": "edited"}, headers=auth_headers)
+            await client.delete(url, headers=auth_headers)
+
+            updated, deleted = await socket.receive(), await socket.receive()
+
+        assert updated["id"] == "u"
+        assert updated["payload"]["data"]["commentUpdated"] == {"id": test_comment.id, "content": "edited"}
+        assert deleted["id"] == "d"
+        assert deleted["payload"]["data"]["commentDeleted"] == test_comment.id
+
+    async def test_fan_out_runs_no_queries(self, client: AsyncClient, auth_headers):
+        async with graphql_socket() as connection:
+            socket = await connect(connection, auth_headers)
+            await socket.receive()
+            for i in range(20):
+                await socket.subscribe(str(i), "subscription { commentAdded { id user { group } } }")
+
+            with track_queries() as stats:
+                broker.publish("created", "testgroup", {
+                    "id": 1, "content": "x", "user_id": 1, "created_at": "2026-01-01T00:00:00Z",
+                    "updated_at": None, "user": {"id": 1, "username": "testuser", "group": "testgroup"},
+                })
+                messages = [await socket.receive() for _ in range(20)]
+
+        assert stats.count == 0
+        assert {m["id"] for m in messages} == {str(i) for i in range(20)}
+
+    async def test_rejects_bad_token_at_connection_init(self, client: AsyncClient):
+        async with graphql_socket() as connection:
+            socket = await connect(connection, {"Authorization": "Bearer garbage"})
+            message = await socket.receive()
+
+        assert message == {"type": "websocket.close", "code": 4403, "reason": "Forbidden"}
+
+    async def test_legacy_graphql_ws_protocol_is_refused(self, client: AsyncClient):
+        # graphql-ws would run a "start" with no connection_init, unauthenticated.
+        async with ASGIConnection.websocket("/graphql", subprotocols=["graphql-ws"]) as connection:
+            accept = await connection.receive()
+            message = await connection.receive()
+
+        assert accept["subprotocol"] is None
+        assert message == {"type": "websocket.close", "code": 4406, "reason": "Subprotocol not acceptable"}
+
+    async def test_subscription_without_a_user_is_refused(self):
+        info = SimpleNamespace(context={"current_user": None})
+
+        with pytest.raises(GraphQLError, match="Not authenticated"):
+            await _group_events(info, "created").__anext__()
+
+    async def test_http_still_requires_a_token(self, client: AsyncClient):
+        response = await client.post("/graphql", json={"query": "{ comments { id } }"})
+        assert response.status_code == 403
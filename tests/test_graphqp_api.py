@@ -1,7 +1,11 @@
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import feed_cache
+from app.core.queries import track_queries
 from app.models.user import User
 from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
 
 
 class TestGraphQLAPI:
@@ -290,4 +294,64 @@ class TestGraphQLAPI:
             comment = data["data"]["comments"][0]
             assert "user" in comment
             assert "username" in comment["user"]
-            assert "group" in comment["user"]
\ No newline at end of file
+            assert "group" in comment["user"]
+
+
+NESTED_QUERY = "{ comments { content user { username } history { newValue } } }"
+
+
+async def add_comments(db: AsyncSession, users, count: int):
+    for i in range(count):
+        comment = Comment(content=f"comment {i}", user_id=users[i % len(users)].id)
+        db.add(comment)
+        await db.flush()
+        db.add(CommentHistory(comment_id=comment.id, new_value=comment.content))
+    await db.commit()
+    feed_cache.clear()
+
+
+class TestDataLoaders:
+    async def nested_query_count(self, client: AsyncClient, auth_headers: dict):
+        with track_queries() as stats:
+            response = await client.post("/graphql", json={"query": NESTED_QUERY}, headers=auth_headers)
+        assert "errors" not in response.json()
+        return stats.count, response.json()["data"]["comments"]
+
+    async def test_nested_fields_take_constant_queries(
+        self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_user: User
+    ):
+        users = [test_user]
+        for i in range(3):
+            users.append(User(username=f"member{i}", hashed_password="x", group=test_user.group))
+        db_session.add_all(users[1:])
+        await db_session.commit()
+
+        await add_comments(db_session, users, 2)
+        few, _ = await self.nested_query_count(client, auth_headers)
+        await add_comments(db_session, users, 20)
+        many, comments = await self.nested_query_count(client, auth_headers)
+
+        # Auth, the group version, the page, one IN query for authors and one for history.
+        assert few == many == 5
+        assert len(comments) == 22
+        assert {c["user"]["username"] for c in comments} == {u.username for u in users}
+        assert all(c["history"] == [{"newValue": c["content"]}] for c in comments)
+
+    async def test_unrequested_fields_are_not_loaded(
+        self, client: AsyncClient, auth_headers: dict, test_comment: Comment
+    ):
+        with track_queries() as stats:
+            response = await client.post("/graphql", json={"query": "{ comments { id } }"}, headers=auth_headers)
+        assert response.json()["data"]["comments"] == [{"id": test_comment.id}]
+        # Auth, the group version and the page.
+        assert stats.count == 3
+
+    async def test_history_follows_edits(
+        self, client: AsyncClient, auth_headers: dict, test_comment: Comment, test_comment_history: CommentHistory
+    ):
+        await client.put(f"/api/v1/comments/{test_comment.id}", json={"content": "edited"}, headers=auth_headers)
+        response = await client.post(
+            "/graphql", json={"query": "{ comments { history { oldValue newValue } } }"}, headers=auth_headers
+        )
+        [comment] = response.json()["data"]["comments"]
+        assert comment["history"][-1] == {"oldValue": "This is a test comment", "newValue": "edited"}
@@ -0,0 +1,249 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.v1.live import DROPPED_FRAME, PING, sse_stream
+from app.core.live import (
+    DROPPED, Broker, LiveEvent, LocalBus, PostgresBus, broker, create_bus, dropped_total,
+)
+from app.core.security import create_access_token, create_stream_token
+from app.models.comment import Comment
+from app.models.user import User
+from tests.conftest import ASGIConnection, engine
+
+
+def data(data_id: int = 1, content: str = "hi") -> dict:
+    return {"id": data_id, "content": content}
+
+
+class TestBroker:
+    async def test_fans_out_to_the_group_only(self):
+        hub = Broker(buffer_size=10)
+        first, second = hub.subscribe("a"), hub.subscribe("a")
+        other = hub.subscribe("b")
+
+        hub.publish("created", "a", data())
+
+        one, two = await first.get(0), await second.get(0)
+        assert one is two
+        assert one.message == '{"type":"comment.created","data":{"id":1,"content":"hi"}}'
+        assert await other.get(0.01) is None
+
+    async def test_slow_subscriber_is_dropped_without_blocking(self):
+        hub = Broker(buffer_size=2)
+        slow, fast = hub.subscribe("a"), hub.subscribe("a")
+        before = dropped_total.get()
+
+        for i in range(3):
+            hub.publish("created", "a", data(i))
+            assert (await fast.get(0)).data["id"] == i
+
+        assert slow.dropped and not fast.dropped
+        assert await slow.get(0) is DROPPED
+        assert hub.subscribers == 1
+        assert dropped_total.get() == before + 1
+
+    async def test_subscription_ends_with_its_block(self):
+        hub = Broker()
+        async with hub.subscribe("a"):
+            assert hub.subscribers == 1
+        assert hub.subscribers == 0
+
+    async def test_stop_ends_every_subscription(self):
+        hub = Broker()
+        await hub.start(LocalBus())
+        subscription = hub.subscribe("a")
+        await hub.stop()
+        assert await subscription.get(0) is DROPPED
+
+
+class TestPostgresBus:
+    def test_oversized_payload_carries_the_id(self):
+        bus = PostgresBus("postgresql://unused")
+        small = json.loads(bus.encode(LiveEvent("created", "a", data())))
+        assert small["data"] == data()
+
+        large = json.loads(bus.encode(LiveEvent("created", "a", data(7, "x" * 10000))))
+        assert large["data"] is None and large["id"] == 7
+
+    async def test_delivers_other_workers_events_only(self):
+        received = []
+        bus = PostgresBus("postgresql://unused")
+        bus.deliver = received.append
+
+        bus._on_notify(None, 1, "comment_events", bus.encode(LiveEvent("created", "a", data())))
+        assert received == []
+
+        other = PostgresBus("postgresql://unused")
+        bus._on_notify(None, 1, "comment_events", other.encode(LiveEvent("deleted", "a", {"id": 3})))
+        assert [(e.type, e.group, e.data) for e in received] == [("deleted", "a", {"id": 3})]
+
+    def test_publish_never_waits_for_the_outbox(self):
+        received = []
+        bus = PostgresBus("postgresql://unused", outbox_size=1)
+        bus.deliver = received.append
+
+        bus.publish(LiveEvent("created", "a", data(1)))
+        bus.publish(LiveEvent("created", "a", data(2)))
+        assert len(received) == 2
+
+    async def test_reconnects_when_the_idle_connection_drops(self, monkeypatch, caplog):
+        connections = []
+
+        class FakeConnection:
+            def __init__(self):
+                self.closed = False
+                self.on_terminate = []
+
+            async def add_listener(self, channel, callback):
+                pass
+
+            def add_termination_listener(self, callback):
+                self.on_terminate.append(callback)
+
+            def is_closed(self):
+                return self.closed
+
+            async def execute(self, *args):
+                if self.closed:
+                    raise ConnectionError("closed")
+
+            async def close(self):
+                self.closed = True
+
+            def terminate(self):
+                self.closed = True
+                for callback in self.on_terminate:
+                    callback(self)
+
+        async def connect(dsn):
+            connections.append(FakeConnection())
+            return connections[-1]
+
+        async def wait_for_connections(count):
+            for _ in range(200):
+                if len(connections) >= count:
+                    return
+                await asyncio.sleep(0.01)
+            raise AssertionError(f"expected {count} connections, got {len(connections)}")
+
+        monkeypatch.setattr("asyncpg.connect", connect)
+        bus = PostgresBus("postgresql://unused", heartbeat=0.01)
+        await bus.start(lambda event: None)
+        try:
+            await wait_for_connections(1)
+            # Reported by asyncpg, e.g. a Postgres restart.
+            connections[0].terminate()
+            await wait_for_connections(2)
+            assert "connection closed; reconnecting" in caplog.text
+
+            # Never reported: found by the idle heartbeat check.
+            connections[1].closed = True
+            await wait_for_connections(3)
+        finally:
+            await bus.stop()
+        assert connections[2].closed
+
+    def test_falls_back_to_local_without_postgres(self, monkeypatch):
+        monkeypatch.setattr("app.core.live.settings.LIVE_BUS", "postgres")
+        assert isinstance(create_bus(engine), LocalBus)
+
+
+class TestServerSentEvents:
+    async def test_streams_group_events(self, client: AsyncClient, auth_headers, test_user: User):
+        async with ASGIConnection.http("/api/v1/comments/stream", auth_headers) as stream:
+            start = await stream.receive()
+            assert start["status"] == 200
+            assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+            assert (await stream.receive())["body"] == PING.encode()
+
+            response = await client.post(
+                "/api/v1/comments/", json={"content": "live"}, headers=auth_headers
+            )
+            body = (await stream.receive())["body"].decode()
+
+        event, payload = body.strip().split("\n")
+        assert event == "event: comment.created"
+        message = json.loads(payload.removeprefix("data: "))
+        assert message["data"] == response.json()
+
+    async def test_token_query_parameter(self, client: AsyncClient, auth_headers):
+        response = await client.post("/api/v1/comments/stream-token", headers=auth_headers)
+        token = response.json()["token"]
+        async with ASGIConnection.http(
+            "/api/v1/comments/stream", query_string=f"token={token}".encode()
+        ) as stream:
+            assert (await stream.receive())["status"] == 200
+
+    async def test_access_tokens_are_refused_in_the_query_string(self, client: AsyncClient, test_user: User):
+        token = create_access_token(test_user.username)
+        response = await client.get("/api/v1/comments/stream", params={"token": token})
+        assert response.status_code == 401
+
+    async def test_stream_tokens_only_open_streams(self, client: AsyncClient, test_user: User):
+        token, _ = create_stream_token(test_user.username)
+        response = await client.get("/api/v1/comments/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+    async def test_requires_authentication(self, client: AsyncClient):
+        response = await client.get("/api/v1/comments/stream")
+        assert response.status_code == 401
+
+    async def test_dropped_subscriber_gets_a_final_event(self, monkeypatch):
+        monkeypatch.setattr(broker, "buffer_size", 1)
+        stream = sse_stream("a", heartbeat=5)
+        assert await anext(stream) == PING
+
+        broker.publish("created", "a", data(1))
+        broker.publish("created", "a", data(2))
+
+        assert await anext(stream) == DROPPED_FRAME
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        assert broker.subscribers == 0
+
+
+class TestWebSocket:
+    async def test_streams_group_events(
+        self, client: AsyncClient, auth_headers, auth_headers_2, test_comment: Comment
+    ):
+        token, _ = create_stream_token("testuser")
+        async with ASGIConnection.websocket(
+            "/api/v1/comments/ws", query_string=f"token={token}".encode()
+        ) as ws:
+            assert (await ws.receive())["type"] == "websocket.accept"
+
+            await client.post("/api/v1/comments/", json={"content": "other group"}, headers=auth_headers_2)
+            await client.delete(f"/api/v1/comments/{test_comment.id}", headers=auth_headers)
+
+            message = json.loads((await ws.receive())["text"])
+        assert message == {"type": "comment.deleted", "data": {"id": test_comment.id}}
+
+    async def test_graphql_mutations_publish(self, client: AsyncClient, auth_headers):
+        async with ASGIConnection.websocket("/api/v1/comments/ws", auth_headers) as ws:
+            await ws.receive()
+            await client.post(
+                "/graphql",
+                json={"query": 'mutation { createComment(input: {content: "gql"}) { id } }'},
+                headers=auth_headers,
+            )
+            message = json.loads((await ws.receive())["text"])
+        assert message["type"] == "comment.created"
+        assert message["data"]["content"] == "gql"
+
+    async def test_rejects_bad_token(self, client: AsyncClient):
+        async with ASGIConnection.websocket(
+            "/api/v1/comments/ws", query_string=b"token=garbage"
+        ) as ws:
+            message = await ws.receive()
+        assert message == {"type": "websocket.close", "code": 1008, "reason": ""}
+
+    async def test_rejects_access_token_in_query_string(self, client: AsyncClient, test_user: User):
+        token = create_access_token(test_user.username)
+        async with ASGIConnection.websocket(
+            "/api/v1/comments/ws", query_string=f"token={token}".encode()
+        ) as ws:
+            message = await ws.receive()
+        assert message == {"type": "websocket.close", "code": 1008, "reason": ""}
@@ -0,0 +1,85 @@
+import json
+import logging
+import queue
+import sys
+
+from app.config.settings import settings
+from app.core.metrics import registry
+from app.utils import logger as log_setup
+from app.utils.logger import DroppingQueueHandler, JsonFormatter, setup_logging, stop_logging
+
+
+def make_record(msg="hello %s", args=("world",), exc_info=None):
+    return logging.LogRecord("app.test", logging.INFO, __file__, 10, msg, args, exc_info)
+
+
+class TestJsonFormatter:
+    def test_compact_json_line(self):
+        line = JsonFormatter().format(make_record())
+
+        entry = json.loads(line)
+        assert entry["msg"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app.test"
+        assert " " not in line.replace("hello world", "")
+
+    def test_includes_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(exc_info=sys.exc_info())
+
+        assert "ValueError: boom" in json.loads(JsonFormatter().format(record))["exc"]
+
+
+class TestDroppingQueueHandler:
+    def test_drops_and_counts_when_full(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        dropped = registry.get("log_records_dropped_total")
+        before = dropped.get()
+
+        handler.emit(make_record())
+        handler.emit(make_record())
+
+        assert handler.queue.qsize() == 1
+        assert dropped.get() == before + 1
+
+    def test_queued_records_keep_the_traceback_apart(self):
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            handler.emit(make_record(exc_info=sys.exc_info()))
+
+        record = handler.queue.get_nowait()
+        assert record.exc_info is None
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["msg"] == "hello world"
+        assert "ValueError: boom" in entry["exc"]
+        assert "Traceback" in logging.Formatter().format(record)
+
+
+class TestQueuedLogging:
+    def test_records_reach_files_through_listener(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path))
+        monkeypatch.setattr(settings, "LOG_JSON", True)
+        loggers = [logging.getLogger(), logging.getLogger("app"), logging.getLogger("app.slow_queries")]
+        saved = [(logger, logger.handlers[:], logger.level, logger.propagate) for logger in loggers]
+        try:
+            setup_logging()
+            assert isinstance(logging.getLogger("app").handlers[0], DroppingQueueHandler)
+
+            logging.getLogger("app.test").error("queued %d", 1)
+            logging.getLogger("app.slow_queries").warning("slow %d", 2)
+            stop_logging()
+
+            assert log_setup._listener is None
+            lines = (tmp_path / "app.log").read_text().splitlines()
+            assert json.loads(lines[-2])["msg"] == "queued 1"
+            assert (tmp_path / "error.log").read_text()
+            slow_lines = (tmp_path / "slow_queries.log").read_text().splitlines()
+            assert [json.loads(line)["msg"] for line in slow_lines] == ["slow 2"]
+        finally:
+            stop_logging()
+            for logger, handlers, level, propagate in saved:
+                logger.handlers, logger.level, logger.propagate = handlers, level, propagate
@@ -0,0 +1,111 @@
+from httpx import AsyncClient
+
+from app.core.metrics import MetricsRegistry, registry
+from app.core.security import get_password_hash, verify_password
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self):
+        histogram = MetricsRegistry().histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, route="/a")
+        histogram.observe(0.1, route="/a")
+        histogram.observe(5.0, route="/a")
+
+        samples = {(name, dict(key).get("le")): value for name, key, value in histogram.samples()}
+        assert samples[("latency_seconds_bucket", "0.1")] == 2
+        assert samples[("latency_seconds_bucket", "1.0")] == 2
+        assert samples[("latency_seconds_bucket", "+Inf")] == 3
+        assert samples[("latency_seconds_count", None)] == 3
+        assert histogram.get(route="/a") == 3
+        assert histogram.sum(route="/a") == 5.15
+
+    def test_reregistering_returns_same_histogram(self):
+        metrics = MetricsRegistry()
+
+        assert metrics.histogram("h", "H") is metrics.histogram("h", "H")
+
+
+class TestExposition:
+    def test_render_text_format(self):
+        metrics = MetricsRegistry()
+        metrics.counter("jobs_total", "Jobs run").inc(3, queue='say "hi"')
+        metrics.gauge("depth", "Queue depth").set(2)
+
+        text = metrics.render()
+
+        assert "# HELP jobs_total Jobs run\n# TYPE jobs_total counter\n" in text
+        assert 'jobs_total{queue="say \\"hi\\""} 3.0\n' in text
+        assert "# TYPE depth gauge\ndepth 2.0\n" in text
+
+    def test_collectors_run_at_render(self):
+        metrics = MetricsRegistry()
+        gauge = metrics.gauge("scraped", "Set on scrape")
+        metrics.collector(lambda: gauge.set(42))
+
+        assert "scraped 42.0" in metrics.render()
+
+
+class TestMetricsEndpoint:
+    async def test_exposes_request_metrics(self, client: AsyncClient, auth_headers: dict):
+        await client.get("/api/v1/comments/", headers=auth_headers)
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/api/v1/comments/",status="200"}' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/comments/",le="+Inf"}' in body
+        assert 'http_request_db_seconds_count{method="GET",route="/api/v1/comments/"}' in body
+        assert "http_requests_in_flight" in body
+        assert "# TYPE db_pool_size gauge" in body
+
+    async def test_status_codes_are_counted(self, client: AsyncClient):
+        requests = registry.get("http_requests_total")
+        before = requests.get(method="GET", route="/api/v1/comments/", status=403)
+
+        await client.get("/api/v1/comments/")
+
+        assert requests.get(method="GET", route="/api/v1/comments/", status=403) == before + 1
+
+    async def test_unknown_methods_share_one_label(self, client: AsyncClient):
+        requests = registry.get("http_requests_total")
+        before = requests.get(method="other", route="unmatched", status=404)
+
+        await client.request("BREW", "/coffee")
+        await client.request("PROPFIND", "/coffee")
+
+        assert requests.get(method="other", route="unmatched", status=404) == before + 2
+        assert requests.get(method="BREW", route="unmatched", status=404) == 0
+
+    async def test_graphql_operations(self, client: AsyncClient, auth_headers: dict):
+        operations = registry.get("graphql_operations_total")
+        before = operations.get(type="query", fields="users", status="ok")
+
+        await client.post("/graphql", json={"query": "query Named { users { id } }"}, headers=auth_headers)
+        await client.post(
+            "/graphql",
+            json={"query": "query { ...Root } fragment Root on Query { ... on Query { users { id } } }"},
+            headers=auth_headers,
+        )
+        await client.post("/graphql", json={"query": "{ nope }"}, headers=auth_headers)
+        await client.post("/graphql", json={"query": "{ ...nope2 }"}, headers=auth_headers)
+
+        assert operations.get(type="query", fields="users", status="ok") == before + 2
+        assert operations.get(type="query", fields="nope", status="error") == 0
+        assert operations.get(type="query", fields="nope2", status="error") == 0
+        assert operations.get(type="query", fields="invalid", status="error") >= 2
+        assert registry.get("graphql_operation_duration_seconds").get(type="query", fields="users") >= 1
+
+
+class TestPasswordTimings:
+    def test_hash_and_verify_are_timed(self):
+        timings = registry.get("password_hash_seconds")
+        hashed_before = timings.get(operation="hash")
+        verified_before = timings.get(operation="verify")
+
+        verify_password("secret", get_password_hash("secret"))
+
+        assert timings.get(operation="hash") == hashed_before + 1
+        assert timings.get(operation="verify") == verified_before + 1
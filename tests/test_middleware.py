@@ -0,0 +1,66 @@
+import logging
+
+from httpx import AsyncClient
+
+from app.config.settings import settings
+from app.core.metrics import registry
+from app.models.comment import Comment
+
+ACCESS_LOGGER = "app.core.middleware"
+
+
+def access_lines(caplog):
+    return [r for r in caplog.records if r.name == ACCESS_LOGGER and "queries" in r.getMessage()]
+
+
+class TestTimingHeaders:
+    async def test_process_time_and_server_timing(self, client: AsyncClient):
+        response = await client.get("/api/v1/health")
+
+        assert float(response.headers["X-Process-Time"]) >= 0
+        assert response.headers["Server-Timing"].startswith("app;dur=")
+
+    async def test_streamed_response_passes_through(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        response = await client.get("/api/v1/comments/export", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert "X-Process-Time" in response.headers
+        assert str(test_comment.id) in response.text
+
+    async def test_in_flight_gauge_settles(self, client: AsyncClient):
+        in_flight = registry.get("http_requests_in_flight")
+        before = in_flight.get()
+
+        await client.get("/api/v1/health")
+
+        assert in_flight.get() == before
+
+
+class TestAccessLog:
+    async def test_logs_every_request_by_default(self, client: AsyncClient, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 1.0)
+
+        with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER):
+            await client.get("/api/v1/health")
+
+        [record] = access_lines(caplog)
+        assert record.levelno == logging.INFO
+        assert "GET /api/v1/health 200" in record.getMessage()
+
+    async def test_sampled_out(self, client: AsyncClient, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.0)
+
+        with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER):
+            await client.get("/api/v1/health")
+
+        assert access_lines(caplog) == []
+
+    async def test_slow_requests_always_logged(self, client: AsyncClient, caplog, monkeypatch):
+        monkeypatch.setattr(settings, "LOG_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0.0)
+
+        with caplog.at_level(logging.INFO, logger=ACCESS_LOGGER):
+            await client.get("/api/v1/health")
+
+        [record] = access_lines(caplog)
+        assert record.levelno == logging.WARNING
@@ -0,0 +1,106 @@
+import json
+import os
+import pstats
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config.settings import settings
+from app.core.middleware import ProfilingMiddleware
+from app.core.profiling import create_profile_token, verify_profile_token
+from app.core.security import create_access_token
+from app.main import app
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "LOG_DIR", str(tmp_path))
+    return tmp_path / "profiles"
+
+
+@pytest.fixture
+async def profiled_client(client: AsyncClient):
+    # The middleware is only installed at startup when enabled, so wrap the
+    # app here; dependency overrides from ``client`` still apply.
+    transport = ASGITransport(app=ProfilingMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def admin_request(token: str) -> dict:
+    return {"X-Profile": token, "Authorization": f"Bearer {create_access_token('admin')}"}
+
+
+class TestProfileToken:
+    def test_round_trip(self):
+        token, _ = create_profile_token("admin", 60)
+        assert verify_profile_token(token, "admin")
+
+    def test_rejects_tampered_expired_and_other_users(self):
+        token, _ = create_profile_token("admin", 60)
+        expires, _, signature = token.partition(".")
+        assert not verify_profile_token(f"{int(expires) + 1}.{signature}", "admin")
+        assert not verify_profile_token(create_profile_token("admin", -1)[0], "admin")
+        assert not verify_profile_token("garbage", "admin")
+        assert not verify_profile_token(token, "someone-else")
+        assert not verify_profile_token(token, "")
+
+    async def test_issued_to_admins_only(self, client: AsyncClient, auth_headers, admin_headers, profiling):
+        response = await client.post("/api/v1/admin/profile-token", headers=auth_headers)
+        assert response.status_code == 403
+
+        response = await client.post("/api/v1/admin/profile-token", params={"ttl": 30}, headers=admin_headers)
+        assert response.status_code == 200
+        assert verify_profile_token(response.json()["token"], "admin")
+
+    async def test_not_issued_when_disabled(self, client: AsyncClient, admin_headers):
+        response = await client.post("/api/v1/admin/profile-token", headers=admin_headers)
+        assert response.status_code == 404
+
+
+class TestProfilingMiddleware:
+    async def test_cprofile_from_header(self, profiled_client: AsyncClient, profiling):
+        token, _ = create_profile_token("admin")
+        response = await profiled_client.get("/api/v1/health", headers=admin_request(token))
+
+        assert response.status_code == 200
+        path = profiling / response.headers["X-Profile-File"]
+        assert path.suffix == ".prof"
+        stats = pstats.Stats(str(path))
+        assert any(func[2] == "health_check" for func in stats.stats)
+
+    async def test_sampler(self, profiled_client: AsyncClient, profiling, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILING_SAMPLE_INTERVAL_MS", 0.1)
+        token, _ = create_profile_token("admin")
+        response = await profiled_client.get(
+            "/api/v1/health", headers={**admin_request(token), "X-Profile-Mode": "sample"}
+        )
+
+        name = response.headers["X-Profile-File"]
+        assert name.endswith(".speedscope.json")
+        document = json.loads((profiling / name).read_text())
+        profile = document["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+
+    async def test_invalid_token_is_ignored(self, profiled_client: AsyncClient, profiling):
+        response = await profiled_client.get("/api/v1/health", headers=admin_request("1.bogus"))
+
+        assert response.status_code == 200
+        assert "X-Profile-File" not in response.headers
+        assert not os.path.exists(profiling)
+
+    async def test_token_needs_its_admin_and_a_header(self, profiled_client: AsyncClient, profiling):
+        token, _ = create_profile_token("admin")
+        other_user = {"X-Profile": token, "Authorization": f"Bearer {create_access_token('testuser')}"}
+
+        for response in (
+            await profiled_client.get("/api/v1/health", headers={"X-Profile": token}),
+            await profiled_client.get("/api/v1/health", headers=other_user),
+            await profiled_client.get(
+                "/api/v1/health", params={"profile": token}, headers={"Authorization": admin_request(token)["Authorization"]}
+            ),
+        ):
+            assert "X-Profile-File" not in response.headers
+        assert not os.path.exists(profiling)
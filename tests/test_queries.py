@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.queries import statement_shape, track_queries
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+
+
+class TestQueryTracking:
+    async def test_counts_statements(self, db_session: AsyncSession, test_user: User):
+        with track_queries() as stats:
+            await db_session.execute(select(User))
+            await db_session.execute(text("SELECT 1"))
+
+        assert stats.count == 2
+        assert stats.duration > 0
+
+    async def test_nested_blocks_count_towards_parent(self, db_session: AsyncSession):
+        with track_queries() as outer:
+            await db_session.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                await db_session.execute(text("SELECT 2"))
+
+        assert inner.count == 1
+        assert outer.count == 2
+
+    async def test_untracked_statements_are_ignored(self, db_session: AsyncSession):
+        await db_session.execute(text("SELECT 1"))
+
+        with track_queries() as stats:
+            pass
+
+        assert stats.count == 0
+
+    def test_shape_collapses_placeholder_lists(self):
+        assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+            statement_shape("SELECT *\n  FROM t WHERE id IN ($1, $2)")
+
+    async def test_repeated_shapes(self, db_session: AsyncSession):
+        with track_queries() as stats:
+            for i in range(3):
+                await db_session.execute(select(User).where(User.id == i))
+
+        assert stats.repeated(3)[0][1] == 3
+        assert stats.repeated(4) == []
+
+
+class TestRequestQueries:
+    async def test_server_timing_in_debug(self, client: AsyncClient, auth_headers: dict, monkeypatch):
+        monkeypatch.setattr(settings, "DEBUG", True)
+
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        assert "db;dur=" in response.headers["Server-Timing"]
+        assert "queries" in response.headers["Server-Timing"]
+
+    async def test_no_db_timing_outside_debug(self, client: AsyncClient, auth_headers: dict, monkeypatch):
+        monkeypatch.setattr(settings, "DEBUG", False)
+
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        assert "db;dur=" not in response.headers["Server-Timing"]
+
+    async def test_repeated_statement_warning(self, client: AsyncClient, auth_headers: dict, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "QUERY_REPEAT_THRESHOLD", 1)
+
+        with caplog.at_level(logging.WARNING, logger="app.core.middleware"):
+            await client.get("/api/v1/comments/", headers=auth_headers)
+
+        assert any("Possible N+1" in record.message for record in caplog.records)
+
+
+class TestEndpointQueryBudgets:
+    async def test_comment_history(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory, max_queries):
+        with max_queries(4):
+            response = await client.get(
+                f"/api/v1/users/comment/{test_comment_history.comment_id}", headers=auth_headers
+            )
+        assert response.status_code == 200
+
+    async def test_feed(self, client: AsyncClient, auth_headers: dict, test_comment: Comment, max_queries):
+        with max_queries(3):
+            response = await client.get("/api/v1/comments/", headers=auth_headers)
+        assert response.status_code == 200
+
+    async def test_idle_feed_poll(self, client: AsyncClient, auth_headers: dict, test_comment: Comment, max_queries):
+        # Authentication plus the EXISTS probe; no version lookup or page query.
+        with max_queries(2):
+            response = await client.get(
+                "/api/v1/comments/", params={"since_id": test_comment.id}, headers=auth_headers
+            )
+        assert response.json() == []
+
+    async def test_single_comment(self, client: AsyncClient, auth_headers: dict, test_comment: Comment, max_queries):
+        with max_queries(3):
+            response = await client.get(f"/api/v1/comments/{test_comment.id}", headers=auth_headers)
+        assert response.status_code == 200
+
+    async def test_budget_exceeded_fails(self, db_session: AsyncSession, max_queries):
+        with pytest.raises(AssertionError, match="at most 1 queries, ran 2"):
+            with max_queries(1):
+                await db_session.execute(text("SELECT 1"))
+                await db_session.execute(text("SELECT 2"))
@@ -0,0 +1,65 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories, schemas
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+from app.schemas.comment import CommentRow
+from app.schemas.comment_history import CommentHistoryRow
+from app.schemas.user import UserRow
+
+
+def legacy_body(schema, objects) -> bytes:
+    # What response_model=List[schema] produced before the row fast path.
+    return JSONResponse(content=jsonable_encoder([schema.model_validate(o) for o in objects])).body
+
+
+class TestRowSchemas:
+    def test_rows_mirror_schema_field_order(self):
+        assert list(CommentRow.__annotations__) == list(schemas.Comment.model_fields)
+        assert list(UserRow.__annotations__) == list(schemas.User.model_fields)
+        assert list(CommentHistoryRow.__annotations__) == list(schemas.CommentHistory.model_fields)
+
+
+class TestRowFastPath:
+    async def test_feed_bytes_match_legacy_output(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_user: User):
+        await client.post("/api/v1/comments/", json={"content": "héllo ✓ \"quoted\""}, headers=auth_headers)
+        created = await client.post("/api/v1/comments/", json={"content": "to edit"}, headers=auth_headers)
+        await client.put(
+            f"/api/v1/comments/{created.json()['id']}", json={"content": "edited"}, headers=auth_headers
+        )
+
+        response = await client.get("/api/v1/comments/", headers=auth_headers)
+
+        db_session.expunge_all()
+        comments = await repositories.comment.get_by_user_group(db_session, user_group=test_user.group)
+        assert response.content == legacy_body(schemas.Comment, comments)
+
+    async def test_history_bytes_match_legacy_output(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_comment_history: CommentHistory):
+        comment_id = test_comment_history.comment_id
+        await client.put(f"/api/v1/comments/{comment_id}", json={"content": "v2"}, headers=auth_headers)
+
+        response = await client.get(f"/api/v1/users/comment/{comment_id}", headers=auth_headers)
+
+        history = await repositories.comment_history.get_by_comment(db_session, comment_id=comment_id)
+        assert len(history) == 2
+        assert response.content == legacy_body(schemas.CommentHistory, history)
+
+    async def test_users_bytes_match_legacy_output(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, test_user_2: User):
+        response = await client.get("/api/v1/users/", headers=auth_headers)
+
+        users = (await db_session.execute(select(User).order_by(User.id))).scalars().all()
+        assert response.content == legacy_body(schemas.User, users)
+
+    async def test_rows_do_not_enter_identity_map(self, db_session: AsyncSession, test_comment: Comment, test_user: User):
+        db_session.expunge_all()
+
+        rows = await repositories.comment.get_by_user_group_rows(db_session, user_group=test_user.group)
+
+        assert rows[0]["id"] == test_comment.id
+        assert rows[0]["user"]["id"] == test_user.id
+        assert len(db_session.identity_map) == 0
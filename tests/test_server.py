@@ -0,0 +1,27 @@
+import pytest
+
+from app.server import split_pool
+
+
+class TestSplitPool:
+    def test_no_budget_keeps_configured_sizes(self):
+        assert split_pool(None, 8, 10, 20) == (10, 20)
+
+    def test_budget_is_shared_across_workers(self):
+        pool_size, max_overflow = split_pool(90, 4, 10, 20)
+        assert (pool_size, max_overflow) == (10, 12)
+        assert 4 * (pool_size + max_overflow) <= 90
+
+    def test_small_budget_shrinks_the_pool(self):
+        assert split_pool(12, 4, 10, 20) == (3, 0)
+
+    def test_reserved_connections_come_out_of_the_budget(self):
+        pool_size, max_overflow = split_pool(90, 4, 10, 20, reserved=1)
+        assert (pool_size, max_overflow) == (10, 11)
+        assert 4 * (pool_size + max_overflow + 1) <= 90
+
+    def test_budget_below_worker_count(self):
+        with pytest.raises(ValueError):
+            split_pool(3, 4, 10, 20)
+        with pytest.raises(ValueError):
+            split_pool(4, 4, 10, 20, reserved=1)
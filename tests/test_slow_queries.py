@@ -0,0 +1,97 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.config.settings import settings
+from app.core.slow_queries import redact, slow_query_log
+from app.models.comment import Comment
+from app.models.user import User
+from tests.conftest import engine
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    slow_query_log.watch(engine)
+    slow_query_log.clear()
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+class TestRedaction:
+    def test_keeps_identifiers_and_hides_text(self):
+        assert redact((42, "secret", None, b"\x00\x01", True)) == [42, "<str len=6>", None, "<bytes len=2>", True]
+
+    def test_nested(self):
+        assert redact({"ids": [1, 2], "name": "bob"}) == {"ids": [1, 2], "name": "<str len=3>"}
+
+
+class TestSlowQueryLog:
+    async def test_records_statement_params_and_call_site(self, db_session: AsyncSession, slow_log, test_user: User, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+            await repositories.user.get_by_username(db_session, username="testuser")
+
+        entry = slow_log.recent(1)[0]
+        assert "FROM users" in entry["statement"]
+        assert "<str len=8>" in str(entry["parameters"])
+        assert "testuser" not in str(entry["parameters"])
+        assert entry["call_site"].startswith("app/repositories/user_repository.py:")
+        assert any("Slow query" in r.getMessage() for r in caplog.records)
+
+    async def test_below_threshold_is_ignored(self, db_session: AsyncSession, slow_log, monkeypatch):
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 60_000.0)
+
+        await repositories.user.get_multi(db_session)
+
+        assert slow_log.recent() == []
+
+    async def test_no_explain_outside_postgres(self, db_session: AsyncSession, slow_log, monkeypatch):
+        monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+
+        await repositories.user.get_multi(db_session)
+
+        assert slow_log.recent(1)[0]["plan"] is None
+        assert not slow_log._tasks
+
+    def test_ring_buffer_is_bounded(self):
+        assert slow_query_log.entries.maxlen == settings.SLOW_QUERY_BUFFER_SIZE
+
+
+class TestSlowQueryEndpoint:
+    async def test_requires_admin(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/v1/admin/slow-queries", headers=auth_headers)
+
+        assert response.status_code == 403
+
+    async def test_self_registered_administrators_member_is_not_admin(self, client: AsyncClient, auth_headers: dict, test_user):
+        await client.post(
+            "/api/v1/users/",
+            json={"username": "mallory", "password": "pw", "group": "administrators", "is_admin": True},
+        )
+        login = await client.post("/api/v1/auth/login", data={"username": "mallory", "password": "pw"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        response = await client.get("/api/v1/admin/slow-queries", headers=headers)
+        assert response.status_code == 403
+
+        await client.put(f"/api/v1/users/{test_user.id}", json={"group": "administrators", "is_admin": True}, headers=auth_headers)
+        response = await client.get("/api/v1/admin/slow-queries", headers=auth_headers)
+        assert response.status_code == 403
+
+    async def test_lists_newest_first_and_clears(self, client: AsyncClient, admin_headers: dict, slow_log, test_comment: Comment):
+        await client.get("/api/v1/health")
+
+        response = await client.get("/api/v1/admin/slow-queries", params={"limit": 2}, headers=admin_headers)
+
+        assert response.status_code == 200
+        entries = response.json()
+        assert 1 <= len(entries) <= 2
+        assert entries[0]["timestamp"] >= entries[-1]["timestamp"]
+        assert {"statement", "duration_ms", "parameters", "call_site", "plan"} <= set(entries[0])
+
+        response = await client.delete("/api/v1/admin/slow-queries", headers=admin_headers)
+        assert response.status_code == 204
+        assert slow_log.recent() == []
@@ -0,0 +1,141 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.config.settings import settings
+from app.core.reaper import TombstoneReaper, backlog_gauge, purged_total
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+from migrations.migrate import upgrade_tables
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def soft_delete(monkeypatch):
+    monkeypatch.setattr(settings, "SOFT_DELETE_ENABLED", True)
+
+
+class TestSoftDelete:
+    async def test_delete_leaves_tombstone(self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, soft_delete):
+        create_response = await client.post(
+            "/api/v1/comments/", json={"content": "Soft deleted"}, headers=auth_headers
+        )
+        comment_id = create_response.json()["id"]
+
+        response = await client.delete(f"/api/v1/comments/{comment_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["id"] == comment_id
+
+        row = await db_session.execute(select(Comment.deleted_at).where(Comment.id == comment_id))
+        assert row.scalar_one() is not None
+
+        history = await db_session.execute(
+            select(CommentHistory).where(CommentHistory.comment_id == comment_id)
+        )
+        assert len(history.scalars().all()) == 1
+
+    async def test_tombstoned_comment_hidden_from_reads(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory, soft_delete):
+        comment_id = test_comment_history.comment_id
+        await client.delete(f"/api/v1/comments/{comment_id}", headers=auth_headers)
+
+        get_response = await client.get(f"/api/v1/comments/{comment_id}", headers=auth_headers)
+        assert get_response.status_code == 404
+
+        list_response = await client.get("/api/v1/comments/", headers=auth_headers)
+        assert not any(c["id"] == comment_id for c in list_response.json())
+
+        history_response = await client.get(f"/api/v1/users/comment/{comment_id}", headers=auth_headers)
+        assert history_response.status_code == 404
+
+        second_delete = await client.delete(f"/api/v1/comments/{comment_id}", headers=auth_headers)
+        assert second_delete.status_code == 404
+
+    async def test_repository_filters_tombstones(self, db_session: AsyncSession, test_comment_history: CommentHistory, test_user: User, soft_delete):
+        comment_id = test_comment_history.comment_id
+        await repositories.comment.remove(db_session, id=comment_id)
+
+        assert await repositories.comment.get_by_user(db_session, user_id=test_user.id) == []
+        assert await repositories.comment.get_by_user_group(db_session, user_group=test_user.group) == []
+        assert await repositories.comment.get_with_user(db_session, id=comment_id) is None
+        assert await repositories.comment_history.get_by_comment(db_session, comment_id=comment_id) == []
+
+
+class TestTombstoneReaper:
+    async def test_reaper_purges_in_batches(self, db_session: AsyncSession, test_user: User, soft_delete):
+        for i in range(5):
+            comment = Comment(content=f"comment {i}", user_id=test_user.id)
+            db_session.add(comment)
+            await db_session.flush()
+            db_session.add(CommentHistory(comment_id=comment.id, new_value=comment.content))
+        await db_session.commit()
+
+        ids = (await db_session.execute(select(Comment.id))).scalars().all()
+        for comment_id in ids[:3]:
+            await repositories.comment.soft_remove(db_session, id=comment_id)
+        assert await repositories.comment.count_tombstoned(db_session) == 3
+
+        purged_before = purged_total.get()
+        reaper = TombstoneReaper(
+            TestingSessionLocal, batch_size=2, interval=0, batch_pause=0, max_batches=10
+        )
+        assert await reaper.run_once() == 3
+
+        remaining = (await db_session.execute(select(Comment.id))).scalars().all()
+        assert sorted(remaining) == sorted(ids[3:])
+        orphaned = await db_session.execute(
+            select(CommentHistory).where(CommentHistory.comment_id.in_(ids[:3]))
+        )
+        assert orphaned.scalars().all() == []
+        assert purged_total.get() - purged_before == 3
+        assert backlog_gauge.get() == 0
+
+    async def test_reaper_respects_max_batches(self, db_session: AsyncSession, test_user: User, soft_delete):
+        for i in range(4):
+            db_session.add(Comment(content=f"comment {i}", user_id=test_user.id))
+        await db_session.commit()
+        for comment_id in (await db_session.execute(select(Comment.id))).scalars().all():
+            await repositories.comment.soft_remove(db_session, id=comment_id)
+
+        reaper = TombstoneReaper(
+            TestingSessionLocal, batch_size=1, interval=0, batch_pause=0, max_batches=2
+        )
+        assert await reaper.run_once() == 2
+        assert backlog_gauge.get() == 2
+
+    def test_batches_skip_rows_locked_by_other_workers(self):
+        batch = repositories.comment.tombstoned_batch(limit=10)
+
+        assert str(batch.compile(dialect=postgresql.dialect())).endswith("FOR UPDATE SKIP LOCKED")
+        assert "FOR UPDATE" not in str(batch.compile(dialect=sqlite.dialect()))
+
+    async def test_start_and_stop(self):
+        reaper = TombstoneReaper(TestingSessionLocal, interval=3600)
+        reaper.start()
+        await reaper.stop()
+        assert reaper._task is None
+
+
+class TestSoftDeleteUpgrade:
+    def test_migrate_adds_column_and_indexes_to_existing_table(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE comments (id INTEGER PRIMARY KEY, content BLOB NOT NULL, "
+                "user_id INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME)"
+            ))
+            connection.execute(text("INSERT INTO comments (content, user_id) VALUES (x'006869', 1)"))
+
+        upgrade_tables(engine)
+        upgrade_tables(engine)
+
+        inspector = inspect(engine)
+        assert "deleted_at" in {column["name"] for column in inspector.get_columns("comments")}
+        assert {index["name"] for index in inspector.get_indexes("comments")} >= {
+            "ix_comments_live_user_id", "ix_comments_live_created_at_id", "ix_comments_tombstoned"
+        }
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT deleted_at FROM comments")).scalar_one() is None
@@ -0,0 +1,105 @@
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import repositories
+from app.models.comment import Comment
+from app.models.comment_history import CommentHistory
+from app.models.user import User
+
+
+class TestSparseFieldsAPI:
+    async def test_feed_fields(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        response = await client.get(
+            "/api/v1/comments/", params={"fields": "content,id"}, headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"content": test_comment.content, "id": test_comment.id}]
+
+    async def test_feed_fields_with_user(self, client: AsyncClient, auth_headers: dict, test_comment: Comment, test_user: User):
+        response = await client.get(
+            "/api/v1/comments/", params={"fields": "id,user"}, headers=auth_headers
+        )
+
+        assert response.json() == [{
+            "id": test_comment.id,
+            "user": {"username": test_user.username, "group": test_user.group, "id": test_user.id},
+        }]
+
+    async def test_full_and_sparse_feeds_cached_separately(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        full = await client.get("/api/v1/comments/", headers=auth_headers)
+        sparse = await client.get("/api/v1/comments/", params={"fields": "id"}, headers=auth_headers)
+
+        assert "user" in full.json()[0]
+        assert sparse.json() == [{"id": test_comment.id}]
+        assert full.headers["ETag"] != sparse.headers["ETag"]
+
+    async def test_unknown_field_rejected(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get(
+            "/api/v1/comments/", params={"fields": "id,password"}, headers=auth_headers
+        )
+
+        assert response.status_code == 422
+        assert "password" in response.json()["detail"]
+
+    async def test_empty_fields_rejected(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get("/api/v1/comments/", params={"fields": ","}, headers=auth_headers)
+
+        assert response.status_code == 422
+
+    async def test_single_comment_fields(self, client: AsyncClient, auth_headers: dict, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+        response = await client.get(url, params={"fields": "id,content"}, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"content": test_comment.content, "id": test_comment.id}
+
+        etag = response.headers["ETag"]
+        response = await client.get(
+            url, params={"fields": "id,content"}, headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    async def test_single_comment_fields_permissions(self, client: AsyncClient, auth_headers_2: dict, test_comment: Comment):
+        url = f"/api/v1/comments/{test_comment.id}"
+
+        response = await client.get(url, params={"fields": "id"}, headers=auth_headers_2)
+        assert response.status_code == 403
+
+        response = await client.get("/api/v1/comments/9999", params={"fields": "id"}, headers=auth_headers_2)
+        assert response.status_code == 404
+
+    async def test_history_fields(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory):
+        response = await client.get(
+            f"/api/v1/users/comment/{test_comment_history.comment_id}",
+            params={"fields": "new_value"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"new_value": test_comment_history.new_value}]
+
+    async def test_history_unknown_field_rejected(self, client: AsyncClient, auth_headers: dict, test_comment_history: CommentHistory):
+        response = await client.get(
+            f"/api/v1/users/comment/{test_comment_history.comment_id}",
+            params={"fields": "content"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 422
+
+
+class TestSparseFieldsRepository:
+    async def test_projection_skips_user_load(self, db_session: AsyncSession, test_comment: Comment, test_user: User):
+        rows = await repositories.comment.get_by_user_group_fields(
+            db_session, user_group=test_user.group, fields=["id"]
+        )
+
+        assert rows == [{"id": test_comment.id}]
+
+    async def test_user_only_projection(self, db_session: AsyncSession, test_comment: Comment, test_user: User):
+        rows = await repositories.comment.get_by_user_group_fields(
+            db_session, user_group=test_user.group, fields=["user"]
+        )
+
+        assert rows == [{"user": {"username": test_user.username, "group": test_user.group, "id": test_user.id}}]
@@ -0,0 +1,151 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.tracing import (
+    NOOP_SPAN, FileExporter, parse_traceparent, span, traced, tracer,
+)
+from app.models.comment import Comment
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(spans)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def traces():
+    exporter = CollectingExporter()
+    tracer.configure(exporter)
+    yield exporter.traces
+    tracer.shutdown()
+
+
+def by_name(spans):
+    return {s.name: s for s in spans}
+
+
+class TestSpans:
+    def test_disabled_is_a_noop(self):
+        assert not tracer.enabled
+        assert span("anything") is NOOP_SPAN
+
+        @traced()
+        def add(a, b):
+            return a + b
+
+        assert add(1, 2) == 3
+
+    def test_children_share_the_trace_and_export_with_the_root(self, traces):
+        with span("root") as root:
+            with span("child") as child:
+                with span("grandchild") as grandchild:
+                    pass
+            assert traces == []
+
+        assert len(traces) == 1
+        assert [s.name for s in traces[0]] == ["grandchild", "child", "root"]
+        assert child.trace_id == grandchild.trace_id == root.trace_id
+        assert grandchild.parent_id == child.span_id
+        assert child.parent_id == root.span_id
+        assert root.parent_id is None
+
+    def test_exception_marks_span_failed(self, traces):
+        with pytest.raises(ValueError):
+            with span("boom"):
+                raise ValueError("bad")
+
+        assert traces[0][0].error == "ValueError: bad"
+        assert traces[0][0].to_otlp()["status"] == {"code": 2, "message": "ValueError: bad"}
+
+    async def test_traced_method_is_named_after_the_instance_class(self, traces):
+        class Base:
+            @traced()
+            async def load(self):
+                return 1
+
+        class Child(Base):
+            pass
+
+        assert await Child().load() == 1
+        assert traces[0][0].name == "Child.load"
+
+
+class TestTraceparent:
+    def test_parse(self):
+        header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        assert parse_traceparent(header) == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7")
+
+    @pytest.mark.parametrize("header", [
+        None,
+        "garbage",
+        "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+        "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+    ])
+    def test_invalid_starts_a_new_trace(self, header):
+        assert parse_traceparent(header) is None
+
+
+class TestRequestTracing:
+    async def test_untraced_requests_have_no_traceparent(self, client: AsyncClient):
+        response = await client.get("/api/v1/health")
+        assert "traceparent" not in response.headers
+
+    async def test_request_spans(self, client: AsyncClient, auth_headers, test_comment: Comment, traces):
+        incoming = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        response = await client.get(
+            f"/api/v1/comments/{test_comment.id}", headers={**auth_headers, "traceparent": incoming}
+        )
+        assert response.status_code == 200
+
+        spans = traces[-1]
+        names = by_name(spans)
+        root = names["GET /api/v1/comments/{comment_id}"]
+        assert root.parent_id == "00f067aa0ba902b7"
+        assert root.attributes["http.status_code"] == 200
+        assert all(s.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736" for s in spans)
+        assert response.headers["traceparent"] == root.traceparent
+
+        for name in ("auth.verify_token", "auth.load_user", "UserRepository.get_by_username",
+                     "CommentRepository.get_fields", "permissions.check_group", "db.query"):
+            assert name in names, name
+        assert names["UserRepository.get_by_username"].parent_id == names["auth.load_user"].span_id
+        queries = [s for s in spans if s.name == "db.query"]
+        assert any("FROM comments" in s.attributes["db.statement"] for s in queries)
+
+    async def test_graphql_spans(self, client: AsyncClient, auth_headers, test_comment: Comment, traces):
+        response = await client.post(
+            "/graphql", json={"query": "{ comments { id } }"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+
+        names = by_name(traces[-1])
+        assert names["graphql.operation"].attributes["graphql.fields"] == "comments"
+        assert names["graphql.execute"].parent_id == names["graphql.operation"].span_id
+
+
+class TestFileExporter:
+    def test_writes_otlp_json_lines(self, tmp_path):
+        path = tmp_path / "traces.jsonl"
+        tracer.configure(FileExporter(str(path)))
+        try:
+            with span("root", user_id=7):
+                with span("child"):
+                    pass
+        finally:
+            tracer.shutdown()
+
+        [line] = path.read_text().splitlines()
+        document = json.loads(line)
+        scope_spans = document["resourceSpans"][0]["scopeSpans"][0]
+        spans = {s["name"]: s for s in scope_spans["spans"]}
+        assert spans["child"]["parentSpanId"] == spans["root"]["spanId"]
+        assert {"key": "user_id", "value": {"intValue": "7"}} in spans["root"]["attributes"]
+        assert int(spans["root"]["endTimeUnixNano"]) >= int(spans["root"]["startTimeUnixNano"])
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.config.settings import settings
+from app.core.queries import track_queries
+from app.core.warmup import Warmup, warmup
+from tests.conftest import TestingSessionLocal, engine
+
+
+@pytest.fixture
+def not_ready(monkeypatch):
+    monkeypatch.setattr(warmup, "ready", False)
+
+
+class TestWarmup:
+    async def test_runs_every_phase_and_becomes_ready(self, db_session, caplog):
+        runner = Warmup(engine, TestingSessionLocal, connections=2)
+
+        with caplog.at_level(logging.INFO, logger="app.core.warmup"), track_queries() as stats:
+            runner.start()
+            assert not runner.ready
+            await runner._task
+
+        assert runner.ready
+        assert set(runner.report) == {"connections", "graphql", "queries", "total"}
+        assert stats.count >= 8
+        assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
+        assert any(r.getMessage().startswith("Ready after") for r in caplog.records)
+        await runner.stop()
+        assert not runner.ready
+
+    async def test_database_phases_retry_until_they_succeed(self, db_session, caplog):
+        attempts = 0
+
+        def flaky():
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                raise RuntimeError("database unavailable")
+            return TestingSessionLocal()
+
+        runner = Warmup(engine, flaky, connections=0, retry_delay=0.01)
+        runner.start()
+        while "queries" not in runner.failed:
+            await asyncio.sleep(0)
+        assert not runner.ready
+        assert runner.failed == {"queries": "RuntimeError: database unavailable"}
+
+        await runner._task
+        assert runner.ready
+        assert runner.failed == {}
+        assert attempts == 3
+        assert any("phase queries failed; retrying" in r.getMessage() for r in caplog.records)
+
+    async def test_failed_graphql_phase_does_not_block_readiness(self, db_session, monkeypatch, caplog):
+        async def broken():
+            raise RuntimeError("schema error")
+
+        monkeypatch.setattr("app.core.warmup._prime_graphql", broken)
+        runner = Warmup(engine, TestingSessionLocal, connections=0)
+        await runner.run()
+
+        assert runner.ready
+        assert "connections" not in runner.report
+        assert any("phase graphql failed" in r.getMessage() for r in caplog.records)
+
+    async def test_disabled_is_ready_immediately(self, monkeypatch):
+        monkeypatch.setattr(settings, "WARMUP_ENABLED", False)
+        runner = Warmup(engine, TestingSessionLocal)
+        runner.start()
+
+        assert runner.ready
+        assert runner._task is None
+
+
+class TestReadiness:
+    async def test_503_until_warm(self, client: AsyncClient, not_ready, monkeypatch):
+        response = await client.get("/api/v1/ready")
+        assert response.status_code == 503
+        assert response.json() == {"status": "starting", "failed": {}}
+
+        monkeypatch.setattr(warmup, "failed", {"connections": "OSError: connection refused"})
+        response = await client.get("/api/v1/ready")
+        assert response.status_code == 503
+        assert response.json()["failed"] == {"connections": "OSError: connection refused"}
+
+    async def test_ready_reports_startup_time(self, client: AsyncClient, monkeypatch):
+        monkeypatch.setattr(warmup, "ready", True)
+        monkeypatch.setattr(warmup, "report", {"queries": 1.5, "total": 9.0})
+
+        response = await client.get("/api/v1/ready")
+        assert response.status_code == 200
+        assert response.json()["startup_ms"]["total"] == 9.0